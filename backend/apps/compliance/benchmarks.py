@@ -0,0 +1,298 @@
+# compliance/benchmarks.py
+"""
+Throughput benchmarks for the statutory calculators.
+
+Every benchmark runs over the same seeded, realistic sample of monthly
+salaries (log-normal around a KES 45,000 median, with pension, insurance,
+HELB and overtime for a share of employees), so results are comparable
+between runs and between releases. Single-call benchmarks time the public
+Decimal helpers one employee at a time; batch benchmarks time the calc_batch
+functions over the whole sample in one call. Both report employees per second.
+
+    results = run_benchmarks(sample_size=10000)
+    regressions = compare_to_baseline(results, load_baseline(path), threshold=0.2)
+
+`manage.py benchmark_compliance` wraps these and fails on a regression.
+"""
+import json
+import platform
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from .calc_paye import calculate_paye
+from .calc_nssf import calculate_nssf
+from .calc_shif import calculate_shif
+from .calc_ahl import calculate_ahl
+from .calc_overtime import calculate_overtime_pay
+from .calc_reliefs import (
+    calculate_insurance_relief,
+    calculate_post_retirement_medical_deduction,
+    calculate_mortgage_interest_relief
+)
+from .calc_batch import np, calculate_statutory_batch, calculate_net_pay_batch
+from .deduction_graph import DeductionGraph
+from .rate_registry import rate_registry
+from .rates import PENSION_MAX_RELIEF
+from .money import to_cents, from_cents
+
+DEFAULT_SAMPLE_SIZE = 10000
+DEFAULT_REPEAT = 5
+DEFAULT_SEED = 2025
+DEFAULT_THRESHOLD = 0.20
+
+# Fixed pay date so rate lookups are the same on every run
+BENCHMARK_PAY_DATE = date(2025, 9, 30)
+
+MEDIAN_SALARY = 45000
+SALARY_SIGMA = 0.75
+MIN_SALARY = 15000
+MAX_SALARY = 1500000
+
+
+def salary_sample(size=DEFAULT_SAMPLE_SIZE, seed=DEFAULT_SEED):
+    """
+    Builds a deterministic sample of employees' monthly pay inputs.
+
+    Args:
+        size (int): Number of employees.
+        seed (int): Random seed; the same seed always gives the same sample.
+
+    Returns:
+        dict: Columns of equal length. Amounts are integer cents; overtime
+        hours are Decimals.
+    """
+    rng = random.Random(seed)
+    sample = {
+        'gross': [], 'pension': [], 'insurance_premiums': [], 'medical_fund': [],
+        'mortgage_interest': [], 'helb': [], 'voluntary': [],
+        'weekday_ot': [], 'weekend_ot': [],
+    }
+
+    def amount(share, low, high):
+        if rng.random() >= share:
+            return 0
+        return rng.randrange(low, high) * 100
+
+    for _ in range(size):
+        salary = rng.lognormvariate(0, SALARY_SIGMA) * MEDIAN_SALARY
+        salary = min(max(salary, MIN_SALARY), MAX_SALARY)
+        sample['gross'].append(int(salary) * 100)
+        sample['pension'].append(amount(0.35, 500, 40000))
+        sample['insurance_premiums'].append(amount(0.20, 500, 40000))
+        sample['medical_fund'].append(amount(0.05, 1000, 20000))
+        sample['mortgage_interest'].append(amount(0.05, 5000, 40000))
+        sample['helb'].append(amount(0.10, 1000, 8000))
+        sample['voluntary'].append(amount(0.25, 200, 15000))
+        sample['weekday_ot'].append(Decimal(rng.randrange(0, 80)) / 4 if rng.random() < 0.40 else Decimal('0'))
+        sample['weekend_ot'].append(Decimal(rng.randrange(0, 64)) / 4 if rng.random() < 0.15 else Decimal('0'))
+    return sample
+
+
+def _taxable(sample):
+    """Taxable incomes (statutory contributions and pension relief removed) for the PAYE benchmarks"""
+    net = calculate_net_pay_batch(
+        sample['gross'], pension_cents=sample['pension'], as_of=BENCHMARK_PAY_DATE
+    )
+    return net['taxable']
+
+
+def _single(function, *columns):
+    """A loop calling `function` once per employee with Decimal shilling amounts"""
+    rows = list(zip(*columns))
+
+    def run():
+        for row in rows:
+            function(*row)
+    return run
+
+
+def _shillings(cents):
+    return [from_cents(value) for value in cents]
+
+
+def _single_benchmarks(sample):
+    gross = _shillings(sample['gross'])
+    taxable = _shillings(_taxable(sample))
+    dates = [BENCHMARK_PAY_DATE] * len(gross)
+    return {
+        'paye.single': _single(calculate_paye, taxable, dates),
+        'nssf.single': _single(calculate_nssf, gross, dates),
+        'shif.single': _single(calculate_shif, gross, dates),
+        'ahl.single': _single(calculate_ahl, gross, dates),
+        'overtime.single': _single(calculate_overtime_pay, gross, sample['weekday_ot'], sample['weekend_ot']),
+        'insurance_relief.single': _single(calculate_insurance_relief, _shillings(sample['insurance_premiums'])),
+        'medical_fund_relief.single': _single(
+            calculate_post_retirement_medical_deduction, _shillings(sample['medical_fund'])
+        ),
+        'mortgage_interest_relief.single': _single(
+            calculate_mortgage_interest_relief, _shillings(sample['mortgage_interest'])
+        ),
+    }
+
+
+def _payslip_benchmark(sample):
+    """A complete payslip per employee through DeductionGraph, as PayrollEngine computes it"""
+    rates = {
+        'nssf_rate': rate_registry.get('nssf', BENCHMARK_PAY_DATE),
+        'shif_rate': rate_registry.get('shif', BENCHMARK_PAY_DATE),
+        'ahl_rate': rate_registry.get('ahl', BENCHMARK_PAY_DATE),
+        'personal_relief': rate_registry.get('paye_relief', BENCHMARK_PAY_DATE),
+        'pension_max_relief': to_cents(PENSION_MAX_RELIEF),
+    }
+    rows = list(zip(
+        sample['gross'], sample['weekday_ot'], sample['weekend_ot'], sample['helb'], sample['pension'],
+        sample['voluntary'], sample['insurance_premiums'], sample['medical_fund'], sample['mortgage_interest']
+    ))
+
+    def run():
+        for gross, weekday, weekend, helb, pension, voluntary, premiums, medical, mortgage in rows:
+            DeductionGraph(
+                basic_gross=gross, weekday_ot=weekday, weekend_ot=weekend, helb=helb,
+                pension_contribution=pension, voluntary_deductions=voluntary,
+                insurance_premiums=premiums, medical_fund_contribution=medical,
+                mortgage_interest=mortgage, **rates
+            )['net_pay']
+    return run
+
+
+def _batch_benchmarks(sample):
+    taxable = _taxable(sample)
+    columns = {
+        'pension_cents': sample['pension'],
+        'insurance_premiums_cents': sample['insurance_premiums'],
+        'medical_fund_cents': sample['medical_fund'],
+        'mortgage_interest_cents': sample['mortgage_interest'],
+        'helb_cents': sample['helb'],
+        'voluntary_cents': sample['voluntary'],
+    }
+    benchmarks = {
+        'statutory.batch': lambda: calculate_statutory_batch(sample['gross'], taxable, BENCHMARK_PAY_DATE),
+        'net_pay.batch': lambda: calculate_net_pay_batch(sample['gross'], as_of=BENCHMARK_PAY_DATE, **columns),
+    }
+    if np is not None:
+        gross_array = np.asarray(sample['gross'], dtype=np.int64)
+        taxable_array = np.asarray(taxable, dtype=np.int64)
+        array_columns = {name: np.asarray(values, dtype=np.int64) for name, values in columns.items()}
+        benchmarks['statutory.batch_numpy'] = lambda: calculate_statutory_batch(
+            gross_array, taxable_array, BENCHMARK_PAY_DATE
+        )
+        benchmarks['net_pay.batch_numpy'] = lambda: calculate_net_pay_batch(
+            gross_array, as_of=BENCHMARK_PAY_DATE, **array_columns
+        )
+    return benchmarks
+
+
+def benchmark_functions(sample):
+    """
+    All benchmarks over one sample.
+
+    Returns:
+        dict: {benchmark_name: zero-argument callable that processes the whole sample}
+    """
+    benchmarks = _single_benchmarks(sample)
+    benchmarks['payslip.single'] = _payslip_benchmark(sample)
+    benchmarks.update(_batch_benchmarks(sample))
+    return benchmarks
+
+
+def time_benchmark(function, repeat=DEFAULT_REPEAT):
+    """Best wall time, in seconds, of `repeat` calls after one warm-up call"""
+    function()
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmarks(sample_size=DEFAULT_SAMPLE_SIZE, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED, names=None):
+    """
+    Runs the benchmarks and measures their throughput.
+
+    Args:
+        sample_size (int): Employees in the salary sample.
+        repeat (int): Timed runs per benchmark; the fastest is kept.
+        seed (int): Seed for the salary sample.
+        names (iterable, optional): Benchmark names to run (all by default).
+
+    Returns:
+        dict: {benchmark_name: employees per second}
+    """
+    sample = salary_sample(sample_size, seed)
+    benchmarks = benchmark_functions(sample)
+    if names:
+        unknown = set(names) - set(benchmarks)
+        if unknown:
+            raise KeyError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        benchmarks = {name: benchmarks[name] for name in benchmarks if name in names}
+
+    results = {}
+    for name, function in benchmarks.items():
+        elapsed = time_benchmark(function, repeat)
+        results[name] = round(sample_size / elapsed, 1) if elapsed else float('inf')
+    return results
+
+
+def benchmark_environment(sample_size, repeat, seed):
+    """Run settings and interpreter details stored alongside a baseline"""
+    return {
+        'sample_size': sample_size,
+        'repeat': repeat,
+        'seed': seed,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'numpy': getattr(np, '__version__', None),
+    }
+
+
+def load_baseline(path):
+    """
+    Reads a baseline saved by `save_baseline`.
+
+    Returns:
+        dict: The stored results, or None if there is no baseline file
+    """
+    try:
+        with open(path) as baseline_file:
+            return json.load(baseline_file)['results']
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results, environment):
+    with open(path, 'w') as baseline_file:
+        json.dump({'environment': environment, 'results': results}, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares throughput with a baseline.
+
+    Args:
+        results (dict): {benchmark_name: ops/sec} from `run_benchmarks`.
+        baseline (dict): The same mapping from an earlier run.
+        threshold (float): Allowed slowdown as a fraction, e.g. 0.2 for 20%.
+
+    Returns:
+        list: One dict per benchmark present in both (name, baseline, current,
+        change as a fraction, regressed), in the order of `results`
+    """
+    comparison = []
+    for name, current in results.items():
+        if name not in baseline or not baseline[name]:
+            continue
+        change = (current - baseline[name]) / baseline[name]
+        comparison.append({
+            'name': name,
+            'baseline': baseline[name],
+            'current': current,
+            'change': round(change, 4),
+            'regressed': change < -threshold,
+        })
+    return comparison
@@ -1,8 +1,26 @@
 # compliance/calc_ahl.py
-from decimal import Decimal
-from .rates import AHL_RATE
+from .rate_registry import rate_registry
+from .money import to_cents, from_cents, apply_rate
 
-def calculate_ahl(gross_salary):
+def calculate_ahl_cents(gross_cents, as_of=None, rate=None):
+    """
+    Calculates the Affordable Housing Levy in integer cents.
+
+    Args:
+        gross_cents (int): The employee's total gross monthly salary in cents.
+        as_of (date, optional): Pay date used to look up the rate in force.
+        rate (Decimal, optional): A rate already resolved for the pay date.
+
+    Returns:
+        tuple: The employee's and the employer's contribution in cents.
+    """
+    ahl_rate = rate if rate is not None else rate_registry.get('ahl', as_of)
+    contribution = apply_rate(gross_cents, ahl_rate)
+
+    # Both employee and employer contribute the same amount.
+    return (contribution, contribution)
+
+def calculate_ahl(gross_salary, as_of=None):
     """
     Calculates the mandatory Affordable Housing Levy (AHL) for both the employee and employer.
 
@@ -11,12 +29,11 @@ def calculate_ahl(gross_salary):
 
     Args:
         gross_salary (Decimal): The employee's total gross monthly salary.
+        as_of (date, optional): Pay date used to look up the rate in force.
 
     Returns:
-        tuple: A tuple containing the employee's contribution and the employer's contribution.
+        tuple: A tuple containing the employee's contribution and the employer's contribution,
+        each rounded to the cent.
     """
-    # The contribution is a fixed percentage of the gross salary.
-    contribution = gross_salary * AHL_RATE
-    
-    # Both employee and employer contribute the same amount.
-    return (contribution, contribution)
\ No newline at end of file
+    employee_cents, employer_cents = calculate_ahl_cents(to_cents(gross_salary), as_of)
+    return (from_cents(employee_cents), from_cents(employer_cents))
@@ -1,26 +1,40 @@
 # compliance/calc_nssf.py
-from decimal import Decimal
-from .rates import NSSF_RATE, NSSF_LOWER_EARNINGS_LIMIT, NSSF_UPPER_EARNINGS_LIMIT
+from .rates import NSSF_LOWER_EARNINGS_LIMIT, NSSF_UPPER_EARNINGS_LIMIT
+from .rate_registry import rate_registry
+from .money import to_cents, from_cents, apply_rate
 
-def calculate_nssf(gross_salary):
+NSSF_LOWER_EARNINGS_LIMIT_CENTS = to_cents(NSSF_LOWER_EARNINGS_LIMIT)
+NSSF_UPPER_EARNINGS_LIMIT_CENTS = to_cents(NSSF_UPPER_EARNINGS_LIMIT)
+
+def calculate_nssf_cents(gross_cents, as_of=None, rate=None):
+    """
+    Calculates NSSF contribution in integer cents (Tier I and Tier II).
+
+    Args:
+        gross_cents (int): The employee's gross income in cents.
+        as_of (date, optional): Pay date used to look up the rate in force.
+        rate (Decimal, optional): A rate already resolved for the pay date.
+
+    Returns:
+        int: The NSSF deduction in cents, rounded half up.
+    """
+    nssf_rate = rate if rate is not None else rate_registry.get('nssf', as_of)
+
+    # Tier I covers earnings up to the lower limit and Tier II the band from the
+    # lower to the upper limit, both at the same rate, so the contribution is the
+    # rate applied to earnings capped at the upper limit.
+    pensionable_cents = min(gross_cents, NSSF_UPPER_EARNINGS_LIMIT_CENTS)
+    return apply_rate(pensionable_cents, nssf_rate)
+
+def calculate_nssf(gross_salary, as_of=None):
     """
     Calculates NSSF contribution based on the new rates (Tier I and Tier II).
     
     Args:
         gross_salary (Decimal): The employee's gross income.
+        as_of (date, optional): Pay date used to look up the rate in force.
         
     Returns:
-        Decimal: The calculated NSSF deduction.
+        Decimal: The calculated NSSF deduction, rounded to the cent.
     """
-    nssf_deduction = Decimal('0.00')
-
-    # Tier I contribution (up to the lower earnings limit)
-    tier_i_income = min(gross_salary, NSSF_LOWER_EARNINGS_LIMIT)
-    nssf_deduction += tier_i_income * NSSF_RATE
-    
-    # Tier II contribution (from lower to upper earnings limit)
-    if gross_salary > NSSF_LOWER_EARNINGS_LIMIT:
-        tier_ii_income = min(gross_salary - NSSF_LOWER_EARNINGS_LIMIT, NSSF_UPPER_EARNINGS_LIMIT - NSSF_LOWER_EARNINGS_LIMIT)
-        nssf_deduction += tier_ii_income * NSSF_RATE
-    
-    return nssf_deduction
\ No newline at end of file
+    return from_cents(calculate_nssf_cents(to_cents(gross_salary), as_of))
@@ -1,10 +1,35 @@
 # compliance/calc_overtime.py
-from decimal import Decimal
+from fractions import Fraction
 from .rates import (
     MONTHLY_WORKING_HOURS,
     OVERTIME_WEEKDAY_MULTIPLIER,
     OVERTIME_WEEKEND_MULTIPLIER
 )
+from .money import to_cents, from_cents, apply_rate
+
+def calculate_overtime_pay_cents(gross_cents, weekday_hours, weekend_hours):
+    """
+    Calculates total overtime pay in integer cents.
+
+    Args:
+        gross_cents (int): The employee's gross monthly salary in cents.
+        weekday_hours (Decimal): The number of overtime hours worked on normal weekdays.
+        weekend_hours (Decimal): The number of overtime hours worked on rest days or public holidays.
+
+    Returns:
+        int: The total overtime pay in cents, rounded half up.
+    """
+    # If no overtime hours were worked, or the salary is zero, there is nothing to pay.
+    if (weekday_hours <= 0 and weekend_hours <= 0) or gross_cents <= 0:
+        return 0
+
+    # Hourly rate = salary / monthly hours; the multipliers are applied to that rate.
+    # The combined factor is kept exact so the pay is rounded only once.
+    overtime_factor = (
+        Fraction(weekday_hours) * Fraction(OVERTIME_WEEKDAY_MULTIPLIER) +
+        Fraction(weekend_hours) * Fraction(OVERTIME_WEEKEND_MULTIPLIER)
+    ) / Fraction(MONTHLY_WORKING_HOURS)
+    return apply_rate(gross_cents, overtime_factor)
 
 def calculate_overtime_pay(gross_salary, weekday_hours, weekend_hours):
     """
@@ -16,24 +41,6 @@ def calculate_overtime_pay(gross_salary, weekday_hours, weekend_hours):
         weekend_hours (Decimal): The number of overtime hours worked on rest days or public holidays.
 
     Returns:
-        Decimal: The total overtime pay for the period.
+        Decimal: The total overtime pay for the period, rounded to the cent.
     """
-    # If no overtime hours were worked, return 0.
-    if weekday_hours <= 0 and weekend_hours <= 0:
-        return Decimal('0.00')
-
-    # Handle the edge case of a zero gross salary to prevent a ZeroDivisionError.
-    if gross_salary <= 0:
-        return Decimal('0.00')
-    
-    # Calculate the base hourly rate using the constant from rates.py.
-    normal_hourly_rate = gross_salary / MONTHLY_WORKING_HOURS
-    
-    # Calculate pay for weekday overtime.
-    weekday_ot_pay = weekday_hours * normal_hourly_rate * OVERTIME_WEEKDAY_MULTIPLIER
-    
-    # Calculate pay for weekend/holiday overtime.
-    weekend_ot_pay = weekend_hours * normal_hourly_rate * OVERTIME_WEEKEND_MULTIPLIER
-    
-    # Return the sum of all overtime pay.
-    return weekday_ot_pay + weekend_ot_pay
\ No newline at end of file
+    return from_cents(calculate_overtime_pay_cents(to_cents(gross_salary), weekday_hours, weekend_hours))
@@ -1,35 +1,35 @@
 # compliance/calc_paye.py
-from decimal import Decimal
-from .rates import PAYE_RATES, PAYE_PERSONAL_RELIEF
+from .tax_schedule import MONTHLY_PAYE_SCHEDULE
+from .rate_registry import rate_registry
+from .money import to_cents, from_cents
 
-def calculate_paye(taxable_income):
+def calculate_paye_cents(taxable_cents, as_of=None, personal_relief=None):
+    """
+    Calculates PAYE in integer cents.
+
+    Args:
+        taxable_cents (int): The employee's taxable income in cents.
+        as_of (date, optional): Pay date used to look up the personal relief in force.
+        personal_relief (Decimal, optional): A relief already resolved for the pay date.
+
+    Returns:
+        int: The PAYE tax in cents, rounded half up.
+    """
+    # The compiled schedule applies the bands exactly and subtracts personal
+    # relief; the result is rounded once, to the cent. PAYE cannot be negative.
+    if personal_relief is None:
+        personal_relief = rate_registry.get('paye_relief', as_of)
+    return to_cents(MONTHLY_PAYE_SCHEDULE.tax_after_relief(from_cents(taxable_cents), personal_relief))
+
+def calculate_paye(taxable_income, as_of=None):
     """
     Calculates PAYE based on the current Kenyan tax bands.
-    
+
     Args:
         taxable_income (Decimal): The employee's income after all deductions.
-        
+        as_of (date, optional): Pay date used to look up the personal relief in force.
+
     Returns:
-        Decimal: The calculated PAYE tax.
+        Decimal: The calculated PAYE tax, rounded to the cent.
     """
-    paye = Decimal('0.00')
-    remaining_income = taxable_income
-    
-    for band_limit, rate in PAYE_RATES:
-        if remaining_income <= Decimal('0'):
-            break
-            
-        # Handle the `inf` case for the highest tax band
-        if band_limit == Decimal('inf'):
-            taxable_in_band = remaining_income
-        else:
-            taxable_in_band = min(remaining_income, band_limit)
-        
-        paye += taxable_in_band * rate
-        remaining_income -= taxable_in_band
-        
-    # Subtract personal relief from the total PAYE
-    final_paye = paye - PAYE_PERSONAL_RELIEF
-    
-    # PAYE cannot be negative
-    return max(final_paye, Decimal('0.00'))
\ No newline at end of file
+    return from_cents(calculate_paye_cents(to_cents(taxable_income), as_of))
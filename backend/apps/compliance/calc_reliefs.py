@@ -1,9 +1,27 @@
 # compliance/calc_reliefs.py
-from decimal import Decimal
 from .rates import (
     INSURANCE_RELIEF_RATE, INSURANCE_RELIEF_MAX_MONTHLY,
     POST_RETIREMENT_MEDICAL_MAX, MORTGAGE_INTEREST_MAX
 )
+from .money import to_cents, from_cents, apply_rate
+
+INSURANCE_RELIEF_MAX_MONTHLY_CENTS = to_cents(INSURANCE_RELIEF_MAX_MONTHLY)
+POST_RETIREMENT_MEDICAL_MAX_CENTS = to_cents(POST_RETIREMENT_MEDICAL_MAX)
+MORTGAGE_INTEREST_MAX_CENTS = to_cents(MORTGAGE_INTEREST_MAX)
+
+def calculate_insurance_relief_cents(premiums_cents):
+    """Insurance relief in cents: 15% of premiums, rounded half up, capped monthly."""
+    if premiums_cents <= 0:
+        return 0
+    return min(apply_rate(premiums_cents, INSURANCE_RELIEF_RATE), INSURANCE_RELIEF_MAX_MONTHLY_CENTS)
+
+def calculate_post_retirement_medical_deduction_cents(contribution_cents):
+    """Allowable post-retirement medical fund deduction in cents, capped monthly."""
+    return min(max(contribution_cents, 0), POST_RETIREMENT_MEDICAL_MAX_CENTS)
+
+def calculate_mortgage_interest_relief_cents(interest_cents):
+    """Allowable mortgage interest relief in cents, capped monthly."""
+    return min(max(interest_cents, 0), MORTGAGE_INTEREST_MAX_CENTS)
 
 def calculate_insurance_relief(insurance_premiums_paid):
     """
@@ -15,14 +33,7 @@ def calculate_insurance_relief(insurance_premiums_paid):
     Returns:
         Decimal: The calculated insurance relief amount.
     """
-    if insurance_premiums_paid <= Decimal('0'):
-        return Decimal('0.00')
-    
-    # Calculate 15% of premiums paid
-    relief_amount = insurance_premiums_paid * INSURANCE_RELIEF_RATE
-    
-    # Cap at maximum monthly relief
-    return min(relief_amount, INSURANCE_RELIEF_MAX_MONTHLY)
+    return from_cents(calculate_insurance_relief_cents(to_cents(insurance_premiums_paid)))
 
 def calculate_post_retirement_medical_deduction(medical_fund_contribution):
     """
@@ -34,11 +45,7 @@ def calculate_post_retirement_medical_deduction(medical_fund_contribution):
     Returns:
         Decimal: The allowable deduction amount.
     """
-    if medical_fund_contribution <= Decimal('0'):
-        return Decimal('0.00')
-    
-    # Cap at maximum monthly deduction
-    return min(medical_fund_contribution, POST_RETIREMENT_MEDICAL_MAX)
+    return from_cents(calculate_post_retirement_medical_deduction_cents(to_cents(medical_fund_contribution)))
 
 def calculate_mortgage_interest_relief(mortgage_interest_paid):
     """
@@ -50,8 +57,4 @@ def calculate_mortgage_interest_relief(mortgage_interest_paid):
     Returns:
         Decimal: The allowable relief amount.
     """
-    if mortgage_interest_paid <= Decimal('0'):
-        return Decimal('0.00')
-    
-    # Cap at maximum monthly relief
-    return min(mortgage_interest_paid, MORTGAGE_INTEREST_MAX)
\ No newline at end of file
+    return from_cents(calculate_mortgage_interest_relief_cents(to_cents(mortgage_interest_paid)))
\ No newline at end of file
@@ -1,8 +1,29 @@
 # compliance/calc_shif.py
-from decimal import Decimal
-from .rates import SHIF_RATE, SHIF_MINIMUM_CONTRIBUTION
+from .rates import SHIF_MINIMUM_CONTRIBUTION
+from .rate_registry import rate_registry
+from .money import to_cents, from_cents, apply_rate
 
-def calculate_shif(gross_salary):
+SHIF_MINIMUM_CONTRIBUTION_CENTS = to_cents(SHIF_MINIMUM_CONTRIBUTION)
+
+def calculate_shif_cents(gross_cents, as_of=None, rate=None):
+    """
+    Calculates the SHIF contribution in integer cents.
+
+    Args:
+        gross_cents (int): The employee's gross monthly salary in cents.
+        as_of (date, optional): Pay date used to look up the rate in force.
+        rate (Decimal, optional): A rate already resolved for the pay date.
+
+    Returns:
+        int: The SHIF contribution in cents, rounded half up.
+    """
+    shif_rate = rate if rate is not None else rate_registry.get('shif', as_of)
+    shif_contribution = apply_rate(gross_cents, shif_rate)
+
+    # The employee pays the higher of the calculated amount or the minimum.
+    return max(shif_contribution, SHIF_MINIMUM_CONTRIBUTION_CENTS)
+
+def calculate_shif(gross_salary, as_of=None):
     """
     Calculates the Social Health Insurance Fund (SHIF) contribution for a salaried employee.
 
@@ -11,15 +32,9 @@ def calculate_shif(gross_salary):
 
     Args:
         gross_salary (Decimal): The employee's gross monthly salary.
+        as_of (date, optional): Pay date used to look up the rate in force.
 
     Returns:
-        Decimal: The final SHIF contribution amount to be deducted.
+        Decimal: The final SHIF contribution amount to be deducted, rounded to the cent.
     """
-    # Calculate the contribution based on the fixed rate
-    shif_contribution = gross_salary * SHIF_RATE
-    
-    # Apply the minimum contribution rule. The employee pays the higher of the
-    # calculated amount or the minimum.
-    final_shif_contribution = max(shif_contribution, SHIF_MINIMUM_CONTRIBUTION)
-    
-    return final_shif_contribution
\ No newline at end of file
+    return from_cents(calculate_shif_cents(to_cents(gross_salary), as_of))
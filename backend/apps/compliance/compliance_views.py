@@ -4,6 +4,7 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.utils import timezone
 from .models import StatutoryRate
 from .serializers import StatutoryRateSerializer
 
@@ -48,14 +49,16 @@ class StatutoryRateViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def current_rates(self, request):
         """
-        Get the current active rates for all statutory deductions
+        Get the rates in force today for all statutory deductions
         """
         rates = {}
+        today = timezone.localdate()
         for rate_type, _ in StatutoryRate.RATE_TYPES:
             try:
                 rate = StatutoryRate.objects.filter(
                     rate_type=rate_type, 
-                    is_active=True
+                    is_active=True,
+                    effective_date__lte=today
                 ).first()
                 if rate:
                     rates[rate_type] = {
@@ -73,7 +76,11 @@ class StatutoryRateViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
         """
-        Update multiple statutory rates at once
+        Update multiple statutory rates at once.
+        
+        Rates are effective-dated: passing `effective_date` creates (or edits) the
+        rate taking effect on that date, leaving earlier periods untouched.
+        Without it, the latest existing rate of each type is edited in place.
         """
         if not request.user.is_superuser:
             return Response(
@@ -86,16 +93,21 @@ class StatutoryRateViewSet(viewsets.ModelViewSet):
         
         for rate_type, rate_value in rates_data.items():
             if rate_type in [choice[0] for choice in StatutoryRate.RATE_TYPES]:
-                # Convert percentage to decimal if needed
-                if isinstance(rate_value, (int, float)) and rate_value > 1:
+                # Convert percentage to decimal if needed (personal relief is an amount, not a rate)
+                if rate_type != 'paye_relief' and isinstance(rate_value, (int, float)) and rate_value > 1:
                     rate_value = rate_value / 100
                 
+                effective_date = request.data.get('effective_date')
+                if not effective_date:
+                    latest = StatutoryRate.objects.filter(rate_type=rate_type).first()
+                    effective_date = latest.effective_date if latest else '2024-01-01'
+                
+                # Saving bumps the rate version, so every worker reloads its rate registry
                 rate, created = StatutoryRate.objects.update_or_create(
                     rate_type=rate_type,
+                    effective_date=effective_date,
                     defaults={
                         'rate_value': rate_value,
-                        'effective_date': request.data.get('effective_date', 
-                                                         StatutoryRate.objects.filter(rate_type=rate_type).first().effective_date if StatutoryRate.objects.filter(rate_type=rate_type).exists() else '2024-01-01'),
                         'is_active': True
                     }
                 )
@@ -103,6 +115,7 @@ class StatutoryRateViewSet(viewsets.ModelViewSet):
                     'rate_type': rate_type,
                     'rate_value': float(rate.rate_value),
                     'rate_percentage': float(rate.rate_value * 100),
+                    'effective_date': rate.effective_date,
                     'created': created
                 })
         
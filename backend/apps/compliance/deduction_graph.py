@@ -0,0 +1,200 @@
+# compliance/deduction_graph.py
+"""
+The payroll calculation as a lazily evaluated dependency graph.
+
+Each deduction is a named node computed from its inputs and from other
+nodes, all in integer cents. Nothing is computed until a node is read, and
+changing an input only discards the nodes downstream of it, so a what-if
+edit (e.g. a new insurance premium) recomputes insurance relief, PAYE after
+relief and net pay but leaves NSSF, SHIF, AHL and taxable income cached.
+
+    graph = DeductionGraph(basic_gross=15000000, nssf_rate=..., ...)
+    graph['net_pay']
+    graph.update(insurance_premiums=300000)
+    graph['net_pay']    # only the insurance relief chain is re-evaluated
+"""
+from decimal import Decimal
+
+from .calc_paye import calculate_paye_cents
+from .calc_nssf import calculate_nssf_cents
+from .calc_shif import calculate_shif_cents
+from .calc_ahl import calculate_ahl_cents
+from .calc_overtime import calculate_overtime_pay_cents
+from .calc_reliefs import (
+    calculate_insurance_relief_cents,
+    calculate_post_retirement_medical_deduction_cents,
+    calculate_mortgage_interest_relief_cents
+)
+
+# Inputs and their defaults. Rates are resolved by the caller for the pay date.
+INPUTS = {
+    'basic_gross': 0,
+    'weekday_ot': Decimal('0.00'),
+    'weekend_ot': Decimal('0.00'),
+    'helb': 0,
+    'pension_contribution': 0,
+    'voluntary_deductions': 0,
+    'insurance_premiums': 0,
+    'medical_fund_contribution': 0,
+    'mortgage_interest': 0,
+    'nssf_rate': None,
+    'shif_rate': None,
+    'ahl_rate': None,
+    'personal_relief': None,
+    'pension_max_relief': 0,
+}
+
+# name: (dependencies, function of those dependencies in order)
+NODES = {
+    'overtime': (
+        ('basic_gross', 'weekday_ot', 'weekend_ot'),
+        calculate_overtime_pay_cents
+    ),
+    'gross': (
+        ('basic_gross', 'overtime'),
+        lambda basic_gross, overtime: basic_gross + overtime
+    ),
+    'nssf': (
+        ('gross', 'nssf_rate'),
+        lambda gross, rate: calculate_nssf_cents(gross, rate=rate)
+    ),
+    'shif': (
+        ('gross', 'shif_rate'),
+        lambda gross, rate: calculate_shif_cents(gross, rate=rate)
+    ),
+    'ahl': (
+        ('gross', 'ahl_rate'),
+        lambda gross, rate: calculate_ahl_cents(gross, rate=rate)[0]
+    ),
+    # Both employee and employer contribute the same levy
+    'ahl_employer': (
+        ('ahl',),
+        lambda ahl: ahl
+    ),
+    # Only contributions up to the monthly cap are tax-deductible
+    'pension_relief': (
+        ('pension_contribution', 'pension_max_relief'),
+        lambda contribution, cap: min(max(contribution, 0), cap)
+    ),
+    'medical_fund_relief': (
+        ('medical_fund_contribution',),
+        calculate_post_retirement_medical_deduction_cents
+    ),
+    'mortgage_interest_relief': (
+        ('mortgage_interest',),
+        calculate_mortgage_interest_relief_cents
+    ),
+    'taxable_income': (
+        ('gross', 'nssf', 'shif', 'ahl', 'pension_relief', 'medical_fund_relief', 'mortgage_interest_relief'),
+        lambda gross, *allowable: max(gross - sum(allowable), 0)
+    ),
+    'paye': (
+        ('taxable_income', 'personal_relief'),
+        lambda taxable, relief: calculate_paye_cents(taxable, personal_relief=relief)
+    ),
+    'insurance_relief': (
+        ('insurance_premiums',),
+        calculate_insurance_relief_cents
+    ),
+    'paye_after_relief': (
+        ('paye', 'insurance_relief'),
+        lambda paye, relief: max(paye - relief, 0)
+    ),
+    'total_statutory': (
+        ('paye_after_relief', 'nssf', 'shif', 'ahl', 'helb'),
+        lambda *amounts: sum(amounts)
+    ),
+    # The full pension contribution is deducted from pay; only the capped
+    # relief is reflected in PAYE
+    'total_deductions': (
+        ('total_statutory', 'voluntary_deductions', 'pension_contribution'),
+        lambda statutory, voluntary, pension: statutory + voluntary + max(pension, 0)
+    ),
+    'net_pay': (
+        ('gross', 'total_deductions'),
+        lambda gross, deductions: max(gross - deductions, 0)
+    ),
+}
+
+
+def _dependents():
+    """Direct dependents of every input and node"""
+    dependents = {name: [] for name in list(INPUTS) + list(NODES)}
+    for name, (dependencies, _) in NODES.items():
+        for dependency in dependencies:
+            dependents[dependency].append(name)
+    return dependents
+
+
+DEPENDENTS = _dependents()
+
+
+class DeductionGraph:
+    """
+    Lazily evaluated payslip calculation for one employee.
+
+    Node values are cached until an input they depend on changes. The
+    `evaluations` counter records how many node functions have run, which
+    shows how much work an update actually caused.
+    """
+
+    def __init__(self, **inputs):
+        unknown = set(inputs) - set(INPUTS)
+        if unknown:
+            raise KeyError(f"Unknown deduction graph inputs: {', '.join(sorted(unknown))}")
+        self._inputs = dict(INPUTS, **inputs)
+        self._values = {}
+        self.evaluations = 0
+
+    def __getitem__(self, name):
+        if name in self._inputs:
+            return self._inputs[name]
+        if name not in self._values:
+            dependencies, function = NODES[name]
+            self._values[name] = function(*(self[dependency] for dependency in dependencies))
+            self.evaluations += 1
+        return self._values[name]
+
+    def copy(self):
+        """A new graph with the same inputs that starts from this one's cached values"""
+        graph = DeductionGraph.__new__(DeductionGraph)
+        graph._inputs = dict(self._inputs)
+        graph._values = dict(self._values)
+        graph.evaluations = 0
+        return graph
+
+    def update(self, **inputs):
+        """
+        Changes inputs and discards every cached node downstream of them.
+
+        Returns:
+            set: The names of the nodes that were invalidated
+        """
+        invalidated = set()
+        for name, value in inputs.items():
+            if name not in INPUTS:
+                raise KeyError(f"Unknown deduction graph input: {name}")
+            if self._inputs[name] == value:
+                continue
+            self._inputs[name] = value
+            self._invalidate(name, invalidated)
+        return invalidated
+
+    def _invalidate(self, name, invalidated):
+        for dependent in DEPENDENTS[name]:
+            if dependent not in invalidated:
+                invalidated.add(dependent)
+                self._values.pop(dependent, None)
+                self._invalidate(dependent, invalidated)
+
+    def evaluate(self, names=None):
+        """
+        Returns the values of the given nodes (all nodes by default).
+
+        Args:
+            names (iterable, optional): Node names to evaluate.
+
+        Returns:
+            dict: {node_name: value}
+        """
+        return {name: self[name] for name in (names or NODES)}
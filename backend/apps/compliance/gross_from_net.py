@@ -0,0 +1,170 @@
+# compliance/gross_from_net.py
+"""
+Gross-from-net solver.
+
+With the reliefs and voluntary deductions held fixed, net pay is a
+piecewise-linear, strictly increasing function of gross pay. Its kinks are at
+the NSSF upper earnings limit, where the SHIF minimum stops applying, where
+taxable income reaches zero and each PAYE band threshold, and where PAYE
+exceeds the personal and insurance reliefs.
+
+`GrossFromNetSolver` finds those breakpoints once. It then answers any
+target net pay with one bisect over the segments and a closed-form solve on
+the segment found. The exact answer is rounded up to the cent and checked
+against the rounded calculation in `DeductionGraph`, moving at most a few
+cents so that the returned gross is the smallest one whose net pay reaches
+the target.
+"""
+from bisect import bisect_right
+from fractions import Fraction
+from math import ceil
+
+from .calc_nssf import NSSF_UPPER_EARNINGS_LIMIT_CENTS
+from .calc_shif import SHIF_MINIMUM_CONTRIBUTION_CENTS
+from .deduction_graph import DeductionGraph
+from .tax_schedule import MONTHLY_PAYE_SCHEDULE
+
+# Rounding moves the exact answer by a cent or two; this bounds the search
+MAX_ROUNDING_STEPS = 100
+
+
+def _cents(amount):
+    """Shillings (Decimal) to exact Fraction cents"""
+    return Fraction(amount) * 100
+
+
+class GrossFromNetSolver:
+    """
+    Solves for the gross salary that produces a given net pay.
+
+    Args:
+        **inputs: DeductionGraph inputs other than `basic_gross` and overtime:
+            rates (nssf_rate, shif_rate, ahl_rate, personal_relief,
+            pension_max_relief) and the fixed per-employee amounts in cents.
+    """
+
+    def __init__(self, **inputs):
+        if {'basic_gross', 'weekday_ot', 'weekend_ot'} & set(inputs):
+            raise KeyError('basic_gross and overtime are solved for, not inputs')
+        self.graph = DeductionGraph(**inputs)
+
+        graph = self.graph
+        self.nssf_rate = Fraction(graph['nssf_rate'])
+        self.shif_rate = Fraction(graph['shif_rate'])
+        self.ahl_rate = Fraction(graph['ahl_rate'])
+
+        # Amounts that do not depend on gross pay
+        self.allowable = (
+            graph['pension_relief'] + graph['medical_fund_relief'] + graph['mortgage_interest_relief']
+        )
+        self.tax_free = _cents(graph['personal_relief']) + graph['insurance_relief']
+        self.fixed_deductions = graph['helb'] + graph['voluntary_deductions'] + max(graph['pension_contribution'], 0)
+
+        self.tax_thresholds = [_cents(threshold) for threshold in MONTHLY_PAYE_SCHEDULE.thresholds]
+        self.tax_base = [_cents(base) for base in MONTHLY_PAYE_SCHEDULE.base_tax]
+        self.tax_rates = [Fraction(rate) for rate in MONTHLY_PAYE_SCHEDULE.rates]
+
+        self.breakpoints = self._breakpoints()
+        self.net_at_breakpoints = [self.exact_net(gross) for gross in self.breakpoints]
+
+    # --- exact (unrounded) piecewise-linear model ---
+
+    def _contributions(self, gross):
+        nssf = self.nssf_rate * min(gross, NSSF_UPPER_EARNINGS_LIMIT_CENTS)
+        shif = max(self.shif_rate * gross, SHIF_MINIMUM_CONTRIBUTION_CENTS)
+        ahl = self.ahl_rate * gross
+        return nssf + shif + ahl
+
+    def _taxable(self, gross):
+        """Taxable income before it is floored at zero"""
+        return gross - self._contributions(gross) - self.allowable
+
+    def _tax(self, taxable):
+        if taxable <= 0:
+            return Fraction(0)
+        band = bisect_right(self.tax_thresholds, taxable) - 1
+        return self.tax_base[band] + (taxable - self.tax_thresholds[band]) * self.tax_rates[band]
+
+    def _tax_inverse(self, tax):
+        """Taxable income at which the band tax reaches `tax`"""
+        band = bisect_right(self.tax_base, tax) - 1
+        return self.tax_thresholds[band] + (tax - self.tax_base[band]) / self.tax_rates[band]
+
+    def exact_net(self, gross):
+        """Net pay in exact cents before any rounding, not floored at zero"""
+        paye = max(self._tax(max(self._taxable(gross), 0)) - self.tax_free, 0)
+        return gross - self._contributions(gross) - paye - self.fixed_deductions
+
+    def _taxable_inverse(self, taxable, kinks):
+        """Gross pay at which taxable income (before flooring) reaches `taxable`"""
+        points = [Fraction(0)] + kinks
+        values = [self._taxable(point) for point in points]
+        segment = max(bisect_right(values, taxable) - 1, 0)
+        low = points[segment]
+        slope = self._taxable(low + 1) - values[segment]
+        return low + (taxable - values[segment]) / slope
+
+    def _breakpoints(self):
+        # Kinks of the contributions: NSSF cap and the end of the SHIF minimum
+        kinks = sorted({
+            Fraction(NSSF_UPPER_EARNINGS_LIMIT_CENTS),
+            Fraction(SHIF_MINIMUM_CONTRIBUTION_CENTS) / self.shif_rate,
+        })
+        # Kinks of PAYE, mapped from taxable income back to gross pay
+        taxable_kinks = set(self.tax_thresholds) | {self._tax_inverse(self.tax_free)}
+        gross_kinks = {self._taxable_inverse(taxable, kinks) for taxable in taxable_kinks}
+        return sorted({Fraction(0)} | set(kinks) | {gross for gross in gross_kinks if gross > 0})
+
+    def exact_gross(self, net_cents):
+        """
+        Gross pay (exact cents) whose unrounded net pay equals `net_cents`.
+        """
+        net = Fraction(net_cents)
+        segment = max(bisect_right(self.net_at_breakpoints, net) - 1, 0)
+        low = self.breakpoints[segment]
+        if segment + 1 < len(self.breakpoints):
+            high = self.breakpoints[segment + 1]
+            slope = (self.net_at_breakpoints[segment + 1] - self.net_at_breakpoints[segment]) / (high - low)
+        else:
+            slope = self.exact_net(low + 1) - self.net_at_breakpoints[segment]
+        return low + (net - self.net_at_breakpoints[segment]) / slope
+
+    # --- rounded results ---
+
+    def net_cents(self, gross_cents):
+        """Net pay in cents exactly as a payslip would show it"""
+        self.graph.update(basic_gross=gross_cents)
+        return self.graph['net_pay']
+
+    def solve(self, net_cents):
+        """
+        Smallest gross salary, in cents, whose payslip net pay is at least `net_cents`.
+
+        Args:
+            net_cents (int): The target net pay in cents (must be positive).
+
+        Returns:
+            int: The gross salary in cents.
+        """
+        if net_cents <= 0:
+            raise ValueError('Target net pay must be greater than 0')
+        gross = max(ceil(self.exact_gross(net_cents)), 0)
+
+        for _ in range(MAX_ROUNDING_STEPS):
+            if self.net_cents(gross) >= net_cents:
+                break
+            gross += 1
+        for _ in range(MAX_ROUNDING_STEPS):
+            if gross == 0 or self.net_cents(gross - 1) < net_cents:
+                break
+            gross -= 1
+        return gross
+
+    def solve_many(self, targets):
+        """
+        Solves a list of target net pays with the same breakpoints.
+
+        Returns:
+            list: Gross salaries in cents, in the order of `targets`
+        """
+        return [self.solve(net_cents) for net_cents in targets]
@@ -0,0 +1,126 @@
+# apps/compliance/management/commands/benchmark_compliance.py
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.compliance.benchmarks import (
+    DEFAULT_SAMPLE_SIZE, DEFAULT_REPEAT, DEFAULT_SEED, DEFAULT_THRESHOLD,
+    run_benchmarks, benchmark_environment, load_baseline, save_baseline, compare_to_baseline
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the statutory calculators and fail if throughput regressed against the stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sample-size',
+            type=int,
+            default=DEFAULT_SAMPLE_SIZE,
+            help=f'Employees in the synthetic salary sample (default: {DEFAULT_SAMPLE_SIZE})'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=DEFAULT_REPEAT,
+            help=f'Timed runs per benchmark; the fastest is kept (default: {DEFAULT_REPEAT})'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=DEFAULT_SEED,
+            help=f'Seed for the salary sample (default: {DEFAULT_SEED})'
+        )
+        parser.add_argument(
+            '--benchmark',
+            action='append',
+            dest='benchmarks',
+            help='Run only this benchmark (repeatable, e.g. --benchmark paye.single)'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            default=str(Path(settings.BASE_DIR) / 'benchmarks' / 'compliance_baseline.json'),
+            help='Baseline file to compare against (default: benchmarks/compliance_baseline.json)'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help=f'Allowed slowdown before failing, as a fraction (default: {DEFAULT_THRESHOLD})'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Store these results as the new baseline instead of comparing'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print machine-readable results'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            results = run_benchmarks(
+                sample_size=options['sample_size'],
+                repeat=options['repeat'],
+                seed=options['seed'],
+                names=options['benchmarks']
+            )
+        except KeyError as e:
+            raise CommandError(str(e))
+
+        baseline_path = Path(options['baseline'])
+        environment = benchmark_environment(options['sample_size'], options['repeat'], options['seed'])
+
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            save_baseline(baseline_path, results, environment)
+            if options['json']:
+                self.stdout.write(json.dumps({'environment': environment, 'results': results}, indent=2))
+            else:
+                self._write_results(results)
+                self.stdout.write(self.style.SUCCESS(f'✅ Baseline saved to {baseline_path}'))
+            return
+
+        baseline = load_baseline(baseline_path)
+        comparison = compare_to_baseline(results, baseline, options['threshold']) if baseline else []
+        regressions = [row for row in comparison if row['regressed']]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'environment': environment,
+                'threshold': options['threshold'],
+                'results': results,
+                'comparison': comparison,
+                'regressed': bool(regressions),
+            }, indent=2))
+        else:
+            self._write_results(results, comparison)
+            if baseline is None:
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️  No baseline at {baseline_path}; run with --save-baseline to create one'
+                ))
+
+        if regressions:
+            names = ', '.join(row['name'] for row in regressions)
+            raise CommandError(
+                f"Throughput regressed more than {options['threshold']:.0%} against the baseline: {names}"
+            )
+        if baseline is not None and not options['json']:
+            self.stdout.write(self.style.SUCCESS('✅ No benchmark regressed beyond the threshold'))
+
+    def _write_results(self, results, comparison=()):
+        changes = {row['name']: row for row in comparison}
+        self.stdout.write(f'📊 {"Benchmark":<34}{"employees/sec":>16}{"vs baseline":>14}')
+        for name, ops in results.items():
+            row = changes.get(name)
+            change = f"{row['change']:+.1%}" if row else '-'
+            line = f'   {name:<34}{ops:>16,.0f}{change:>14}'
+            if row and row['regressed']:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatutoryRateVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Statutory Rate Version',
+            },
+        ),
+        migrations.AlterField(
+            model_name='statutoryrate',
+            name='rate_type',
+            field=models.CharField(choices=[('nssf', 'NSSF Rate'), ('shif', 'SHIF Rate'), ('ahl', 'AHL Rate'), ('paye_relief', 'PAYE Personal Relief')], max_length=20),
+        ),
+        migrations.AlterUniqueTogether(
+            name='statutoryrate',
+            unique_together={('rate_type', 'effective_date')},
+        ),
+    ]
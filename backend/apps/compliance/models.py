@@ -1,8 +1,31 @@
 # apps/compliance/models.py
 
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from decimal import Decimal
 
+
+class StatutoryRateQuerySet(models.QuerySet):
+    """
+    Bulk writes skip save() and the model signals, so they bump the rate
+    version themselves
+    """
+
+    def update(self, **kwargs):
+        updated = super().update(**kwargs)
+        if updated:
+            StatutoryRateVersion.bump()
+        return updated
+
+    def bulk_create(self, *args, **kwargs):
+        created = super().bulk_create(*args, **kwargs)
+        if created:
+            StatutoryRateVersion.bump()
+        return created
+
+
 class StatutoryRate(models.Model):
     """
     Model to store configurable statutory deduction rates
@@ -14,7 +37,7 @@ class StatutoryRate(models.Model):
         ('paye_relief', 'PAYE Personal Relief'),
     )
     
-    rate_type = models.CharField(max_length=20, choices=RATE_TYPES, unique=True)
+    rate_type = models.CharField(max_length=20, choices=RATE_TYPES)
     rate_value = models.DecimalField(max_digits=8, decimal_places=4, help_text="Rate as decimal (e.g., 0.06 for 6%)")
     description = models.TextField(blank=True, null=True)
     effective_date = models.DateField(help_text="Date when this rate becomes effective")
@@ -22,8 +45,51 @@ class StatutoryRate(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = StatutoryRateQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-effective_date']
+        unique_together = ['rate_type', 'effective_date']
         
     def __str__(self):
-        return f"{self.get_rate_type_display()}: {self.rate_value}"
\ No newline at end of file
+        return f"{self.get_rate_type_display()}: {self.rate_value}"
+
+
+class StatutoryRateVersion(models.Model):
+    """
+    Single-row counter incremented whenever a statutory rate is saved or deleted.
+    The rate registry compares it with the version it loaded to decide when to reload.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Statutory Rate Version'
+    
+    def __str__(self):
+        return f"Statutory rates version {self.version}"
+    
+    @classmethod
+    def current(cls):
+        """Return the current version number (0 if no rate has ever been saved)"""
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+    
+    @classmethod
+    def bump(cls):
+        """Atomically increment the version and drop this process's cached rates"""
+        if not cls.objects.filter(pk=1).update(version=F('version') + 1):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
+        
+        from .rate_registry import rate_registry
+        rate_registry.invalidate()
+
+
+@receiver(post_save, sender=StatutoryRate)
+@receiver(post_delete, sender=StatutoryRate)
+def bump_statutory_rate_version(sender, **kwargs):
+    """
+    Tell every worker process that its cached rates are stale.
+
+    post_delete also fires for queryset and admin bulk deletes, which
+    delete row by row while the signal is connected.
+    """
+    StatutoryRateVersion.bump()
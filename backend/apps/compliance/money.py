@@ -0,0 +1,77 @@
+# compliance/money.py
+"""
+Integer-cents fixed-point money helpers for the payroll hot path.
+
+Amounts are carried as Python ints counting cents. Rates are applied with
+exact integer arithmetic and each statutory amount is rounded once, to the
+nearest cent with halves rounded away from zero (ROUND_HALF_UP), before it is
+added to any total. Because every line is rounded before summing, run totals
+always equal the sum of the payslips.
+
+Convert with `to_cents` when reading Decimals from the database or a request,
+and with `from_cents` when writing them back to a model or a response.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+CENT = Decimal('0.01')
+
+
+def to_cents(amount):
+    """
+    Converts a money amount to integer cents, rounding half up.
+
+    Args:
+        amount (Decimal | int | str | float | None): The amount in shillings.
+
+    Returns:
+        int: The amount in cents (0 for None).
+    """
+    if amount is None:
+        return 0
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    return int(amount.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_cents(cents):
+    """
+    Converts integer cents back to a two-decimal-place Decimal.
+
+    Args:
+        cents (int): The amount in cents.
+
+    Returns:
+        Decimal: The amount in shillings, e.g. Decimal('1234.50').
+    """
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def quantize(amount):
+    """Rounds a Decimal amount to the cent using the payroll rounding rule."""
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def round_half_up(numerator, denominator):
+    """
+    Divides two ints and rounds the quotient to the nearest int, halves away from zero.
+    """
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    if numerator >= 0:
+        return (2 * numerator + denominator) // (2 * denominator)
+    return -((-2 * numerator + denominator) // (2 * denominator))
+
+
+def apply_rate(cents, rate):
+    """
+    Multiplies an amount in cents by a rate and rounds to the cent.
+
+    Args:
+        cents (int): The base amount in cents.
+        rate (Decimal | Fraction | int): The exact rate, e.g. Decimal('0.0275').
+
+    Returns:
+        int: The rounded product in cents.
+    """
+    numerator, denominator = rate.as_integer_ratio()
+    return round_half_up(cents * numerator, denominator)
@@ -0,0 +1,170 @@
+# compliance/rate_registry.py
+"""
+In-process registry of effective-dated statutory rates.
+
+Rates edited through `StatutoryRate` are loaded from the database once per
+process and served from memory. Each process re-reads the single-row
+`StatutoryRateVersion` counter at most every STATUTORY_RATE_POLL_SECONDS and
+reloads its rates only when the counter has moved, so a rate saved in one
+gunicorn worker reaches all the others without a query per calculation.
+
+When no database row covers a date (or Django is not configured, e.g. in
+stand-alone scripts) the constants in rates.py are used.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, datetime
+
+from .rates import NSSF_RATE, SHIF_RATE, AHL_RATE, PAYE_PERSONAL_RELIEF
+
+DEFAULT_RATES = {
+    'nssf': NSSF_RATE,
+    'shif': SHIF_RATE,
+    'ahl': AHL_RATE,
+    'paye_relief': PAYE_PERSONAL_RELIEF,
+}
+
+DEFAULT_POLL_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+def _today():
+    """Today in the project's time zone (the system date outside Django)"""
+    from django.core.exceptions import ImproperlyConfigured
+    from django.utils import timezone
+    try:
+        return timezone.localdate()
+    except (ImproperlyConfigured, ValueError):
+        # Django not configured, or USE_TZ off
+        return date.today()
+
+
+def _as_date(as_of):
+    if as_of is None:
+        return _today()
+    if isinstance(as_of, datetime):
+        return as_of.date()
+    if isinstance(as_of, str):
+        return date.fromisoformat(as_of)
+    return as_of
+
+
+class _Unavailable(Exception):
+    """The rate tables cannot be read yet; rates.py applies"""
+
+
+class RateRegistry:
+    """
+    Process-wide cache of statutory rates keyed by rate type and effective date.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dates = {}
+        self._values = {}
+        self._loaded = False
+        self._checked_at = 0.0
+        self.version = None
+
+    def get(self, rate_type, as_of=None):
+        """
+        Returns the rate in force for a rate type on a given date.
+
+        Args:
+            rate_type (str): One of the `StatutoryRate.RATE_TYPES` keys.
+            as_of (date | str, optional): The pay date; defaults to today.
+
+        Returns:
+            Decimal: The effective rate value.
+        """
+        self.refresh()
+        dates = self._dates.get(rate_type)
+        if dates:
+            index = bisect_right(dates, _as_date(as_of))
+            if index:
+                return self._values[rate_type][index - 1]
+        return DEFAULT_RATES[rate_type]
+
+    def invalidate(self):
+        """Forces the next lookup to reload rates from the database."""
+        with self._lock:
+            self._loaded = False
+            self._checked_at = 0.0
+
+    def refresh(self, force=False):
+        """
+        Reloads rates if another process has changed them since they were loaded.
+
+        The version counter is checked at most once per poll interval unless
+        `force` is set, which payroll runs use so they always start current.
+        """
+        if self._loaded and not force and time.monotonic() - self._checked_at < self._poll_seconds():
+            return
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                dates, values, version = self._load()
+            except _Unavailable as e:
+                logger.warning('Statutory rates unavailable (%s); using the rates.py defaults', e)
+                dates, values, version = {}, {}, None
+            if dates is None:
+                return
+            self._dates, self._values = dates, values
+            self.version = version
+            self._loaded = True
+
+    def _load(self):
+        """
+        The active rates from the database, by rate type in effective-date order.
+
+        Returns:
+            tuple: (dates, values, version), or (None, None, version) when the
+            loaded rates are already at `version`
+
+        Raises:
+            _Unavailable: Django is not configured or the rate tables have not
+                been migrated yet; any other database error propagates
+        """
+        from django.core.exceptions import AppRegistryNotReady, ImproperlyConfigured
+        from django.db import connection, transaction, OperationalError, ProgrammingError
+        try:
+            from .models import StatutoryRate, StatutoryRateVersion
+        except (AppRegistryNotReady, ImproperlyConfigured) as e:
+            raise _Unavailable(e)
+
+        try:
+            # A savepoint keeps a failed read from breaking the caller's transaction
+            with transaction.atomic():
+                version = StatutoryRateVersion.current()
+                if self._loaded and version == self.version:
+                    return None, None, version
+                rows = list(StatutoryRate.objects.filter(is_active=True).order_by(
+                    'rate_type', 'effective_date'
+                ).values_list('rate_type', 'effective_date', 'rate_value'))
+        except (OperationalError, ProgrammingError) as e:
+            # A missing table (e.g. during migrate) falls back to rates.py; an
+            # outage must not silently run payroll on the defaults
+            tables = connection.introspection.table_names()
+            if all(model._meta.db_table in tables for model in (StatutoryRate, StatutoryRateVersion)):
+                raise
+            raise _Unavailable(e)
+
+        dates, values = {}, {}
+        for rate_type, effective_date, rate_value in rows:
+            dates.setdefault(rate_type, []).append(effective_date)
+            values.setdefault(rate_type, []).append(rate_value)
+        return dates, values, version
+
+    @staticmethod
+    def _poll_seconds():
+        try:
+            from django.conf import settings
+            return getattr(settings, 'STATUTORY_RATE_POLL_SECONDS', DEFAULT_POLL_SECONDS)
+        except Exception:
+            return DEFAULT_POLL_SECONDS
+
+
+rate_registry = RateRegistry()
@@ -19,6 +19,16 @@ PAYE_RATES = [
 ]
 PAYE_PERSONAL_RELIEF = Decimal('2400.00')
 
+# Annual equivalents of the monthly bands, used for P9 (annual) tax computations.
+PAYE_ANNUAL_RATES = [
+    (Decimal('288000.00'), Decimal('0.10')),
+    (Decimal('100000.00'), Decimal('0.25')),
+    (Decimal('5612000.00'), Decimal('0.30')),
+    (Decimal('3600000.00'), Decimal('0.325')),
+    (Decimal('inf'), Decimal('0.35')),
+]
+PAYE_ANNUAL_PERSONAL_RELIEF = Decimal('28800.00')
+
 # --- NSSF (National Social Security Fund) ---
 # Rates for Year 3 (Effective from February 2025).
 # Source: NSSF Act, 2013, Third Schedule.
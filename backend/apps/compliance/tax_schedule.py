@@ -0,0 +1,71 @@
+# compliance/tax_schedule.py
+from bisect import bisect_right
+from decimal import Decimal
+
+from .rates import (
+    PAYE_RATES, PAYE_PERSONAL_RELIEF,
+    PAYE_ANNUAL_RATES, PAYE_ANNUAL_PERSONAL_RELIEF
+)
+
+
+class TaxSchedule:
+    """
+    A progressive tax band table compiled once for constant-time lookups.
+
+    The band table uses the same format as `rates.PAYE_RATES`: a list of
+    (band_width, rate) tuples where the last band may be `Decimal('inf')`.
+    The lower bound of every band and the cumulative tax owed at that bound
+    are precomputed, so tax on any amount is one bisect plus one multiply-add.
+    """
+
+    def __init__(self, bands, relief=Decimal('0.00')):
+        self.relief = relief
+        self.thresholds = []
+        self.base_tax = []
+        self.rates = []
+
+        lower = Decimal('0.00')
+        cumulative = Decimal('0.00')
+        for band_width, rate in bands:
+            self.thresholds.append(lower)
+            self.base_tax.append(cumulative)
+            self.rates.append(rate)
+            if band_width == Decimal('inf'):
+                break
+            lower += band_width
+            cumulative += band_width * rate
+
+    def tax(self, amount):
+        """
+        Calculates the tax charged on an amount, before any relief.
+
+        Args:
+            amount (Decimal): The chargeable amount.
+
+        Returns:
+            Decimal: The tax charged.
+        """
+        if amount <= 0:
+            return Decimal('0.00')
+        band = bisect_right(self.thresholds, amount) - 1
+        return self.base_tax[band] + (amount - self.thresholds[band]) * self.rates[band]
+
+    def tax_after_relief(self, amount, relief=None):
+        """
+        Calculates the tax on an amount less relief, never negative.
+
+        Args:
+            amount (Decimal): The chargeable amount.
+            relief (Decimal, optional): Overrides the schedule's default relief.
+
+        Returns:
+            Decimal: The tax payable after relief.
+        """
+        if relief is None:
+            relief = self.relief
+        return max(self.tax(amount) - relief, Decimal('0.00'))
+
+
+# Compiled once at import; shared by payroll, calculator and P9 computations.
+MONTHLY_PAYE_SCHEDULE = TaxSchedule(PAYE_RATES, PAYE_PERSONAL_RELIEF)
+ANNUAL_PAYE_SCHEDULE = TaxSchedule(PAYE_ANNUAL_RATES, PAYE_ANNUAL_PERSONAL_RELIEF)
@@ -0,0 +1,166 @@
+# apps/core/management/commands/generate_workforce.py
+
+import calendar
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import transaction, IntegrityError
+
+from apps.core.models import Tenant, TenantUser
+from apps.employees.synthetic import SyntheticWorkforce, ensure_leave_types, DEFAULT_SEED, SEED_BATCH_SIZE
+from apps.payroll.models import PayrollRun
+from apps.payroll.engine import PayrollEngine, payroll_employees
+from apps.compliance.money import from_cents
+from apps.compliance.rate_registry import rate_registry
+
+User = get_user_model()
+
+
+def pay_periods(end_period, months):
+    """
+    The `months` calendar months ending with `end_period`, oldest first.
+
+    Args:
+        end_period (str): Last month as YYYY-MM
+        months (int): Number of months
+
+    Returns:
+        list: (period_start, period_end) dates
+    """
+    year, month = (int(part) for part in end_period.split('-'))
+    periods = []
+    for _ in range(months):
+        periods.append((date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return list(reversed(periods))
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic workforce with leave balances and payroll history for benchmarks and load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=1000, help='Number of employees to generate (default: 1000)')
+        parser.add_argument('--tenants', type=int, default=1, help='Tenants to spread the employees across (default: 1)')
+        parser.add_argument('--prefix', type=str, default='synthetic', help="Label used in emails, IDs and tenant subdomains (default: 'synthetic')")
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'Random seed; the same seed gives the same workforce (default: {DEFAULT_SEED})')
+        parser.add_argument('--start', type=int, default=0, help='Index of the first employee, to grow an existing workforce (default: 0)')
+        parser.add_argument('--password', type=str, default=None, help='Password for every generated user (default: unusable password)')
+        parser.add_argument('--payroll-months', type=int, default=24, help='Months of payroll history to generate (default: 24)')
+        parser.add_argument('--end-period', type=str, default='2025-09', help='Last payroll month as YYYY-MM (default: 2025-09)')
+        parser.add_argument('--skip-leave', action='store_true', help='Do not generate leave balances')
+        parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE, help=f'Rows per bulk insert (default: {SEED_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix'].lower()
+        try:
+            periods = pay_periods(options['end_period'], options['payroll_months'])
+        except ValueError:
+            raise CommandError('--end-period must be YYYY-MM')
+
+        started = time.perf_counter()
+        self.stdout.write(self.style.SUCCESS(
+            f"🚀 Generating {options['employees']:,} employees across {options['tenants']} tenant(s) (seed {options['seed']})"
+        ))
+
+        try:
+            with transaction.atomic():
+                admin = self.create_admin(prefix, options['password'])
+                tenants = self.create_tenants(prefix, options['tenants'], options['employees'], admin)
+                workforce = SyntheticWorkforce(
+                    prefix=prefix,
+                    seed=options['seed'],
+                    password=options['password'],
+                    batch_size=options['batch_size'],
+                    tenants=tenants
+                )
+
+                step = time.perf_counter()
+                employee_ids = workforce.create_employees(options['employees'], start=options['start'])
+                self.stdout.write(f'👥 Employees, job information, deductions and benefits: {time.perf_counter() - step:.1f}s')
+
+                if not options['skip_leave']:
+                    step = time.perf_counter()
+                    leave_types = ensure_leave_types()
+                    years = sorted({period_end.year for _, period_end in periods} or {date.today().year})
+                    balances = workforce.create_leave_balances(employee_ids, leave_types, years)
+                    self.stdout.write(f'🌴 Leave balances: {balances:,} for {len(leave_types)} leave type(s) over {len(years)} year(s) ({time.perf_counter() - step:.1f}s)')
+        except IntegrityError as e:
+            raise CommandError(f'Could not insert the workforce (already generated with this prefix? use --start or --prefix): {e}')
+
+        if employee_ids and periods:
+            self.generate_payroll_history(workforce, employee_ids, periods, admin)
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Synthetic workforce generated in {time.perf_counter() - started:.1f}s'))
+        self.stdout.write(f'👤 Admin: {admin.email}')
+        self.stdout.write(f'📧 Employees: {workforce.email(options["start"])} ... {workforce.email(options["start"] + options["employees"] - 1)}')
+
+    def create_admin(self, prefix, password):
+        admin, created = User.objects.get_or_create(
+            email=f'{prefix}.admin@synthetic.example',
+            defaults={'first_name': 'Synthetic', 'last_name': 'Admin', 'is_staff': True, 'is_superuser': True}
+        )
+        if created:
+            admin.set_password(password)
+            admin.save(update_fields=['password'])
+        return admin
+
+    def create_tenants(self, prefix, count, employees, admin):
+        tenants = []
+        for number in range(1, count + 1):
+            tenant, _ = Tenant.objects.get_or_create(
+                subdomain=f'{prefix}-{number}',
+                defaults={
+                    'company_name': f'Synthetic Company {number}',
+                    'subscription_plan': 'enterprise',
+                    'subscription_status': 'active',
+                    'max_employees': employees,
+                    'billing_email': f'billing@{prefix}-{number}.synthetic.example',
+                    'admin_user': admin,
+                    'features_enabled': {
+                        'payroll': True,
+                        'reports': True,
+                        'leave_management': True,
+                        'multi_currency': False,
+                        'advanced_reports': True,
+                    }
+                }
+            )
+            TenantUser.objects.get_or_create(user=admin, tenant=tenant, defaults={'role': 'owner'})
+            tenants.append(tenant)
+        return tenants
+
+    def generate_payroll_history(self, workforce, employee_ids, periods, admin):
+        """One final payroll run per month for the generated employees, each in its own transaction"""
+        rate_registry.refresh(force=True)
+        low, high = min(employee_ids), max(employee_ids)
+
+        for period_start, period_end in periods:
+            step = time.perf_counter()
+            # A fifth of the workforce works some overtime each month
+            rng = workforce.rng(period_start.isoformat(), 'overtime')
+            overtime = {}
+            for employee_id in employee_ids:
+                if rng.random() < 0.2:
+                    overtime[employee_id] = (Decimal(rng.randrange(0, 60)) / 4, Decimal(rng.randrange(0, 32)) / 4)
+
+            with transaction.atomic():
+                payroll_run = PayrollRun.objects.create(
+                    run_by=admin,
+                    run_date=period_end,
+                    period_start_date=period_start,
+                    period_end_date=period_end,
+                    status='final'
+                )
+                # Employees are only paid from the month they joined
+                employees = payroll_employees().filter(
+                    id__gte=low, id__lte=high, job_info__date_of_joining__lte=period_end
+                )
+                totals = PayrollEngine(as_of=period_end).process_run(payroll_run, employees, overtime=overtime)
+
+            self.stdout.write(
+                f'🧾 {period_start:%Y-%m}: {totals["payslips"]:,} payslips, '
+                f'net pay KES {from_cents(totals["total_net_pay_cents"]):,} ({time.perf_counter() - step:.1f}s)'
+            )
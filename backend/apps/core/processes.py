@@ -0,0 +1,36 @@
+"""
+Worker Processes
+Process pools whose workers use the Django ORM
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def init_django_worker(settings_module):
+    """Set up Django in a freshly spawned worker process"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def django_process_pool(max_workers):
+    """
+    A process pool whose workers have Django set up.
+
+    Workers are spawned rather than forked so each opens its own database
+    connection instead of sharing the parent's socket and open transaction.
+
+    Args:
+        max_workers: Number of worker processes
+
+    Returns:
+        ProcessPoolExecutor: To be used as a context manager
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_django_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'kenyan_payroll_project.settings'),)
+    )
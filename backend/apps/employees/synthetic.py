@@ -0,0 +1,292 @@
+"""
+Synthetic Workforce
+Seed realistic, reproducible employees with bulk inserts for benchmarks and load tests
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from apps.core.models import TenantUser
+from apps.employees.models import Employee, JobInformation, VoluntaryDeduction, EmployeeBenefit
+from apps.leaves.models import LeaveType, LeaveBalance
+
+User = get_user_model()
+
+SEED_BATCH_SIZE = 1000
+DEFAULT_SEED = 2025
+
+# Monthly gross salaries are log-normal around the median, clipped to a band
+MEDIAN_SALARY = 45000
+SALARY_SIGMA = 0.75
+MIN_SALARY = 15000
+MAX_SALARY = 1500000
+
+FIRST_NAMES = [
+    'Achieng', 'Amani', 'Baraka', 'Chebet', 'Faith', 'Grace', 'Jabari', 'Kamau', 'Kendi', 'Kibet',
+    'Mercy', 'Mwangi', 'Njeri', 'Odhiambo', 'Otieno', 'Wafula', 'Wanjiku', 'Wekesa', 'Zawadi', 'Brian',
+]
+LAST_NAMES = [
+    'Kamau', 'Ochieng', 'Mutua', 'Wanjala', 'Kiprop', 'Njoroge', 'Akinyi', 'Omondi', 'Mwangi', 'Cheruiyot',
+    'Nyambura', 'Kariuki', 'Onyango', 'Mbugua', 'Rotich', 'Kilonzo', 'Wambui', 'Kiplagat', 'Maina', 'Atieno',
+]
+DEPARTMENTS = {
+    'Operations': ['Operations Officer', 'Supervisor', 'Operations Manager'],
+    'Finance': ['Accounts Assistant', 'Accountant', 'Finance Manager'],
+    'Sales': ['Sales Representative', 'Account Manager', 'Sales Manager'],
+    'Technology': ['Support Engineer', 'Software Engineer', 'Engineering Manager'],
+    'Human Resources': ['HR Assistant', 'HR Officer', 'HR Manager'],
+}
+BANKS = [
+    ('Equity Bank Kenya Limited', '68'),
+    ('KCB Bank Kenya Limited', '01'),
+    ('Co-operative Bank of Kenya', '11'),
+    ('NCBA Bank Kenya', '07'),
+]
+
+# (deduction_type, name, share of employees, low, high) - fixed monthly amounts in KES;
+# pension is a share of salary instead of a range
+VOLUNTARY_DEDUCTIONS = [
+    ('pension', 'Pension Contribution', 0.35, None, None),
+    ('sacco', 'Sacco Contribution', 0.40, 500, 10000),
+    ('loan', 'Check-off Loan', 0.15, 2000, 30000),
+    ('insurance', 'Insurance Premium', 0.20, 500, 5000),
+    ('savings', 'Employee Savings', 0.10, 500, 5000),
+]
+
+# (benefit_type, name, share of employees, low, high, taxable)
+BENEFITS = [
+    ('transport', 'Transport Allowance', 0.50, 2000, 10000, True),
+    ('housing', 'Housing Allowance', 0.30, 5000, 40000, True),
+    ('meal', 'Meal Allowance', 0.20, 1000, 5000, True),
+    ('medical', 'Medical Insurance', 0.15, 1500, 10000, False),
+    ('phone', 'Phone Allowance', 0.25, 500, 3000, True),
+]
+
+# The organisation's standard leave types (see check_leave_types.py)
+DEFAULT_LEAVE_TYPES = [
+    {'name': 'Annual Leave', 'code': 'AL', 'annual_allocation': 21, 'carry_forward': True, 'max_carry_forward': 5, 'requires_approval': True, 'is_paid': True},
+    {'name': 'Sick Leave', 'code': 'SL', 'annual_allocation': 14, 'carry_forward': False, 'requires_approval': False, 'is_paid': True},
+    {'name': 'Maternity Leave', 'code': 'ML', 'annual_allocation': 90, 'carry_forward': False, 'requires_approval': True, 'is_paid': True},
+    {'name': 'Paternity Leave', 'code': 'PL', 'annual_allocation': 14, 'carry_forward': False, 'requires_approval': True, 'is_paid': True},
+    {'name': 'Emergency Leave', 'code': 'EL', 'annual_allocation': 3, 'carry_forward': False, 'requires_approval': True, 'is_paid': True},
+]
+
+
+def ensure_leave_types():
+    """The active leave types, creating the standard ones if none exist"""
+    if not LeaveType.objects.filter(is_active=True).exists():
+        for leave_type in DEFAULT_LEAVE_TYPES:
+            LeaveType.objects.get_or_create(code=leave_type['code'], defaults=leave_type)
+    return list(LeaveType.objects.filter(is_active=True).order_by('code'))
+
+
+class SyntheticWorkforce:
+    """
+    Generates employees from a seed.
+
+    Every employee is derived from (seed, index) alone, so a workforce can be
+    built in any number of calls and the same index always yields the same
+    person. Records are keyed by `prefix`, which keeps separate workforces
+    (and their unique emails, KRA PINs and NSSF numbers) apart.
+
+    Args:
+        prefix: Short label used in emails and IDs, e.g. 'bench'
+        seed: Random seed for the whole workforce
+        password: Password for every seeded user; hashed once. Users get an
+            unusable password when omitted.
+        batch_size: Rows per bulk insert
+        tenants: Tenants to spread the employees across (as TenantUser
+            members), in turn by index
+    """
+
+    def __init__(self, prefix='synthetic', seed=DEFAULT_SEED, password=None, batch_size=SEED_BATCH_SIZE, tenants=None):
+        self.prefix = prefix.lower()
+        self.tenants = list(tenants or [])
+        self.code = prefix.upper()[:10]
+        self.seed = seed
+        self.batch_size = batch_size
+        self.password = make_password(password)
+
+    def rng(self, index, purpose='employee'):
+        return random.Random(f'{self.seed}:{self.prefix}:{purpose}:{index}')
+
+    def email(self, index):
+        return f'{self.prefix}.{index:07d}@synthetic.example'
+
+    def profile(self, index):
+        """
+        The deterministic attributes of one employee.
+
+        Returns:
+            dict: user, employee, job and voluntary deduction field values
+        """
+        rng = self.rng(index)
+        salary = rng.lognormvariate(0, SALARY_SIGMA) * MEDIAN_SALARY
+        salary = Decimal(int(min(max(salary, MIN_SALARY), MAX_SALARY)))
+
+        department = rng.choice(sorted(DEPARTMENTS))
+        positions = DEPARTMENTS[department]
+        level = 0 if salary < 60000 else 1 if salary < 200000 else 2
+        bank_name, bank_code = rng.choice(BANKS)
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+        deductions = []
+        for deduction_type, name, share, low, high in VOLUNTARY_DEDUCTIONS:
+            if rng.random() >= share:
+                continue
+            if deduction_type == 'pension':
+                amount = (salary * Decimal(rng.choice([3, 5, 7, 10])) / 100).quantize(Decimal('0.01'))
+            else:
+                # Loans and savings stay within what the salary can carry
+                amount = Decimal(min(rng.randrange(low, high, 100), int(salary * Decimal('0.2'))))
+            deductions.append({'deduction_type': deduction_type, 'name': name, 'amount': amount})
+
+        benefits = []
+        for benefit_type, name, share, low, high, taxable in BENEFITS:
+            if rng.random() < share:
+                benefits.append({
+                    'benefit_type': benefit_type, 'name': name, 'is_taxable': taxable,
+                    'amount': Decimal(rng.randrange(low, high, 100)),
+                })
+
+        return {
+            'user': {
+                'email': self.email(index),
+                'first_name': first_name,
+                'last_name': last_name,
+            },
+            'employee': {
+                'gross_salary': salary,
+                'bank_name': bank_name,
+                'bank_code': bank_code,
+                'bank_account_number': f'{rng.randrange(10 ** 11, 10 ** 12)}',
+                'account_type': 'savings',
+                'account_holder_name': f'{first_name} {last_name}',
+                'helb_monthly_deduction': Decimal(rng.randrange(1000, 8000, 50)) if rng.random() < 0.10 else None,
+                'monthly_insurance_premiums': Decimal(rng.randrange(500, 40000, 100)) if rng.random() < 0.20 else Decimal('0.00'),
+                'monthly_medical_fund_contribution': Decimal(rng.randrange(1000, 15000, 100)) if rng.random() < 0.05 else Decimal('0.00'),
+                'monthly_mortgage_interest': Decimal(rng.randrange(5000, 30000, 100)) if rng.random() < 0.05 else Decimal('0.00'),
+            },
+            'job': {
+                'company_employee_id': f'{self.code}-{index:07d}',
+                'kra_pin': f'A{self.code}{index:07d}',
+                'nssf_number': f'N{self.code}{index:07d}',
+                'nhif_number': f'H{self.code}{index:07d}',
+                'department': department,
+                'position': positions[level],
+                'date_of_joining': date(2015, 1, 1) + timedelta(days=rng.randrange(0, 3650)),
+            },
+            'deductions': deductions,
+            'benefits': benefits,
+            'tenant': self.tenants[index % len(self.tenants)] if self.tenants else None,
+        }
+
+    def create_employees(self, count, start=0):
+        """
+        Insert `count` employees (indexes start .. start + count - 1) with their
+        users, job information, voluntary deductions, benefits and tenant
+        memberships.
+
+        Returns:
+            list: The primary keys of the new employees, in index order
+        """
+        employee_ids = []
+        for batch_start in range(start, start + count, self.batch_size):
+            batch_end = min(batch_start + self.batch_size, start + count)
+            profiles = [self.profile(index) for index in range(batch_start, batch_end)]
+            employee_ids.extend(self.write_batch(profiles))
+        return employee_ids
+
+    def write_batch(self, profiles):
+        users = [User(password=self.password, **profile['user']) for profile in profiles]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+
+        # Backends that cannot return inserted ids need one lookup per batch
+        if any(user.pk is None for user in users):
+            ids = dict(User.objects.filter(email__in=[user.email for user in users]).values_list('email', 'id'))
+            for user in users:
+                user.pk = ids[user.email]
+
+        employees = [
+            Employee(user_id=user.pk, **profile['employee'])
+            for user, profile in zip(users, profiles)
+        ]
+        Employee.objects.bulk_create(employees, batch_size=self.batch_size)
+        if any(employee.pk is None for employee in employees):
+            ids = dict(Employee.objects.filter(user_id__in=[user.pk for user in users]).values_list('user_id', 'id'))
+            for employee in employees:
+                employee.pk = ids[employee.user_id]
+
+        JobInformation.objects.bulk_create(
+            [JobInformation(employee_id=employee.pk, **profile['job']) for employee, profile in zip(employees, profiles)],
+            batch_size=self.batch_size
+        )
+        VoluntaryDeduction.objects.bulk_create(
+            [
+                VoluntaryDeduction(employee_id=employee.pk, **deduction)
+                for employee, profile in zip(employees, profiles)
+                for deduction in profile['deductions']
+            ],
+            batch_size=self.batch_size
+        )
+        EmployeeBenefit.objects.bulk_create(
+            [
+                EmployeeBenefit(employee_id=employee.pk, **benefit)
+                for employee, profile in zip(employees, profiles)
+                for benefit in profile['benefits']
+            ],
+            batch_size=self.batch_size
+        )
+        TenantUser.objects.bulk_create(
+            [
+                TenantUser(user_id=user.pk, tenant=profile['tenant'], role='employee')
+                for user, profile in zip(users, profiles) if profile['tenant'] is not None
+            ],
+            batch_size=self.batch_size
+        )
+        return [employee.pk for employee in employees]
+
+    def create_leave_balances(self, employee_ids, leave_types, years):
+        """
+        Insert a leave balance per employee, leave type and year, with part of
+        each past year's allocation used.
+
+        Args:
+            employee_ids: Employees in index order, as returned by `create_employees`
+            leave_types: LeaveType objects
+            years: Calendar years to allocate
+
+        Returns:
+            int: Number of balances created
+        """
+        first_year, current_year = min(years), max(years)
+        created = 0
+        for year in years:
+            rng = self.rng(year, 'leave')
+            balances = []
+            for employee_id in employee_ids:
+                for leave_type in leave_types:
+                    allocated = Decimal(leave_type.annual_allocation)
+                    # Past years are mostly used up; the current one is in progress
+                    share = rng.uniform(0.5, 1.0) if year < current_year else rng.uniform(0, 0.6)
+                    if leave_type.code != 'AL' and rng.random() < 0.8:
+                        share = 0
+                    used = (allocated * Decimal(str(round(share, 2)))).quantize(Decimal('0.5'))
+                    carried = Decimal('0.0')
+                    if leave_type.carry_forward and year > first_year:
+                        carried = Decimal(rng.randrange(0, leave_type.max_carry_forward + 1))
+                    balances.append(LeaveBalance(
+                        employee_id=employee_id, leave_type=leave_type, year=year,
+                        allocated_days=allocated, used_days=min(used, allocated), carried_forward=carried
+                    ))
+                if len(balances) >= self.batch_size:
+                    LeaveBalance.objects.bulk_create(balances, batch_size=self.batch_size)
+                    created += len(balances)
+                    balances = []
+            LeaveBalance.objects.bulk_create(balances, batch_size=self.batch_size)
+            created += len(balances)
+        return created
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PayrollConfig(AppConfig):
+    name = 'apps.payroll'
+    verbose_name = 'Payroll'
+    
+    def ready(self):
+        """Connect the tax ledger to payslip deletions"""
+        import apps.payroll.signals  # noqa: F401 - connects the receivers
@@ -0,0 +1,202 @@
+"""
+Payroll Run Benchmarks
+Seed a synthetic workforce and time a full payroll run through the payroll API view
+"""
+
+import gc
+import re
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.compliance.models import StatutoryRate, StatutoryRateVersion
+from apps.employees.models import Employee, VoluntaryDeduction
+from apps.employees.synthetic import SyntheticWorkforce, DEFAULT_SEED
+from apps.payroll.models import PayrollRun, Payslip, PayslipDeduction, PayrollInput
+from apps.payroll.views import PayrollRunViewSet
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+User = get_user_model()
+
+BENCHMARK_ADMIN_EMAIL = 'benchmark.admin@synthetic.example'
+
+# (statement, table) -> stage of the payroll run it belongs to
+QUERY_STAGES = {
+    ('SELECT', StatutoryRate._meta.db_table): 'load_rates',
+    ('SELECT', StatutoryRateVersion._meta.db_table): 'load_rates',
+    ('SELECT', Employee._meta.db_table): 'load_employees',
+    ('SELECT', VoluntaryDeduction._meta.db_table): 'load_deductions',
+    ('SELECT', PayrollInput._meta.db_table): 'load_payroll_inputs',
+    ('INSERT', PayrollRun._meta.db_table): 'create_run',
+    ('INSERT', Payslip._meta.db_table): 'write_payslips',
+    ('INSERT', PayslipDeduction._meta.db_table): 'write_deduction_lines',
+    ('UPDATE', PayrollRun._meta.db_table): 'save_run_totals',
+}
+
+TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO)\s+["`\[]?(\w+)', re.IGNORECASE)
+UPDATE_PATTERN = re.compile(r'^\s*UPDATE\s+["`\[]?(\w+)', re.IGNORECASE)
+
+
+def query_stage(sql):
+    """Name of the payroll stage a SQL statement belongs to ('other_sql' if unknown)"""
+    statement = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    match = UPDATE_PATTERN.match(sql) if statement == 'UPDATE' else TABLE_PATTERN.search(sql)
+    if match:
+        return QUERY_STAGES.get((statement, match.group(1).lower()), 'other_sql')
+    return 'other_sql'
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that counts statements and their time per stage.
+
+    Install with `connection.execute_wrapper(recorder)`. Time spent fetching
+    rows from server-side cursors happens outside `execute` and is counted as
+    compute by `run_benchmark`.
+    """
+
+    def __init__(self):
+        self.queries = defaultdict(int)
+        self.seconds = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stage = query_stage(sql)
+            self.queries[stage] += 1
+            self.seconds[stage] += time.perf_counter() - started
+
+    @property
+    def total_queries(self):
+        return sum(self.queries.values())
+
+    @property
+    def total_seconds(self):
+        return sum(self.seconds.values())
+
+
+def peak_rss_kb():
+    """High-water mark of this process's resident memory in KiB, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def benchmark_admin():
+    admin = User.objects.filter(email=BENCHMARK_ADMIN_EMAIL).first()
+    if admin is None:
+        admin = User.objects.create_superuser(email=BENCHMARK_ADMIN_EMAIL, password=None)
+    return admin
+
+
+def run_benchmark(employees, period_start, period_end, seed=DEFAULT_SEED, workers=None, trace_memory=False):
+    """
+    Seed `employees` synthetic employees and run payroll for them through
+    `PayrollRunViewSet.create`, exactly as a POST to /api/v1/payroll/payroll-runs/.
+
+    Must be called inside a transaction the caller rolls back (or commits to
+    keep the data). Other active employees should be deactivated first so the
+    run covers exactly the seeded workforce.
+
+    Args:
+        employees: Number of employees to seed
+        period_start, period_end: Pay period (YYYY-MM-DD)
+        seed: Seed for the synthetic workforce
+        workers: Processes used to compute payslips (view default when None)
+        trace_memory: Also report the peak of Python allocations with
+            tracemalloc, which slows the run down
+
+    Returns:
+        dict: Seeding and run timings, SQL queries, rows written, memory and
+        per-stage timings
+    """
+    workforce = SyntheticWorkforce(prefix=f'bench{employees}', seed=seed)
+    started = time.perf_counter()
+    workforce.create_employees(employees)
+    seed_seconds = time.perf_counter() - started
+
+    data = {'period_start_date': period_start, 'period_end_date': period_end}
+    if workers:
+        data['workers'] = workers
+    request = APIRequestFactory().post('/api/v1/payroll/payroll-runs/', data, format='json')
+    force_authenticate(request, user=benchmark_admin())
+    view = PayrollRunViewSet.as_view({'post': 'create'})
+
+    recorder = QueryRecorder()
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with connection.execute_wrapper(recorder):
+        response = view(request)
+        response.render()
+    wall_seconds = time.perf_counter() - started
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    if response.status_code != 201:
+        raise RuntimeError(f'Payroll run failed with HTTP {response.status_code}: {response.data}')
+
+    run_id = response.data['id']
+    payslips = Payslip.objects.filter(payroll_run_id=run_id).count()
+    deduction_lines = PayslipDeduction.objects.filter(payslip__payroll_run_id=run_id).count()
+
+    stages = {
+        stage: {'queries': recorder.queries[stage], 'seconds': round(recorder.seconds[stage], 4)}
+        for stage in sorted(recorder.queries)
+    }
+    # Calculation, model building and serialisation: everything outside SQL
+    stages['compute'] = {'queries': 0, 'seconds': round(wall_seconds - recorder.total_seconds, 4)}
+
+    return {
+        'employees': employees,
+        'workers': workers,
+        'database': connection.vendor,
+        'seed_seconds': round(seed_seconds, 4),
+        'wall_seconds': round(wall_seconds, 4),
+        'employees_per_second': round(payslips / wall_seconds, 1) if wall_seconds else None,
+        'sql_queries': recorder.total_queries,
+        'sql_seconds': round(recorder.total_seconds, 4),
+        'rows_written': {
+            'payroll_runs': 1,
+            'payslips': payslips,
+            'payslip_deductions': deduction_lines,
+            'total': 1 + payslips + deduction_lines,
+        },
+        'peak_rss_kb': peak_rss_kb(),
+        'peak_traced_kb': traced_peak,
+        'stages': stages,
+    }
+
+
+def isolated_benchmark(employees, period_start, period_end, keep=False, **options):
+    """
+    `run_benchmark` against only the seeded workforce.
+
+    Other active employees are deactivated for the duration of the run, and
+    everything (seeded data, payroll run, deactivations) is rolled back unless
+    `keep` is set, in which case existing employees are left active and the
+    seeded workforce and run are committed.
+    """
+    with transaction.atomic():
+        if not keep:
+            Employee.objects.filter(is_active=True).update(is_active=False)
+        result = run_benchmark(employees, period_start, period_end, **options)
+        if not keep:
+            transaction.set_rollback(True)
+    return result
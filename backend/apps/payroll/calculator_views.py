@@ -10,19 +10,113 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.http import StreamingHttpResponse
+from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
+import csv
+import hashlib
+import io
 import json
+import threading
+import time
+from collections import OrderedDict
 
-# Import our calculation functions
-from apps.compliance.calc_paye import calculate_paye
-from apps.compliance.calc_nssf import calculate_nssf
-from apps.compliance.calc_shif import calculate_shif
-from apps.compliance.calc_ahl import calculate_ahl
-from apps.compliance.calc_reliefs import (
-    calculate_insurance_relief,
-    calculate_post_retirement_medical_deduction,
-    calculate_mortgage_interest_relief
-)
+from apps.payroll.engine import PayrollEngine
+from apps.payroll.inputs import iter_csv_rows
+from apps.compliance.money import to_cents, from_cents
+from apps.compliance.calc_batch import calculate_net_pay_batch
+from apps.compliance.rate_registry import rate_registry
+
+# Calculator fields that what-if scenarios may change, and their DeductionGraph inputs
+WHAT_IF_INPUTS = {
+    'gross_salary': 'basic_gross',
+    'pension_contribution': 'pension_contribution',
+    'insurance_premiums': 'insurance_premiums',
+    'medical_fund_contribution': 'medical_fund_contribution',
+    'mortgage_interest': 'mortgage_interest',
+    'helb_deduction': 'helb',
+    'other_voluntary_deductions': 'voluntary_deductions',
+}
+
+MAX_WHAT_IF_SCENARIOS = 20
+
+# Net pay targets answered by one gross-from-net request
+MAX_GROSS_FROM_NET_TARGETS = 1000
+
+# Rows per batch calculator request unless PUBLIC_CALCULATOR_BATCH_LIMIT is set
+DEFAULT_BATCH_LIMIT = 5000
+
+# Rows computed per batch engine call while streaming
+BATCH_CHUNK_SIZE = 1000
+
+# Points returned by one net-pay curve request
+MAX_CURVE_POINTS = 2000
+
+# How long public calculator responses may be cached, unless
+# PUBLIC_CALCULATOR_CACHE_SECONDS is set
+DEFAULT_CACHE_SECONDS = 3600
+
+# Responses kept in each worker's memory, unless PUBLIC_CALCULATOR_LRU_SIZE is set
+DEFAULT_LRU_SIZE = 1024
+
+BATCH_OUTPUT_COLUMNS = [
+    'row', 'gross_salary', 'paye_tax', 'nssf', 'shif', 'ahl', 'helb_deduction',
+    'pension_relief', 'insurance_relief', 'taxable_income', 'total_deductions', 'net_pay', 'error'
+]
+
+
+def safe_decimal(value, default=0):
+    """Convert a request value to Decimal, treating empty strings and 'null' as the default"""
+    if value is None or value == '' or value == 'null':
+        return Decimal(str(default))
+    return Decimal(str(value))
+
+
+def what_if_scenarios(graph, scenarios):
+    """
+    Evaluate what-if changes against a base calculation.
+    
+    Each scenario starts from a copy of the evaluated base graph, so only the
+    deductions downstream of the changed fields are recomputed.
+    
+    Args:
+        graph: Evaluated DeductionGraph for the base inputs
+        scenarios: List of {calculator_field: new_value} dicts
+    
+    Returns:
+        list: Net pay, PAYE and total deductions for each scenario
+    
+    Raises:
+        ValueError: If a scenario is malformed
+    """
+    if not isinstance(scenarios, list) or len(scenarios) > MAX_WHAT_IF_SCENARIOS:
+        raise ValueError(f'what_if must be a list of at most {MAX_WHAT_IF_SCENARIOS} objects')
+    
+    base_net_pay = graph['net_pay']
+    results = []
+    for changes in scenarios:
+        if not isinstance(changes, dict):
+            raise ValueError('each scenario must be an object')
+        unknown = set(changes) - set(WHAT_IF_INPUTS)
+        if unknown:
+            raise ValueError(f"unsupported fields: {', '.join(sorted(unknown))}")
+        
+        scenario = graph.copy()
+        affected = scenario.update(**{
+            WHAT_IF_INPUTS[field]: to_cents(Decimal(str(value))) for field, value in changes.items()
+        })
+        results.append({
+            'changes': changes,
+            'paye_tax': float(from_cents(scenario['paye_after_relief'])),
+            'total_deductions': float(from_cents(scenario['total_deductions'])),
+            'net_pay': float(from_cents(scenario['net_pay'])),
+            'net_pay_change': float(from_cents(scenario['net_pay'] - base_net_pay)),
+            'affected': sorted(affected),
+        })
+    return results
 
 @csrf_exempt  # CSRF exemption needed for public calculator - safe because no sensitive data is modified
 @api_view(['POST', 'GET'])
@@ -40,15 +134,20 @@ def public_payroll_calculator(request):
     
     Accepts salary and optional relief inputs, returns complete payroll breakdown.
     No authentication required - designed for public use.
+    
+    The same inputs can be sent as GET query parameters; those responses carry
+    an ETag and Cache-Control header so a reverse proxy can serve repeats.
+    Results are memoized on the inputs, the statutory rate version and the date.
     """
     
-    if request.method == 'GET':
+    if request.method == 'GET' and 'gross_salary' not in request.query_params:
         # Return calculator information and input format
         return Response({
             'message': 'Kenya Payroll Calculator API',
             'description': 'Calculate net pay with KRA-compliant deductions and reliefs',
             'version': '1.0',
             'method': 'POST',
+            'get_example': '/api/public/calculator/?gross_salary=150000&pension_contribution=15000',
             'required_fields': ['gross_salary'],
             'optional_fields': [
                 'pension_contribution',
@@ -56,7 +155,8 @@ def public_payroll_calculator(request):
                 'medical_fund_contribution',
                 'mortgage_interest',
                 'helb_deduction',
-                'other_voluntary_deductions'
+                'other_voluntary_deductions',
+                'what_if'
             ],
             'sample_request': {
                 'gross_salary': 150000,
@@ -82,7 +182,9 @@ def public_payroll_calculator(request):
     
     try:
         # Parse input data
-        if request.content_type == 'application/json':
+        if request.method == 'GET':
+            data = request.query_params
+        elif request.content_type == 'application/json':
             data = json.loads(request.body)
         else:
             data = request.data
@@ -103,12 +205,6 @@ def public_payroll_calculator(request):
         
         # Extract optional inputs with defaults
         try:
-            # Helper function to safely convert to Decimal, handling empty strings
-            def safe_decimal(value, default=0):
-                if value is None or value == '' or value == 'null':
-                    return Decimal(str(default))
-                return Decimal(str(value))
-            
             pension_contribution = safe_decimal(data.get('pension_contribution'), 0)
             insurance_premiums = safe_decimal(data.get('insurance_premiums'), 0)
             medical_fund_contribution = safe_decimal(data.get('medical_fund_contribution'), 0)
@@ -128,142 +224,565 @@ def public_payroll_calculator(request):
                 'code': 'SALARY_TOO_HIGH'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # --- PERFORM CALCULATIONS ---
-        
-        # 1. Calculate statutory deductions
-        nssf_deduction = calculate_nssf(gross_salary)
-        shif_deduction = calculate_shif(gross_salary)
-        ahl_employee_deduction, ahl_employer_contribution = calculate_ahl(gross_salary)
+        # Identical inputs give identical answers until the rates change, so
+        # responses are memoized on the inputs normalized to the cent
+        pension_contribution = from_cents(to_cents(pension_contribution))
+        insurance_premiums = from_cents(to_cents(insurance_premiums))
+        medical_fund_contribution = from_cents(to_cents(medical_fund_contribution))
+        mortgage_interest = from_cents(to_cents(mortgage_interest))
+        helb_deduction = from_cents(to_cents(helb_deduction))
+        other_voluntary_deductions = from_cents(to_cents(other_voluntary_deductions))
+        gross_salary = from_cents(to_cents(gross_salary))
+        what_if = data.get('what_if') if request.method == 'POST' else None
         
-        # 2. Calculate reliefs and deductions
-        PENSION_MAX_RELIEF = Decimal('30000.00')
-        pension_relief_amount = min(pension_contribution, PENSION_MAX_RELIEF)
+        def compute():
+            # --- PERFORM CALCULATIONS ---
+            # Same engine as payroll runs, so the calculator always matches a payslip
+            engine = PayrollEngine()
+            graph = engine.deduction_graph(
+                basic_gross=to_cents(gross_salary),
+                helb=to_cents(helb_deduction),
+                pension_contribution=to_cents(pension_contribution),
+                voluntary_deductions=to_cents(other_voluntary_deductions),
+                insurance_premiums=to_cents(insurance_premiums),
+                medical_fund_contribution=to_cents(medical_fund_contribution),
+                mortgage_interest=to_cents(mortgage_interest)
+            )
+            result = engine.result_from_graph(graph)
         
-        medical_fund_deduction = calculate_post_retirement_medical_deduction(medical_fund_contribution)
-        mortgage_interest_relief = calculate_mortgage_interest_relief(mortgage_interest)
+            nssf_deduction = from_cents(result['nssf_cents'])
+            shif_deduction = from_cents(result['shif_cents'])
+            ahl_employee_deduction = from_cents(result['ahl_employee_cents'])
+            ahl_employer_contribution = from_cents(result['ahl_employer_cents'])
+            pension_relief_amount = from_cents(result['pension_relief_cents'])
+            medical_fund_deduction = from_cents(result['medical_fund_cents'])
+            mortgage_interest_relief = from_cents(result['mortgage_interest_cents'])
+            taxable_income = from_cents(result['taxable_cents'])
+            insurance_relief = from_cents(result['insurance_relief_cents'])
+            paye_after_relief = from_cents(result['paye_after_relief_cents'])
+            total_statutory_deductions = from_cents(result['total_statutory_cents'])
+            total_voluntary_deductions = from_cents(result['pension_cents'] + result['voluntary_deductions_cents'])
+            total_deductions = from_cents(result['total_deductions_cents'])
+            net_pay = from_cents(result['net_pay_cents'])
         
-        # 3. Calculate taxable income
-        taxable_income = gross_salary - (
-            nssf_deduction + 
-            shif_deduction + 
-            ahl_employee_deduction + 
-            pension_relief_amount +
-            medical_fund_deduction +
-            mortgage_interest_relief
-        )
-        taxable_income = max(taxable_income, Decimal('0.00'))
-        
-        # 4. Calculate PAYE
-        paye_before_insurance_relief = calculate_paye(taxable_income)
-        insurance_relief = calculate_insurance_relief(insurance_premiums)
-        paye_after_relief = max(paye_before_insurance_relief - insurance_relief, Decimal('0.00'))
-        
-        # 5. Calculate total deductions
-        total_statutory_deductions = (
-            paye_after_relief + 
-            nssf_deduction + 
-            shif_deduction + 
-            ahl_employee_deduction + 
-            helb_deduction
-        )
-        
-        total_voluntary_deductions = pension_contribution + other_voluntary_deductions
-        total_deductions = total_statutory_deductions + total_voluntary_deductions
-        
-        # 6. Calculate net pay
-        net_pay = gross_salary - total_deductions
-        
-        # --- PREPARE RESPONSE ---
-        response_data = {
-            'success': True,
-            'calculation_date': '2025-09-21',  # Current date
-            'inputs': {
-                'gross_salary': float(gross_salary),
-                'pension_contribution': float(pension_contribution),
-                'insurance_premiums': float(insurance_premiums),
-                'medical_fund_contribution': float(medical_fund_contribution),
-                'mortgage_interest': float(mortgage_interest),
-                'helb_deduction': float(helb_deduction),
-                'other_voluntary_deductions': float(other_voluntary_deductions)
-            },
-            'statutory_deductions': {
-                'paye_tax': {
-                    'amount': float(paye_after_relief),
-                    'description': 'Pay As You Earn Tax (after reliefs)',
-                    'calculation_note': f'Taxable income: KSh {float(taxable_income):,.2f}'
-                },
-                'nssf': {
-                    'amount': float(nssf_deduction),
-                    'description': 'National Social Security Fund (6%)',
-                    'rate': '6%'
-                },
-                'shif': {
-                    'amount': float(shif_deduction),
-                    'description': 'Social Health Insurance Fund (2.75%)',
-                    'rate': '2.75%'
+            # --- PREPARE RESPONSE ---
+            response_data = {
+                'success': True,
+                'calculation_date': '2025-09-21',  # Current date
+                'inputs': {
+                    'gross_salary': float(gross_salary),
+                    'pension_contribution': float(pension_contribution),
+                    'insurance_premiums': float(insurance_premiums),
+                    'medical_fund_contribution': float(medical_fund_contribution),
+                    'mortgage_interest': float(mortgage_interest),
+                    'helb_deduction': float(helb_deduction),
+                    'other_voluntary_deductions': float(other_voluntary_deductions)
                 },
-                'ahl': {
-                    'amount': float(ahl_employee_deduction),
-                    'description': 'Affordable Housing Levy (1.5%)',
-                    'rate': '1.5%',
-                    'employer_contribution': float(ahl_employer_contribution)
+                'statutory_deductions': {
+                    'paye_tax': {
+                        'amount': float(paye_after_relief),
+                        'description': 'Pay As You Earn Tax (after reliefs)',
+                        'calculation_note': f'Taxable income: KSh {float(taxable_income):,.2f}'
+                    },
+                    'nssf': {
+                        'amount': float(nssf_deduction),
+                        'description': 'National Social Security Fund (6%)',
+                        'rate': '6%'
+                    },
+                    'shif': {
+                        'amount': float(shif_deduction),
+                        'description': 'Social Health Insurance Fund (2.75%)',
+                        'rate': '2.75%'
+                    },
+                    'ahl': {
+                        'amount': float(ahl_employee_deduction),
+                        'description': 'Affordable Housing Levy (1.5%)',
+                        'rate': '1.5%',
+                        'employer_contribution': float(ahl_employer_contribution)
+                    },
+                    'helb': {
+                        'amount': float(helb_deduction),
+                        'description': 'Higher Education Loans Board'
+                    },
+                    'total': float(total_statutory_deductions)
                 },
-                'helb': {
-                    'amount': float(helb_deduction),
-                    'description': 'Higher Education Loans Board'
-                },
-                'total': float(total_statutory_deductions)
-            },
-            'reliefs_applied': {
-                'pension_relief': {
-                    'contribution': float(pension_contribution),
-                    'relief_amount': float(pension_relief_amount),
-                    'cap': 30000,
-                    'description': 'Pension contribution relief (capped at KSh 30,000)'
+                'reliefs_applied': {
+                    'pension_relief': {
+                        'contribution': float(pension_contribution),
+                        'relief_amount': float(pension_relief_amount),
+                        'cap': 30000,
+                        'description': 'Pension contribution relief (capped at KSh 30,000)'
+                    },
+                    'insurance_relief': {
+                        'premiums': float(insurance_premiums),
+                        'relief_amount': float(insurance_relief),
+                        'rate': '15%',
+                        'cap': 5000,
+                        'description': 'Insurance relief (15% up to KSh 5,000)'
+                    },
+                    'medical_fund_relief': {
+                        'contribution': float(medical_fund_contribution),
+                        'relief_amount': float(medical_fund_deduction),
+                        'cap': 15000,
+                        'description': 'Post-retirement medical fund (up to KSh 15,000)'
+                    },
+                    'mortgage_relief': {
+                        'interest': float(mortgage_interest),
+                        'relief_amount': float(mortgage_interest_relief),
+                        'cap': 30000,
+                        'description': 'Mortgage interest relief (up to KSh 30,000)'
+                    },
+                    'personal_relief': {
+                        'amount': 2400,
+                        'description': 'Standard personal relief (included in PAYE calculation)'
+                    }
                 },
-                'insurance_relief': {
-                    'premiums': float(insurance_premiums),
-                    'relief_amount': float(insurance_relief),
-                    'rate': '15%',
-                    'cap': 5000,
-                    'description': 'Insurance relief (15% up to KSh 5,000)'
+                'voluntary_deductions': {
+                    'pension_contribution': float(pension_contribution),
+                    'other_deductions': float(other_voluntary_deductions),
+                    'total': float(total_voluntary_deductions)
                 },
-                'medical_fund_relief': {
-                    'contribution': float(medical_fund_contribution),
-                    'relief_amount': float(medical_fund_deduction),
-                    'cap': 15000,
-                    'description': 'Post-retirement medical fund (up to KSh 15,000)'
+                'summary': {
+                    'gross_salary': float(gross_salary),
+                    'total_deductions': float(total_deductions),
+                    'net_pay': float(net_pay),
+                    'effective_tax_rate': float((paye_after_relief / gross_salary) * 100) if gross_salary > 0 else 0
                 },
-                'mortgage_relief': {
-                    'interest': float(mortgage_interest),
-                    'relief_amount': float(mortgage_interest_relief),
-                    'cap': 30000,
-                    'description': 'Mortgage interest relief (up to KSh 30,000)'
-                },
-                'personal_relief': {
-                    'amount': 2400,
-                    'description': 'Standard personal relief (included in PAYE calculation)'
-                }
-            },
-            'voluntary_deductions': {
-                'pension_contribution': float(pension_contribution),
-                'other_deductions': float(other_voluntary_deductions),
-                'total': float(total_voluntary_deductions)
-            },
-            'summary': {
-                'gross_salary': float(gross_salary),
-                'total_deductions': float(total_deductions),
-                'net_pay': float(net_pay),
-                'effective_tax_rate': float((paye_after_relief / gross_salary) * 100) if gross_salary > 0 else 0
-            },
-            'disclaimer': 'This calculator provides estimates based on current KRA rates. Consult a tax professional for specific advice.',
-            'powered_by': 'Kenya Payroll System'
-        }
+                'disclaimer': 'This calculator provides estimates based on current KRA rates. Consult a tax professional for specific advice.',
+                'powered_by': 'Kenya Payroll System'
+            }
+        
+            # Optional what-if scenarios, each applied to the base inputs
+            if what_if:
+                response_data['what_if'] = what_if_scenarios(graph, what_if)
         
-        return Response(response_data)
+            return response_data
+        
+        key_parts = [
+            gross_salary, pension_contribution, insurance_premiums, medical_fund_contribution,
+            mortgage_interest, helb_deduction, other_voluntary_deductions, what_if
+        ]
+        try:
+            return cached_calculation(request, 'calculator', key_parts, compute)
+        except (InvalidOperation, ValueError, TypeError) as e:
+            return Response({
+                'error': f'Invalid what_if scenario: {e}',
+                'code': 'INVALID_WHAT_IF'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
     except Exception as e:
         return Response({
             'error': f'Calculation error: {str(e)}',
             'code': 'CALCULATION_ERROR'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@csrf_exempt  # Same reasoning as public_payroll_calculator: calculation only, nothing is stored
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def public_gross_from_net(request):
+    """
+    Reverse payroll calculator: the gross salary needed for a target net pay.
+    
+    Accepts `net_salary` (one target) or `net_salaries` (a list of up to
+    MAX_GROSS_FROM_NET_TARGETS targets, e.g. a whole offer list) plus the same
+    optional relief and deduction fields as the public calculator, which are
+    held fixed. Each answer is the smallest gross salary whose net pay is at
+    least the target.
+    """
+    data = request.data
+    
+    targets = data.get('net_salaries')
+    single = targets is None
+    if single:
+        targets = [data.get('net_salary')]
+    if not isinstance(targets, list) or not targets:
+        return Response({
+            'error': 'Provide net_salary or a non-empty net_salaries list',
+            'code': 'INVALID_FORMAT'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(targets) > MAX_GROSS_FROM_NET_TARGETS:
+        return Response({
+            'error': f'At most {MAX_GROSS_FROM_NET_TARGETS} net salaries per request',
+            'code': 'TOO_MANY_TARGETS'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        target_cents = [to_cents(Decimal(str(target))) for target in targets]
+        fixed_inputs = {
+            graph_input: to_cents(safe_decimal(data.get(field)))
+            for field, graph_input in WHAT_IF_INPUTS.items() if field != 'gross_salary'
+        }
+    except (InvalidOperation, ValueError, TypeError):
+        return Response({
+            'error': 'Invalid number format. Please provide valid numbers.',
+            'code': 'INVALID_FORMAT'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if any(cents <= 0 for cents in target_cents):
+        return Response({
+            'error': 'Net salary must be greater than 0',
+            'code': 'INVALID_SALARY'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if any(cents > to_cents(Decimal('10000000')) for cents in target_cents):
+        return Response({
+            'error': 'Net salary exceeds reasonable limit (KSh 10,000,000)',
+            'code': 'SALARY_TOO_HIGH'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Breakpoints are computed once and shared by every target
+    engine = PayrollEngine()
+    solver = engine.gross_from_net_solver(**fixed_inputs)
+    
+    results = []
+    for net_cents, gross_cents in zip(target_cents, solver.solve_many(target_cents)):
+        graph = solver.graph
+        graph.update(basic_gross=gross_cents)
+        results.append({
+            'net_salary': float(from_cents(net_cents)),
+            'gross_salary': float(from_cents(gross_cents)),
+            'net_pay': float(from_cents(graph['net_pay'])),
+            'paye_tax': float(from_cents(graph['paye_after_relief'])),
+            'total_deductions': float(from_cents(graph['total_deductions'])),
+            'employer_ahl_contribution': float(from_cents(graph['ahl_employer'])),
+        })
+    
+    if single:
+        return Response({'success': True, **results[0]})
+    return Response({'success': True, 'count': len(results), 'results': results})
+
+
+def _batch_row_inputs(row):
+    """
+    Validate one batch calculator row.
+    
+    Returns:
+        dict: Inputs in cents keyed like calculate_net_pay_batch's arguments
+    
+    Raises:
+        ValueError: If the row is invalid
+    """
+    if not isinstance(row, dict):
+        raise ValueError('each row must be an object')
+    try:
+        gross_salary = Decimal(str(row.get('gross_salary', '')).strip())
+        inputs = {
+            'gross_cents': to_cents(gross_salary),
+            'pension_cents': to_cents(safe_decimal(row.get('pension_contribution'))),
+            'insurance_premiums_cents': to_cents(safe_decimal(row.get('insurance_premiums'))),
+            'medical_fund_cents': to_cents(safe_decimal(row.get('medical_fund_contribution'))),
+            'mortgage_interest_cents': to_cents(safe_decimal(row.get('mortgage_interest'))),
+            'helb_cents': to_cents(safe_decimal(row.get('helb_deduction'))),
+            'voluntary_cents': to_cents(safe_decimal(row.get('other_voluntary_deductions'))),
+        }
+    except (InvalidOperation, ValueError):
+        raise ValueError('invalid number format')
+    if gross_salary <= 0:
+        raise ValueError('gross_salary must be greater than 0')
+    if gross_salary > Decimal('10000000'):
+        raise ValueError('gross_salary exceeds reasonable limit (KSh 10,000,000)')
+    return inputs
+
+
+def _batch_results(rows):
+    """
+    Compute batch calculator rows with the batch statutory engine, chunk by chunk.
+    
+    Yields:
+        dict: One result (or error) per input row, in input order
+    """
+    for start in range(0, len(rows), BATCH_CHUNK_SIZE):
+        chunk = rows[start:start + BATCH_CHUNK_SIZE]
+        parsed = []
+        for row in chunk:
+            try:
+                parsed.append(_batch_row_inputs(row))
+            except ValueError as e:
+                parsed.append(str(e))
+        
+        valid = [inputs for inputs in parsed if isinstance(inputs, dict)]
+        columns = {key: [inputs[key] for inputs in valid] for key in (valid[0] if valid else {})}
+        results = calculate_net_pay_batch(columns.pop('gross_cents'), **columns) if valid else {}
+        
+        position = 0
+        for offset, inputs in enumerate(parsed, start=start + 1):
+            if not isinstance(inputs, dict):
+                yield {'row': offset, 'error': inputs}
+                continue
+            yield {
+                'row': offset,
+                'gross_salary': str(from_cents(inputs['gross_cents'])),
+                'paye_tax': str(from_cents(results['paye_after_relief'][position])),
+                'nssf': str(from_cents(results['nssf'][position])),
+                'shif': str(from_cents(results['shif'][position])),
+                'ahl': str(from_cents(results['ahl'][position])),
+                'helb_deduction': str(from_cents(inputs['helb_cents'])),
+                'pension_relief': str(from_cents(results['pension_relief'][position])),
+                'insurance_relief': str(from_cents(results['insurance_relief'][position])),
+                'taxable_income': str(from_cents(results['taxable'][position])),
+                'total_deductions': str(from_cents(results['total_deductions'][position])),
+                'net_pay': str(from_cents(results['net_pay'][position])),
+            }
+            position += 1
+
+
+def _stream_csv(results):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=BATCH_OUTPUT_COLUMNS)
+    writer.writeheader()
+    for result in results:
+        writer.writerow(result)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+@csrf_exempt  # Same reasoning as public_payroll_calculator: calculation only, nothing is stored
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def public_payroll_calculator_batch(request):
+    """
+    Batch public calculator: many salaries in one request.
+    
+    Accepts a JSON array of rows (or {"rows": [...]}) or a CSV upload in the
+    multipart field `file`, with the same fields as the single calculator.
+    At most PUBLIC_CALCULATOR_BATCH_LIMIT rows are accepted. Results are
+    streamed as JSON lines, or as CSV with `?output=csv` or `Accept: text/csv`.
+    Invalid rows produce an error result instead of failing the request.
+    """
+    limit = getattr(settings, 'PUBLIC_CALCULATOR_BATCH_LIMIT', DEFAULT_BATCH_LIMIT)
+    
+    uploaded_file = request.FILES.get('file')
+    if uploaded_file is not None:
+        source = iter_csv_rows(uploaded_file.file)
+    elif isinstance(request.data, list):
+        source = iter(request.data)
+    elif isinstance(request.data.get('rows'), list):
+        source = iter(request.data['rows'])
+    else:
+        return Response({
+            'error': "Send a JSON array of rows, {'rows': [...]} or a CSV file as 'file'",
+            'code': 'INVALID_FORMAT'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Read at most one row past the limit, so oversized uploads are rejected
+    # without being loaded
+    try:
+        rows = []
+        for row in source:
+            rows.append(row)
+            if len(rows) > limit:
+                return Response({
+                    'error': f'At most {limit} rows per request',
+                    'code': 'TOO_MANY_ROWS'
+                }, status=status.HTTP_400_BAD_REQUEST)
+    except (ValueError, csv.Error) as e:
+        return Response({
+            'error': f'Could not read upload: {e}',
+            'code': 'INVALID_FORMAT'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    results = _batch_results(rows)
+    wants_csv = (
+        request.query_params.get('output') == 'csv'
+        or 'text/csv' in request.META.get('HTTP_ACCEPT', '')
+    )
+    if wants_csv:
+        response = StreamingHttpResponse(_stream_csv(results), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="payroll_calculations.csv"'
+        return response
+    return StreamingHttpResponse(
+        (json.dumps(result) + '\n' for result in results),
+        content_type='application/x-ndjson'
+    )
+
+
+class LRUCache:
+    """Small thread-safe least-recently-used cache for response data"""
+    
+    def __init__(self, maxsize, max_age):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            expires_at, value = self._data[key]
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.max_age, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+_calculation_memo = LRUCache(
+    getattr(settings, 'PUBLIC_CALCULATOR_LRU_SIZE', DEFAULT_LRU_SIZE),
+    getattr(settings, 'PUBLIC_CALCULATOR_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+)
+
+
+def cached_calculation(request, namespace, key_parts, compute):
+    """
+    Serve a deterministic calculator response with HTTP and server-side caching.
+    
+    The cache key and ETag are derived from the normalized inputs, the
+    statutory rate version and today's date, so saving a rate or reaching
+    the effective date of a future-dated one invalidates every cached answer.
+    Data is looked up in this worker's LRU first, then in Django's cache
+    (shared between workers when a shared backend is configured). Only GET
+    responses carry an ETag and Cache-Control header, and those expire by
+    midnight when the rates in force may change.
+    
+    Args:
+        request: The DRF request
+        namespace: Name of the calculation, e.g. 'curve'
+        key_parts: JSON-serializable normalized inputs
+        compute: Callable returning the response data on a cache miss
+    
+    Returns:
+        Response: 304 if the client's copy is current, otherwise the data
+    """
+    rate_registry.refresh()
+    as_of = timezone.localdate()
+    key = json.dumps([namespace, rate_registry.version, as_of, key_parts], sort_keys=True, default=str)
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    etag = f'"{digest[:32]}"'
+    max_age = getattr(settings, 'PUBLIC_CALCULATOR_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+    cacheable = request.method == 'GET'
+    
+    if cacheable and etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        cache_key = f'public-calculator:{namespace}:{digest}'
+        data = _calculation_memo.get(cache_key)
+        if data is None:
+            data = cache.get(cache_key)
+            if data is None:
+                data = compute()
+                cache.set(cache_key, data, max_age)
+            _calculation_memo.set(cache_key, data)
+        response = Response(data)
+    
+    if cacheable:
+        midnight = timezone.make_aware(datetime.combine(as_of + timedelta(days=1), datetime.min.time()))
+        until_midnight = max(int((midnight - timezone.now()).total_seconds()), 0)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={min(max_age, until_midnight)}'
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def public_net_pay_curve(request):
+    """
+    Net pay, effective tax rate and employer cost across a salary range.
+    
+    Query parameters: `min_salary`, `max_salary` and either `step` or
+    `points` (at most MAX_CURVE_POINTS), plus the single calculator's
+    optional relief and deduction fields, held fixed along the curve.
+    
+    Every point is computed in one batch engine call. Between the returned
+    `breakpoints` net pay is exactly linear in gross pay, so charts can be
+    drawn accurately from the breakpoints alone. Responses carry an ETag and
+    Cache-Control header and are cached per parameter set, rate version and
+    day, so the curve follows future-dated rates from their effective date.
+    """
+    params = request.query_params
+    try:
+        min_salary = Decimal(params.get('min_salary', ''))
+        max_salary = Decimal(params.get('max_salary', ''))
+        step = safe_decimal(params.get('step'))
+        points = int(params.get('points') or 0)
+        fixed = {field: to_cents(safe_decimal(params.get(field))) for field in WHAT_IF_INPUTS if field != 'gross_salary'}
+        min_cents, max_cents, step_cents = to_cents(min_salary), to_cents(max_salary), to_cents(step)
+    except (InvalidOperation, ValueError):
+        return Response({
+            'error': 'min_salary, max_salary and step or points must be valid numbers',
+            'code': 'INVALID_FORMAT'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if min_cents <= 0 or max_cents < min_cents or max_cents > to_cents(Decimal('10000000')):
+        return Response({
+            'error': 'Salaries must satisfy 0 < min_salary <= max_salary <= 10,000,000',
+            'code': 'INVALID_RANGE'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Normalize to a list of gross salaries in cents
+    if step_cents > 0:
+        count = (max_cents - min_cents) // step_cents + 1
+        gross_points = [min_cents + i * step_cents for i in range(min(count, MAX_CURVE_POINTS + 1))]
+    elif points >= 2:
+        count = points
+        gross_points = sorted({
+            min_cents + (max_cents - min_cents) * i // (points - 1) for i in range(min(points, MAX_CURVE_POINTS + 1))
+        })
+    else:
+        return Response({
+            'error': 'Provide a positive step or at least 2 points',
+            'code': 'INVALID_FORMAT'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if count > MAX_CURVE_POINTS:
+        return Response({
+            'error': f'At most {MAX_CURVE_POINTS} points per curve',
+            'code': 'TOO_MANY_POINTS'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    def compute():
+        n = len(gross_points)
+        results = calculate_net_pay_batch(
+            gross_points,
+            pension_cents=[fixed['pension_contribution']] * n,
+            insurance_premiums_cents=[fixed['insurance_premiums']] * n,
+            medical_fund_cents=[fixed['medical_fund_contribution']] * n,
+            mortgage_interest_cents=[fixed['mortgage_interest']] * n,
+            helb_cents=[fixed['helb_deduction']] * n,
+            voluntary_cents=[fixed['other_voluntary_deductions']] * n
+        )
+        curve = []
+        for i, gross_cents in enumerate(gross_points):
+            paye_cents = results['paye_after_relief'][i]
+            # Employers match the employee's NSSF contribution and AHL
+            employer_cost_cents = gross_cents + results['nssf'][i] + results['ahl'][i]
+            curve.append({
+                'gross_salary': float(from_cents(gross_cents)),
+                'net_pay': float(from_cents(results['net_pay'][i])),
+                'paye_tax': float(from_cents(paye_cents)),
+                'total_deductions': float(from_cents(results['total_deductions'][i])),
+                'effective_tax_rate': round(paye_cents * 100 / gross_cents, 4),
+                'employer_cost': float(from_cents(employer_cost_cents)),
+            })
+        
+        solver = PayrollEngine().gross_from_net_solver(**{
+            WHAT_IF_INPUTS[field]: amount for field, amount in fixed.items()
+        })
+        breakpoints = [
+            {
+                'gross_salary': float(from_cents(round(gross))),
+                'net_pay': float(from_cents(solver.net_cents(round(gross)))),
+            }
+            for gross in solver.breakpoints if min_cents <= gross <= max_cents
+        ]
+        return {
+            'success': True,
+            'count': len(curve),
+            'inputs': {field: float(from_cents(amount)) for field, amount in fixed.items()},
+            'curve': curve,
+            'breakpoints': breakpoints,
+        }
+    
+    return cached_calculation(request, 'curve', [gross_points[0], gross_points[-1], len(gross_points), step_cents, fixed], compute)
@@ -0,0 +1,569 @@
+"""
+Payroll Run Pipeline
+The one payroll calculation, shared by the payroll API, the admin and the public
+calculator. Set-based payslip generation: prefetch inputs, compute in memory,
+bulk insert.
+"""
+
+import hashlib
+from decimal import Decimal
+from django.db.models import F, Prefetch
+
+from apps.employees.models import Employee, VoluntaryDeduction
+from apps.payroll.models import PayrollRun, Payslip, PayslipDeduction, PayrollInput
+from apps.payroll.ledger import refresh_tax_ledger, ledger_period
+
+from apps.compliance.deduction_graph import DeductionGraph
+from apps.compliance.gross_from_net import GrossFromNetSolver
+from apps.compliance.money import to_cents, from_cents
+from apps.compliance.rates import PENSION_MAX_RELIEF
+from apps.compliance.rate_registry import rate_registry
+
+PENSION_MAX_RELIEF_CENTS = to_cents(PENSION_MAX_RELIEF)
+
+# Employees computed and written per round-trip
+PAYROLL_BATCH_SIZE = 1000
+
+NO_OVERTIME = (Decimal('0.00'), Decimal('0.00'))
+
+# Bump when the calculation itself changes so re-runs recompute every payslip
+FINGERPRINT_VERSION = 3
+
+# Payslip columns rewritten when a re-run recomputes an existing payslip
+PAYSLIP_AMOUNT_FIELDS = [
+    'gross_salary', 'overtime_pay', 'total_gross_income', 'paye_tax', 'nssf_deduction',
+    'shif_deduction', 'ahl_deduction', 'helb_deduction', 'total_deductions', 'net_pay',
+    'personal_relief', 'insurance_relief', 'input_fingerprint',
+]
+
+
+def payroll_employees(employee_ids=None):
+    """
+    Active employees with their users joined and their active voluntary
+    deductions prefetched.
+
+    Iterating the queryset costs one query for employees and one for all of
+    their deductions, however many employees there are.
+    """
+    employees = Employee.objects.filter(is_active=True)
+    if employee_ids is not None:
+        employees = employees.filter(id__in=employee_ids)
+    return employees.select_related('user').order_by('pk').prefetch_related(
+        Prefetch(
+            'voluntary_deductions',
+            queryset=VoluntaryDeduction.objects.filter(is_active=True).order_by('pk'),
+            to_attr='active_voluntary_deductions'
+        )
+    )
+
+
+def staged_overtime(period_start, period_end, overrides=None):
+    """
+    Overtime hours staged in PayrollInput for a pay period, read in one query.
+
+    Args:
+        period_start: Period start date (date or YYYY-MM-DD)
+        period_end: Period end date (date or YYYY-MM-DD)
+        overrides: Optional {employee_id: (weekday_hours, weekend_hours)} that
+            take precedence over the staged rows
+
+    Returns:
+        dict: {employee_id: (weekday_hours, weekend_hours)}
+    """
+    overtime = {
+        employee_id: (weekday, weekend)
+        for employee_id, weekday, weekend in PayrollInput.objects.filter(
+            period_start_date=period_start,
+            period_end_date=period_end
+        ).values_list('employee_id', 'overtime_weekday_hours', 'overtime_weekend_hours')
+    }
+    overtime.update(overrides or {})
+    return overtime
+
+
+def overtime_from_request(data):
+    """
+    Collect legacy `overtime_weekday_<id>` / `overtime_weekend_<id>` request keys
+    into a {employee_id: (weekday_hours, weekend_hours)} dict in a single pass.
+
+    Prefer staging hours with the payroll-inputs upload; these keys only
+    override staged rows.
+    """
+    overtime = {}
+    for key, value in data.items():
+        for prefix, position in (('overtime_weekday_', 0), ('overtime_weekend_', 1)):
+            if key.startswith(prefix) and key[len(prefix):].isdigit():
+                employee_id = int(key[len(prefix):])
+                hours = list(overtime.get(employee_id, NO_OVERTIME))
+                hours[position] = Decimal(value)
+                overtime[employee_id] = tuple(hours)
+    return overtime
+
+
+class PayrollContext:
+    """
+    Everything a payroll run needs besides employee data, resolved once.
+
+    Statutory rates are looked up for the pay date when the context is
+    created, so every payslip in a run uses the same rates even if one is
+    edited mid-run.
+    """
+
+    def __init__(self, as_of=None):
+        self.as_of = as_of
+        self.nssf_rate = rate_registry.get('nssf', as_of)
+        self.shif_rate = rate_registry.get('shif', as_of)
+        self.ahl_rate = rate_registry.get('ahl', as_of)
+        self.personal_relief = rate_registry.get('paye_relief', as_of)
+        self.rate_version = rate_registry.version
+        self.pension_max_relief_cents = PENSION_MAX_RELIEF_CENTS
+        self._company_settings = None
+
+    @property
+    def company_settings(self):
+        """CompanySettings singleton, loaded on first use"""
+        if self._company_settings is None:
+            from apps.core.company_models import CompanySettings
+            self._company_settings = CompanySettings.get_settings()
+        return self._company_settings
+
+
+class PayrollEngine:
+    """Compute payslips in integer cents and write them in batches"""
+
+    def __init__(self, as_of=None, batch_size=PAYROLL_BATCH_SIZE, context=None):
+        self.context = context or PayrollContext(as_of)
+        self.as_of = self.context.as_of
+        self.batch_size = batch_size
+
+    def fingerprint(self, employee, weekday_ot=Decimal('0.00'), weekend_ot=Decimal('0.00')):
+        """
+        Hash of everything a payslip is computed from.
+
+        Covers the salary and relief fields on the employee, the overtime hours,
+        the active voluntary deductions, the pay date and the statutory rate
+        version, so two equal fingerprints always produce the same payslip.
+        """
+        parts = [
+            FINGERPRINT_VERSION,
+            self.as_of,
+            self.context.rate_version,
+            to_cents(employee.gross_salary),
+            to_cents(employee.helb_monthly_deduction),
+            to_cents(employee.monthly_insurance_premiums),
+            to_cents(employee.monthly_medical_fund_contribution),
+            to_cents(employee.monthly_mortgage_interest),
+            Decimal(weekday_ot).normalize(),
+            Decimal(weekend_ot).normalize(),
+        ]
+        for deduction in employee.active_voluntary_deductions:
+            parts.extend((deduction.pk, deduction.deduction_type, to_cents(deduction.amount)))
+        return hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def calculate_amounts(self, gross_cents, weekday_ot=Decimal('0.00'), weekend_ot=Decimal('0.00'),
+                          helb_cents=0, pension_lines=(), voluntary_lines=(), insurance_premiums_cents=0,
+                          medical_fund_cents=0, mortgage_interest_cents=0):
+        """
+        Compute one payslip from plain amounts in cents, without touching the database.
+
+        Args:
+            gross_cents: Basic gross salary
+            weekday_ot: Weekday overtime hours
+            weekend_ot: Weekend and holiday overtime hours
+            helb_cents: HELB loan repayment
+            pension_lines: (deduction_type, cents) pension contributions
+            voluntary_lines: (deduction_type, cents) other voluntary deductions
+            insurance_premiums_cents: Monthly insurance premiums
+            medical_fund_cents: Post-retirement medical fund contribution
+            mortgage_interest_cents: Monthly mortgage interest
+
+        Returns:
+            dict: All payslip amounts in cents plus the deduction lines
+        """
+        pension_lines = list(pension_lines)
+        voluntary_lines = list(voluntary_lines)
+        graph = self.deduction_graph(
+            basic_gross=gross_cents,
+            weekday_ot=weekday_ot,
+            weekend_ot=weekend_ot,
+            helb=helb_cents,
+            pension_contribution=sum(amount for _, amount in pension_lines),
+            voluntary_deductions=sum(amount for _, amount in voluntary_lines),
+            insurance_premiums=insurance_premiums_cents,
+            medical_fund_contribution=medical_fund_cents,
+            mortgage_interest=mortgage_interest_cents
+        )
+        result = self.result_from_graph(graph)
+        result['pension_lines'] = pension_lines
+        result['voluntary_lines'] = voluntary_lines
+        return result
+
+    def deduction_graph(self, **inputs):
+        """DeductionGraph for one payslip, using this run's rates and caps"""
+        context = self.context
+        return DeductionGraph(
+            nssf_rate=context.nssf_rate,
+            shif_rate=context.shif_rate,
+            ahl_rate=context.ahl_rate,
+            personal_relief=context.personal_relief,
+            pension_max_relief=context.pension_max_relief_cents,
+            **inputs
+        )
+
+    def gross_from_net_solver(self, **inputs):
+        """GrossFromNetSolver for fixed reliefs and deductions, using this run's rates and caps"""
+        context = self.context
+        return GrossFromNetSolver(
+            nssf_rate=context.nssf_rate,
+            shif_rate=context.shif_rate,
+            ahl_rate=context.ahl_rate,
+            personal_relief=context.personal_relief,
+            pension_max_relief=context.pension_max_relief_cents,
+            **inputs
+        )
+
+    @staticmethod
+    def result_from_graph(graph):
+        """Payslip amounts in cents read from an evaluated DeductionGraph"""
+        return {
+            'gross_cents': graph['basic_gross'],
+            'overtime_cents': graph['overtime'],
+            'total_gross_cents': graph['gross'],
+            'nssf_cents': graph['nssf'],
+            'shif_cents': graph['shif'],
+            'ahl_employee_cents': graph['ahl'],
+            'ahl_employer_cents': graph['ahl_employer'],
+            'helb_cents': graph['helb'],
+            'pension_cents': graph['pension_contribution'],
+            'pension_relief_cents': graph['pension_relief'],
+            'medical_fund_cents': graph['medical_fund_relief'],
+            'mortgage_interest_cents': graph['mortgage_interest_relief'],
+            'taxable_cents': graph['taxable_income'],
+            'paye_cents': graph['paye'],
+            'insurance_relief_cents': graph['insurance_relief'],
+            'paye_after_relief_cents': graph['paye_after_relief'],
+            'voluntary_deductions_cents': graph['voluntary_deductions'],
+            'total_statutory_cents': graph['total_statutory'],
+            'total_deductions_cents': graph['total_deductions'],
+            'net_pay_cents': graph['net_pay'],
+        }
+
+    def calculate(self, employee, weekday_ot=Decimal('0.00'), weekend_ot=Decimal('0.00')):
+        """
+        Compute one employee's payslip without touching the database.
+
+        The employee must come from `payroll_employees()` so its active voluntary
+        deductions are already loaded.
+
+        Returns:
+            dict: All payslip amounts in cents plus the deduction lines
+        """
+        pension_lines = []
+        voluntary_lines = []
+        for deduction in employee.active_voluntary_deductions:
+            line = (deduction.deduction_type, to_cents(deduction.amount))
+            if 'pension' in deduction.deduction_type.lower():
+                pension_lines.append(line)
+            else:
+                voluntary_lines.append(line)
+
+        result = self.calculate_amounts(
+            to_cents(employee.gross_salary),
+            weekday_ot,
+            weekend_ot,
+            helb_cents=to_cents(employee.helb_monthly_deduction),
+            pension_lines=pension_lines,
+            voluntary_lines=voluntary_lines,
+            insurance_premiums_cents=to_cents(employee.monthly_insurance_premiums),
+            medical_fund_cents=to_cents(employee.monthly_medical_fund_contribution),
+            mortgage_interest_cents=to_cents(employee.monthly_mortgage_interest)
+        )
+        result['employee'] = employee
+        result['employee_id'] = employee.id
+        result['fingerprint'] = self.fingerprint(employee, weekday_ot, weekend_ot)
+        return result
+
+    def build_payslip(self, payroll_run, result, pk=None):
+        """Unsaved Payslip for a calculation result"""
+        return Payslip(
+            pk=pk,
+            payroll_run=payroll_run,
+            employee_id=result['employee_id'],
+            gross_salary=from_cents(result['gross_cents']),
+            overtime_pay=from_cents(result['overtime_cents']),
+            total_gross_income=from_cents(result['total_gross_cents']),
+            paye_tax=from_cents(result['paye_cents']),
+            nssf_deduction=from_cents(result['nssf_cents']),
+            shif_deduction=from_cents(result['shif_cents']),
+            ahl_deduction=from_cents(result['ahl_employee_cents']),
+            helb_deduction=from_cents(result['helb_cents']),
+            total_deductions=from_cents(result['total_deductions_cents']),
+            net_pay=from_cents(result['net_pay_cents']),
+            personal_relief=self.context.personal_relief,
+            insurance_relief=from_cents(result['insurance_relief_cents']),
+            input_fingerprint=result['fingerprint']
+        )
+
+    def build_deduction_items(self, payslip, result):
+        """Unsaved PayslipDeduction rows for a saved payslip"""
+        items = []
+        statutory = (
+            ('PAYE Tax', result['paye_cents']),
+            ('NSSF', result['nssf_cents']),
+            ('SHIF', result['shif_cents']),
+            ('Affordable Housing Levy (AHL)', result['ahl_employee_cents']),
+            ('HELB', result['helb_cents']),
+        )
+        for deduction_type, amount_cents in statutory:
+            if amount_cents > 0:
+                items.append(PayslipDeduction(
+                    payslip=payslip, deduction_type=deduction_type,
+                    amount=from_cents(amount_cents), is_statutory=True
+                ))
+
+        for deduction_type, amount_cents in result['pension_lines'] + result['voluntary_lines']:
+            items.append(PayslipDeduction(
+                payslip=payslip, deduction_type=deduction_type,
+                amount=from_cents(amount_cents), is_statutory=False
+            ))
+        return items
+
+    def write_batch(self, payroll_run, results):
+        """
+        Insert payslips and their deduction lines for a batch of results, and
+        bring the employees' tax ledger up to date.
+
+        Returns:
+            list: The saved Payslip objects, in the same order as `results`
+        """
+        payslips = [self.build_payslip(payroll_run, result) for result in results]
+        Payslip.objects.bulk_create(payslips, batch_size=self.batch_size)
+
+        # Backends that cannot return inserted ids need one lookup per batch
+        if any(payslip.pk is None for payslip in payslips):
+            ids = dict(Payslip.objects.filter(
+                payroll_run=payroll_run,
+                employee_id__in=[payslip.employee_id for payslip in payslips]
+            ).values_list('employee_id', 'id'))
+            for payslip in payslips:
+                payslip.pk = ids[payslip.employee_id]
+
+        items = []
+        for payslip, result in zip(payslips, results):
+            items.extend(self.build_deduction_items(payslip, result))
+        PayslipDeduction.objects.bulk_create(items, batch_size=self.batch_size)
+        self.refresh_ledger(payroll_run, payslips)
+        return payslips
+
+    @staticmethod
+    def refresh_ledger(payroll_run, payslips):
+        """
+        Bring the tax ledger up to date for the employees of `payslips`.
+
+        Runs still being processed in the background are recorded when their
+        job marks them final.
+        """
+        if payroll_run.status == 'final':
+            refresh_tax_ledger([payslip.employee_id for payslip in payslips], *ledger_period(payroll_run))
+
+    def process_batch(self, payroll_run, employees, overtime=None):
+        """
+        Compute and write payslips for one batch of employees.
+
+        Returns:
+            dict: Payslip count and batch totals in cents
+        """
+        overtime = overtime or {}
+        results = [self.calculate(employee, *overtime.get(employee.id, NO_OVERTIME)) for employee in employees]
+        self.write_batch(payroll_run, results)
+        return self.summarize(results)
+
+    def iter_results(self, employees, overtime=None):
+        """Yield calculation results for `employees` in primary-key order"""
+        overtime = overtime or {}
+        for employee in employees.iterator(chunk_size=self.batch_size):
+            yield self.calculate(employee, *overtime.get(employee.id, NO_OVERTIME))
+
+    def process_run(self, payroll_run, employees, overtime=None):
+        """
+        Generate every payslip for a payroll run.
+
+        Args:
+            payroll_run: Saved PayrollRun the payslips belong to
+            employees: Queryset from `payroll_employees()`
+            overtime: Optional {employee_id: (weekday_hours, weekend_hours)}
+
+        Returns:
+            dict: Payslip count and run totals in cents
+        """
+        totals = self.summarize([])
+
+        batch = []
+        for result in self.iter_results(employees, overtime):
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                self.write_batch(payroll_run, batch)
+                self.add_totals(totals, self.summarize(batch))
+                batch = []
+        if batch:
+            self.write_batch(payroll_run, batch)
+            self.add_totals(totals, self.summarize(batch))
+
+        # Run totals come from the rounded in-memory results
+        payroll_run.total_net_pay = from_cents(totals['total_net_pay_cents'])
+        payroll_run.total_deductions = from_cents(totals['total_deductions_cents'])
+        payroll_run.save(update_fields=['total_net_pay', 'total_deductions'])
+        return totals
+
+    def preview(self, employees, overtime=None):
+        """
+        Compute a payroll run without writing anything.
+
+        Yields one JSON-ready dict per employee, in primary-key order, followed
+        by a final dict with the run totals.
+        """
+        totals = self.summarize([])
+        total_gross_cents = 0
+        for result in self.iter_results(employees, overtime):
+            self.add_totals(totals, self.summarize([result]))
+            total_gross_cents += result['total_gross_cents']
+            yield self.preview_line(result)
+
+        yield {
+            'type': 'totals',
+            'payslips': totals['payslips'],
+            'total_gross_income': str(from_cents(total_gross_cents)),
+            'total_deductions': str(from_cents(totals['total_deductions_cents'])),
+            'total_net_pay': str(from_cents(totals['total_net_pay_cents'])),
+        }
+
+    @staticmethod
+    def preview_line(result):
+        """JSON-ready payslip preview for a calculation result"""
+        employee = result.get('employee')
+        return {
+            'type': 'payslip',
+            'employee_id': result['employee_id'],
+            'employee_name': employee.user.get_full_name() if employee is not None else None,
+            'gross_salary': str(from_cents(result['gross_cents'])),
+            'overtime_pay': str(from_cents(result['overtime_cents'])),
+            'total_gross_income': str(from_cents(result['total_gross_cents'])),
+            'paye_tax': str(from_cents(result['paye_cents'])),
+            'nssf_deduction': str(from_cents(result['nssf_cents'])),
+            'shif_deduction': str(from_cents(result['shif_cents'])),
+            'ahl_deduction': str(from_cents(result['ahl_employee_cents'])),
+            'helb_deduction': str(from_cents(result['helb_cents'])),
+            'pension_contribution': str(from_cents(result['pension_cents'])),
+            'voluntary_deductions': [
+                {'deduction_type': deduction_type, 'amount': str(from_cents(amount_cents))}
+                for deduction_type, amount_cents in result['voluntary_lines']
+            ],
+            'total_deductions': str(from_cents(result['total_deductions_cents'])),
+            'net_pay': str(from_cents(result['net_pay_cents'])),
+        }
+
+    def rerun(self, payroll_run, employees, overtime=None):
+        """
+        Recompute only the payslips whose inputs changed since they were generated.
+
+        Each employee's fingerprint is compared with the one stored on their
+        payslip in `payroll_run`; unchanged payslips are skipped without being
+        recalculated. Changed payslips are rewritten in place (their ids stay
+        the same), employees without a payslip get one, and the run totals are
+        adjusted by the difference. Payslips of employees not in `employees`
+        are left as they are.
+
+        Args:
+            payroll_run: The PayrollRun to correct
+            employees: Queryset from `payroll_employees()`
+            overtime: Optional {employee_id: (weekday_hours, weekend_hours)}
+
+        Returns:
+            dict: Counts of unchanged, updated and created payslips and the
+            change in run totals, in cents
+        """
+        overtime = overtime or {}
+        existing = {
+            employee_id: (payslip_id, fingerprint, to_cents(net_pay), to_cents(total_deductions))
+            for payslip_id, employee_id, fingerprint, net_pay, total_deductions in Payslip.objects.filter(
+                payroll_run=payroll_run
+            ).values_list('id', 'employee_id', 'input_fingerprint', 'net_pay', 'total_deductions')
+        }
+
+        summary = {
+            'unchanged': 0,
+            'updated': 0,
+            'created': 0,
+            'net_pay_delta_cents': 0,
+            'deductions_delta_cents': 0,
+        }
+        updated, created = [], []
+
+        def flush():
+            if updated:
+                self.rewrite_batch(payroll_run, updated)
+            if created:
+                self.write_batch(payroll_run, created)
+            updated.clear()
+            created.clear()
+
+        for employee in employees.iterator(chunk_size=self.batch_size):
+            hours = overtime.get(employee.id, NO_OVERTIME)
+            previous = existing.get(employee.id)
+            if previous and previous[1] == self.fingerprint(employee, *hours):
+                summary['unchanged'] += 1
+                continue
+
+            result = self.calculate(employee, *hours)
+            summary['net_pay_delta_cents'] += result['net_pay_cents']
+            summary['deductions_delta_cents'] += result['total_deductions_cents']
+            if previous:
+                result['payslip_id'] = previous[0]
+                summary['net_pay_delta_cents'] -= previous[2]
+                summary['deductions_delta_cents'] -= previous[3]
+                updated.append(result)
+            else:
+                created.append(result)
+
+            summary['updated' if previous else 'created'] += 1
+            if len(updated) + len(created) >= self.batch_size:
+                flush()
+        flush()
+
+        if summary['net_pay_delta_cents'] or summary['deductions_delta_cents']:
+            PayrollRun.objects.filter(pk=payroll_run.pk).update(
+                total_net_pay=F('total_net_pay') + from_cents(summary['net_pay_delta_cents']),
+                total_deductions=F('total_deductions') + from_cents(summary['deductions_delta_cents'])
+            )
+            payroll_run.refresh_from_db(fields=['total_net_pay', 'total_deductions'])
+        return summary
+
+    def rewrite_batch(self, payroll_run, results):
+        """
+        Overwrite existing payslips (`result['payslip_id']`), replace their
+        deduction lines and bring the employees' tax ledger up to date.
+        """
+        payslips = [self.build_payslip(payroll_run, result, pk=result['payslip_id']) for result in results]
+        Payslip.objects.bulk_update(payslips, PAYSLIP_AMOUNT_FIELDS, batch_size=self.batch_size)
+        PayslipDeduction.objects.filter(payslip__in=[payslip.pk for payslip in payslips]).delete()
+
+        items = []
+        for payslip, result in zip(payslips, results):
+            items.extend(self.build_deduction_items(payslip, result))
+        PayslipDeduction.objects.bulk_create(items, batch_size=self.batch_size)
+        self.refresh_ledger(payroll_run, payslips)
+        return payslips
+
+    @staticmethod
+    def summarize(results):
+        """Payslip count and totals in cents for a list of calculation results"""
+        return {
+            'payslips': len(results),
+            'total_net_pay_cents': sum(result['net_pay_cents'] for result in results),
+            'total_deductions_cents': sum(result['total_deductions_cents'] for result in results),
+        }
+
+    @staticmethod
+    def add_totals(totals, batch_totals):
+        for key, value in batch_totals.items():
+            totals[key] += value
@@ -0,0 +1,218 @@
+"""
+Payroll Input Uploads
+Validate CSV/JSON timesheet rows one at a time and stage them with batched upserts
+"""
+
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from apps.employees.models import Employee, JobInformation
+from apps.payroll.models import PayrollInput
+
+UPLOAD_BATCH_SIZE = 1000
+
+# Errors returned to the uploader; counting continues past this many
+MAX_REPORTED_ERRORS = 100
+
+MAX_OVERTIME_HOURS = Decimal('744.00')  # hours in a 31-day month
+
+# Characters read at a time from a JSON array upload
+JSON_READ_SIZE = 64 * 1024
+
+
+def iter_csv_rows(uploaded_file):
+    """Yield dict rows from an uploaded CSV file without reading it all into memory"""
+    text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    yield from csv.DictReader(text)
+
+
+def iter_json_rows(uploaded_file):
+    """Yield dict rows from an uploaded JSON array or JSON-lines file without reading it all into memory"""
+    text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig')
+    first = text.read(1)
+    while first.isspace():
+        first = text.read(1)
+    if first == '[':
+        yield from _iter_json_array(text)
+        return
+    if first:
+        yield json.loads(first + text.readline())
+    for line in text:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_json_array(text, read_size=JSON_READ_SIZE):
+    """
+    Yield the elements of a JSON array as they are read, its opening '[' already consumed.
+
+    Only the unparsed tail of the last read is buffered.
+
+    Raises:
+        json.JSONDecodeError: If the array is malformed or truncated
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+    # What may come next: 'first' value or ']', a 'value' after a comma, or a 'delimiter'
+    expecting = 'first'
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+
+        if position < len(buffer):
+            char = buffer[position]
+            if char == ']' and expecting != 'value':
+                return
+            if expecting == 'delimiter':
+                if char != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+                position += 1
+                expecting = 'value'
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+            # A value running to the end of the buffer may continue in the next read
+            if end is not None and (end < len(buffer) or eof):
+                yield value
+                position = end
+                expecting = 'delimiter'
+                continue
+        elif eof:
+            raise json.JSONDecodeError('Unterminated array', buffer, position)
+
+        chunk = text.read(read_size)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def _hours(row, column):
+    value = row.get(column)
+    if value in (None, ''):
+        return Decimal('0.00')
+    try:
+        hours = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'{column} must be a number')
+    if not hours.is_finite() or hours < 0 or hours > MAX_OVERTIME_HOURS:
+        raise ValueError(f'{column} must be between 0 and {MAX_OVERTIME_HOURS}')
+    return hours.quantize(Decimal('0.01'))
+
+
+def _date(row, column):
+    value = row.get(column)
+    if not value:
+        raise ValueError(f'{column} is required')
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f'{column} must be a YYYY-MM-DD date')
+
+
+class PayrollInputLoader:
+    """
+    Validates uploaded payroll input rows and upserts them in batches.
+
+    Employees are resolved by `employee_id` or `company_employee_id` against
+    two lookups loaded once per upload, so validation never queries per row.
+    A row for an employee and period that is already staged replaces it.
+    """
+
+    def __init__(self, uploaded_by=None, batch_size=UPLOAD_BATCH_SIZE):
+        self.uploaded_by = uploaded_by
+        self.batch_size = batch_size
+        self.employee_ids = set(Employee.objects.filter(is_active=True).values_list('id', flat=True))
+        self.company_ids = dict(
+            JobInformation.objects.filter(employee__is_active=True).values_list('company_employee_id', 'employee_id')
+        )
+
+    def parse_row(self, row):
+        """
+        Build an unsaved PayrollInput from one row.
+
+        Raises:
+            ValueError: If the row is invalid
+        """
+        if not isinstance(row, dict):
+            raise ValueError('each row must be an object')
+
+        employee_id = row.get('employee_id')
+        if employee_id not in (None, ''):
+            try:
+                employee_id = int(employee_id)
+            except (TypeError, ValueError):
+                raise ValueError('employee_id must be an integer')
+        elif row.get('company_employee_id'):
+            employee_id = self.company_ids.get(str(row['company_employee_id']).strip())
+            if employee_id is None:
+                raise ValueError(f"unknown company_employee_id {row['company_employee_id']}")
+        else:
+            raise ValueError('employee_id or company_employee_id is required')
+        if employee_id not in self.employee_ids:
+            raise ValueError(f'no active employee with id {employee_id}')
+
+        period_start = _date(row, 'period_start_date')
+        period_end = _date(row, 'period_end_date')
+        if period_end < period_start:
+            raise ValueError('period_end_date is before period_start_date')
+
+        return PayrollInput(
+            employee_id=employee_id,
+            period_start_date=period_start,
+            period_end_date=period_end,
+            overtime_weekday_hours=_hours(row, 'overtime_weekday_hours'),
+            overtime_weekend_hours=_hours(row, 'overtime_weekend_hours'),
+            uploaded_by=self.uploaded_by
+        )
+
+    def load(self, rows):
+        """
+        Validate and stage rows from any iterable.
+
+        Valid rows are written in batches as they are read; call inside a
+        transaction and roll back if `errors` is not empty to make the upload
+        all-or-nothing.
+
+        Returns:
+            dict: Row counts and up to MAX_REPORTED_ERRORS {row, error} dicts
+        """
+        summary = {'rows': 0, 'staged': 0, 'invalid': 0, 'errors': []}
+        batch = {}
+
+        for row_number, row in enumerate(rows, start=1):
+            summary['rows'] += 1
+            try:
+                payroll_input = self.parse_row(row)
+            except ValueError as e:
+                summary['invalid'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({'row': row_number, 'error': str(e)})
+                continue
+
+            # The last row for an employee and period wins within a batch too
+            key = (payroll_input.employee_id, payroll_input.period_start_date, payroll_input.period_end_date)
+            batch[key] = payroll_input
+            if len(batch) >= self.batch_size:
+                summary['staged'] += self.write(batch.values())
+                batch = {}
+
+        if batch:
+            summary['staged'] += self.write(batch.values())
+        return summary
+
+    def write(self, payroll_inputs):
+        payroll_inputs = list(payroll_inputs)
+        PayrollInput.objects.bulk_create(
+            payroll_inputs,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['employee', 'period_start_date', 'period_end_date'],
+            update_fields=['overtime_weekday_hours', 'overtime_weekend_hours', 'uploaded_by', 'updated_at']
+        )
+        return len(payroll_inputs)
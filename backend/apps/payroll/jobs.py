@@ -0,0 +1,176 @@
+"""
+Background Payroll Jobs
+Process a payroll run in employee chunks, committing each chunk separately
+"""
+
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.payroll.models import PayrollRun, PayrollJob
+from apps.payroll.engine import PayrollEngine, payroll_employees, staged_overtime
+from apps.payroll.ledger import refresh_run_tax_ledger
+from apps.compliance.money import from_cents
+from apps.compliance.rate_registry import rate_registry
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Largest chunk a request may ask for; each chunk is one transaction
+MAX_CHUNK_SIZE = 10000
+
+# Seconds without a heartbeat before a pending or running job is presumed
+# dead, unless PAYROLL_JOB_STALE_SECONDS is set
+DEFAULT_STALE_SECONDS = 900
+
+
+def serialize_overtime(overtime):
+    """{employee_id: (Decimal, Decimal)} -> JSON-safe {str(id): [str, str]}"""
+    return {str(employee_id): [str(weekday), str(weekend)] for employee_id, (weekday, weekend) in overtime.items()}
+
+
+def deserialize_overtime(data):
+    return {int(employee_id): (Decimal(weekday), Decimal(weekend)) for employee_id, (weekday, weekend) in data.items()}
+
+
+def create_payroll_job(payroll_run, created_by=None, overtime=None, chunk_size=None):
+    """
+    Create the job record for a background run and schedule it once the
+    surrounding transaction commits.
+    """
+    job = PayrollJob.objects.create(
+        payroll_run=payroll_run,
+        created_by=created_by,
+        chunk_size=chunk_size or getattr(settings, 'PAYROLL_JOB_CHUNK_SIZE', DEFAULT_CHUNK_SIZE),
+        total_employees=payroll_employees().count(),
+        overtime_inputs=serialize_overtime(overtime or {}),
+        heartbeat_at=timezone.now()
+    )
+    transaction.on_commit(lambda: enqueue_payroll_job(job.id))
+    return job
+
+
+def enqueue_payroll_job(job_id):
+    """
+    Hand a job to a Celery worker when a broker is configured, otherwise run it
+    in a background thread of the current process.
+    """
+    if getattr(settings, 'CELERY_BROKER_URL', ''):
+        from kenyan_payroll_project.celery import app  # noqa: F401 - binds tasks to the configured broker
+        from apps.payroll.tasks import process_payroll_job_task
+        process_payroll_job_task.delay(job_id)
+        return
+
+    def run():
+        try:
+            process_payroll_job(job_id)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name=f'payroll-job-{job_id}', daemon=True).start()
+
+
+def claim_job_for_retry(job_id):
+    """
+    Move a job back to pending so it can be enqueued again.
+
+    Failed jobs can always be claimed. Pending and running jobs can be claimed
+    once their heartbeat is older than PAYROLL_JOB_STALE_SECONDS, which means
+    the worker or thread that owned them has died. The claim is a single
+    conditional update, so concurrent retries enqueue a job only once.
+
+    Returns:
+        bool: Whether the job was claimed
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=getattr(settings, 'PAYROLL_JOB_STALE_SECONDS', DEFAULT_STALE_SECONDS))
+    stale = Q(heartbeat_at__lt=stale_before) | Q(heartbeat_at__isnull=True, created_at__lt=stale_before)
+    retryable = Q(status='failed') | (Q(status__in=['pending', 'running']) & stale)
+    return bool(PayrollJob.objects.filter(retryable, pk=job_id).update(status='pending', heartbeat_at=now))
+
+
+def process_payroll_job(job_id):
+    """
+    Compute and commit a payroll run chunk by chunk.
+
+    Employees that already have a payslip in the run are skipped, so a failed
+    job can be retried and only the missing chunks are processed. The run is
+    marked final only when no chunk failed. The job's heartbeat is renewed
+    after every chunk so a job whose worker died can be told apart from a
+    slow one and retried.
+    """
+    job = PayrollJob.objects.select_related('payroll_run').get(pk=job_id)
+    payroll_run = job.payroll_run
+
+    job.status = 'running'
+    job.started_at = job.started_at or timezone.now()
+    job.heartbeat_at = timezone.now()
+    job.finished_at = None
+    job.failed_employees = 0
+    job.errors = []
+    job.save(update_fields=['status', 'started_at', 'heartbeat_at', 'finished_at', 'failed_employees', 'errors'])
+
+    try:
+        rate_registry.refresh(force=True)
+        engine = PayrollEngine(as_of=payroll_run.period_end_date, batch_size=job.chunk_size)
+        overtime = staged_overtime(
+            payroll_run.period_start_date, payroll_run.period_end_date,
+            overrides=deserialize_overtime(job.overtime_inputs)
+        )
+
+        pending_ids = list(
+            payroll_employees()
+            .exclude(payslips__payroll_run=payroll_run)
+            .values_list('id', flat=True)
+        )
+
+        for start in range(0, len(pending_ids), job.chunk_size):
+            chunk_ids = pending_ids[start:start + job.chunk_size]
+            try:
+                with transaction.atomic():
+                    totals = engine.process_batch(payroll_run, payroll_employees(chunk_ids), overtime)
+                    PayrollRun.objects.filter(pk=payroll_run.pk).update(
+                        total_net_pay=F('total_net_pay') + from_cents(totals['total_net_pay_cents']),
+                        total_deductions=F('total_deductions') + from_cents(totals['total_deductions_cents'])
+                    )
+                    PayrollJob.objects.filter(pk=job.pk).update(
+                        processed_employees=F('processed_employees') + totals['payslips'],
+                        heartbeat_at=timezone.now()
+                    )
+            except Exception as e:
+                job.refresh_from_db(fields=['errors'])
+                job.errors.append({
+                    'first_employee_id': chunk_ids[0],
+                    'last_employee_id': chunk_ids[-1],
+                    'employees': len(chunk_ids),
+                    'error': str(e),
+                })
+                PayrollJob.objects.filter(pk=job.pk).update(
+                    failed_employees=F('failed_employees') + len(chunk_ids),
+                    errors=job.errors,
+                    heartbeat_at=timezone.now()
+                )
+
+        job.refresh_from_db()
+        if not job.failed_employees:
+            with transaction.atomic():
+                PayrollRun.objects.filter(pk=payroll_run.pk).update(status='final')
+                # Payslips enter the tax ledger only once their run is final
+                refresh_run_tax_ledger(payroll_run)
+        job.status = 'failed' if job.failed_employees else 'completed'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at'])
+    except Exception as e:
+        # Anything outside the chunks (rates, inputs, the pending employees,
+        # finalising the run) fails the whole job; it can be retried like a
+        # failed chunk
+        job.refresh_from_db(fields=['errors'])
+        job.errors.append({'error': str(e)})
+        job.status = 'failed'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at', 'errors'])
+    return job
@@ -0,0 +1,230 @@
+"""
+Tax Ledger
+Running year-to-date pay and tax per employee, one row per month of the tax year,
+kept in step with payslips by the payroll engine
+"""
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, When, F, Count, Max, Sum, Value, DecimalField
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from apps.payroll.models import Payslip, PayslipDeduction, TaxLedgerEntry
+
+# Employees refreshed per round-trip
+LEDGER_BATCH_SIZE = 1000
+
+# Monthly amounts; each has a running `ytd_<field>` total
+LEDGER_AMOUNT_FIELDS = [
+    'basic_salary', 'benefits', 'gross_pay', 'nssf', 'pension', 'shif', 'ahl', 'paye',
+    'personal_relief', 'insurance_relief',
+]
+LEDGER_FIELDS = ['payslip_count'] + LEDGER_AMOUNT_FIELDS + [f'ytd_{field}' for field in LEDGER_AMOUNT_FIELDS]
+
+ZERO = Decimal('0.00')
+
+# Only payslips of final runs are recorded; runs still processing or whose
+# background job failed are left out until they are complete
+FINAL_PAYSLIPS = {'payroll_run__status': 'final'}
+
+
+def ledger_models(app_registry=None):
+    """
+    The models the ledger reads and writes: (Payslip, PayslipDeduction, TaxLedgerEntry).
+
+    Data migrations pass their app registry to get the historical models.
+    """
+    if app_registry is None:
+        return Payslip, PayslipDeduction, TaxLedgerEntry
+    return tuple(app_registry.get_model('payroll', name) for name in ('Payslip', 'PayslipDeduction', 'TaxLedgerEntry'))
+
+
+def ledger_period(payroll_run):
+    """(tax_year, month) a payroll run's payslips are recorded under: its period start"""
+    period_start = payroll_run.period_start_date
+    if isinstance(period_start, str):
+        # Runs created from request data still hold the ISO string
+        period_start = date.fromisoformat(period_start)
+    return period_start.year, period_start.month
+
+
+def monthly_amounts(payslips, deduction_model=PayslipDeduction):
+    """
+    The ledger amounts of `payslips`, grouped by employee and pay month, in two queries.
+
+    Benefits are what a payslip's total gross exceeds its basic salary by;
+    pension is the sum of its non-statutory deduction lines named pension.
+    Personal relief is granted once a month, however many payslips the
+    employee has in it.
+
+    Returns:
+        dict: {(employee_id, tax_year, month): {'payslip_count': ..., <amount field>: ...}}
+    """
+    benefits = Case(
+        When(total_gross_income__gt=F('gross_salary'), then=F('total_gross_income') - F('gross_salary')),
+        default=Value(ZERO),
+        output_field=DecimalField(max_digits=12, decimal_places=2)
+    )
+    rows = payslips.annotate(
+        tax_year=ExtractYear('payroll_run__period_start_date'),
+        month=ExtractMonth('payroll_run__period_start_date')
+    ).values('employee_id', 'tax_year', 'month').annotate(
+        payslip_count=Count('id'),
+        basic_salary=Sum('gross_salary'),
+        benefits=Sum(benefits),
+        gross_pay=Sum('total_gross_income'),
+        nssf=Sum('nssf_deduction'),
+        shif=Sum('shif_deduction'),
+        ahl=Sum('ahl_deduction'),
+        paye=Sum('paye_tax'),
+        personal_relief=Max('personal_relief'),
+        insurance_relief=Sum('insurance_relief')
+    ).order_by()
+
+    pensions = deduction_model.objects.filter(
+        payslip__in=payslips.values('pk'),
+        deduction_type__icontains='pension',
+        is_statutory=False
+    ).annotate(
+        tax_year=ExtractYear('payslip__payroll_run__period_start_date'),
+        month=ExtractMonth('payslip__payroll_run__period_start_date')
+    ).values('payslip__employee_id', 'tax_year', 'month').annotate(pension=Sum('amount')).order_by()
+    pension_by_month = {
+        (row['payslip__employee_id'], row['tax_year'], row['month']): row['pension'] for row in pensions
+    }
+
+    amounts = {}
+    for row in rows:
+        key = (row.pop('employee_id'), row.pop('tax_year'), row.pop('month'))
+        row['pension'] = pension_by_month.get(key) or ZERO
+        amounts[key] = row
+    return amounts
+
+
+def accumulate(months, from_month=1):
+    """
+    Recompute the year-to-date totals of one employee's ledger entries.
+
+    Args:
+        months: {month: TaxLedgerEntry} for one employee and tax year
+        from_month: First month whose entry needs saving
+
+    Returns:
+        list: The entries from `from_month` on, in month order
+    """
+    running = dict.fromkeys(LEDGER_AMOUNT_FIELDS, ZERO)
+    entries = []
+    for month in sorted(months):
+        entry = months[month]
+        for field in LEDGER_AMOUNT_FIELDS:
+            running[field] += getattr(entry, field)
+            setattr(entry, f'ytd_{field}', running[field])
+        if month >= from_month:
+            entries.append(entry)
+    return entries
+
+
+def save_entries(entries, ledger_model=TaxLedgerEntry):
+    """Insert new ledger entries and update existing ones (by employee, tax year and month)"""
+    ledger_model.objects.bulk_create(
+        entries,
+        batch_size=LEDGER_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['employee', 'tax_year', 'month'],
+        update_fields=LEDGER_FIELDS + ['updated_at']
+    )
+
+
+def refresh_tax_ledger(employee_ids, tax_year, month):
+    """
+    Recompute one month of the ledger for `employee_ids` from their payslips in
+    that month, and carry any change into the year-to-date totals of later months.
+
+    Call it inside the transaction that wrote or deleted the payslips. Each batch
+    of LEDGER_BATCH_SIZE employees costs a fixed number of queries.
+
+    Returns:
+        int: Ledger entries written
+    """
+    employee_ids = sorted(set(employee_ids))
+    written = 0
+    with transaction.atomic():
+        for start in range(0, len(employee_ids), LEDGER_BATCH_SIZE):
+            written += _refresh_batch(employee_ids[start:start + LEDGER_BATCH_SIZE], tax_year, month)
+    return written
+
+
+def refresh_run_tax_ledger(payroll_run):
+    """Bring the ledger up to date for every employee paid in a payroll run"""
+    employee_ids = Payslip.objects.filter(payroll_run=payroll_run).values_list('employee_id', flat=True)
+    return refresh_tax_ledger(employee_ids, *ledger_period(payroll_run))
+
+
+def _refresh_batch(employee_ids, tax_year, month):
+    amounts = monthly_amounts(Payslip.objects.filter(
+        employee_id__in=employee_ids,
+        payroll_run__period_start_date__year=tax_year,
+        payroll_run__period_start_date__month=month,
+        **FINAL_PAYSLIPS
+    ))
+
+    ledger = defaultdict(dict)
+    for entry in TaxLedgerEntry.objects.filter(employee_id__in=employee_ids, tax_year=tax_year):
+        ledger[entry.employee_id][entry.month] = entry
+
+    changed, removed = [], []
+    for employee_id in employee_ids:
+        months = ledger[employee_id]
+        data = amounts.get((employee_id, tax_year, month))
+        if data is None:
+            # No payslips left in the month
+            entry = months.pop(month, None)
+            if entry is None:
+                continue
+            removed.append(entry.pk)
+        else:
+            entry = months.get(month) or TaxLedgerEntry(employee_id=employee_id, tax_year=tax_year, month=month)
+            for field, value in data.items():
+                setattr(entry, field, value)
+            months[month] = entry
+        changed.extend(accumulate(months, from_month=month))
+
+    if removed:
+        TaxLedgerEntry.objects.filter(pk__in=removed).delete()
+    save_entries(changed)
+    return len(changed)
+
+
+def rebuild_tax_ledger(tax_year, employee_ids=None, app_registry=None):
+    """
+    Rebuild a whole tax year of the ledger from payslips, e.g. to backfill it.
+
+    Args:
+        tax_year: Year to rebuild
+        employee_ids: Only rebuild these employees (default: everyone)
+        app_registry: A data migration's app registry, to use its historical models
+
+    Returns:
+        int: Ledger entries written
+    """
+    payslip_model, deduction_model, ledger_model = ledger_models(app_registry)
+    payslips = payslip_model.objects.filter(payroll_run__period_start_date__year=tax_year, **FINAL_PAYSLIPS)
+    entries = ledger_model.objects.filter(tax_year=tax_year)
+    if employee_ids is not None:
+        payslips = payslips.filter(employee_id__in=employee_ids)
+        entries = entries.filter(employee_id__in=employee_ids)
+
+    ledger = defaultdict(dict)
+    for (employee_id, year, month), data in monthly_amounts(payslips, deduction_model).items():
+        ledger[employee_id][month] = ledger_model(employee_id=employee_id, tax_year=year, month=month, **data)
+
+    with transaction.atomic():
+        entries.delete()
+        written = []
+        for months in ledger.values():
+            written.extend(accumulate(months))
+        save_entries(written, ledger_model)
+    return len(written)
@@ -0,0 +1,86 @@
+import json
+import platform
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from apps.employees.synthetic import DEFAULT_SEED
+from apps.payroll.benchmarks import isolated_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full payroll runs over synthetic workforces of increasing size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, nargs='+', default=[1000, 10000, 50000], help='Workforce sizes to benchmark (default: 1000 10000 50000)')
+        parser.add_argument('--period-start', type=str, default='2025-09-01', help='Period start date (YYYY-MM-DD)')
+        parser.add_argument('--period-end', type=str, default='2025-09-30', help='Period end date (YYYY-MM-DD)')
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'Seed for the synthetic workforce (default: {DEFAULT_SEED})')
+        parser.add_argument('--workers', type=int, default=None, help='Processes used to compute payslips (default: PAYROLL_WORKERS setting); more than 1 requires --keep')
+        parser.add_argument('--trace-memory', action='store_true', help='Also measure peak Python allocations with tracemalloc (slows the run)')
+        parser.add_argument('--keep', action='store_true', help='Commit the seeded employees and payroll runs instead of rolling them back')
+        parser.add_argument('--output', type=str, help='Write the results as JSON to this file')
+        parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+
+    def handle(self, *args, **options):
+        if options['workers'] and options['workers'] > 1 and not options['keep']:
+            # Worker processes use their own connections and cannot see rows
+            # seeded inside the benchmark's uncommitted transaction
+            raise CommandError('--workers above 1 needs --keep so worker processes can read the seeded employees')
+
+        results = []
+        for size in options['employees']:
+            if not options['json']:
+                self.stdout.write(f'🚀 Benchmarking a payroll run for {size:,} employees...')
+            try:
+                result = isolated_benchmark(
+                    size,
+                    options['period_start'],
+                    options['period_end'],
+                    keep=options['keep'],
+                    seed=options['seed'],
+                    workers=options['workers'],
+                    trace_memory=options['trace_memory']
+                )
+            except IntegrityError as e:
+                raise CommandError(f'Could not seed {size} employees (already kept from an earlier run?): {e}')
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            results.append(result)
+            if not options['json']:
+                self._write_result(result)
+
+        report = {
+            'python': platform.python_version(),
+            'period_start_date': options['period_start'],
+            'period_end_date': options['period_end'],
+            'seed': options['seed'],
+            'kept': options['keep'],
+            'runs': results,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            if options['output']:
+                self.stdout.write(f"💾 Results written to {options['output']}")
+            self.stdout.write(self.style.SUCCESS('✅ Payroll benchmark completed!'))
+
+    def _write_result(self, result):
+        rows = result['rows_written']
+        self.stdout.write(f"   🌱 Seeded in {result['seed_seconds']:.2f}s")
+        self.stdout.write(
+            f"   ⏱️  Run: {result['wall_seconds']:.2f}s ({result['employees_per_second']:,.0f} employees/sec), "
+            f"{result['sql_queries']} queries ({result['sql_seconds']:.2f}s in SQL)"
+        )
+        self.stdout.write(
+            f"   🧾 Rows written: {rows['payslips']:,} payslips, {rows['payslip_deductions']:,} deduction lines"
+        )
+        if result['peak_rss_kb'] is not None:
+            self.stdout.write(f"   🧠 Peak RSS: {result['peak_rss_kb'] / 1024:,.1f} MiB")
+        if result['peak_traced_kb'] is not None:
+            self.stdout.write(f"   🧠 Peak Python allocations: {result['peak_traced_kb'] / 1024:,.1f} MiB")
+        for stage, timing in result['stages'].items():
+            self.stdout.write(f"      {stage:<24}{timing['seconds']:>10.3f}s{timing['queries']:>8} queries")
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models.functions import ExtractYear
+
+from apps.payroll.models import PayrollRun
+from apps.payroll.ledger import rebuild_tax_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the year-to-date tax ledger from payslips (e.g. to backfill payslips written before the ledger existed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, nargs='+', help='Tax years to rebuild (default: every year with payroll runs)')
+        parser.add_argument('--employee', type=int, nargs='+', dest='employee_ids', help='Only rebuild these employee IDs')
+
+    def handle(self, *args, **options):
+        years = options['year'] or sorted(set(
+            PayrollRun.objects.annotate(year=ExtractYear('period_start_date')).values_list('year', flat=True)
+        ))
+
+        for year in years:
+            started = time.perf_counter()
+            entries = rebuild_tax_ledger(year, employee_ids=options['employee_ids'])
+            self.stdout.write(f'📒 {year}: {entries:,} ledger entries ({time.perf_counter() - started:.1f}s)')
+
+        self.stdout.write(self.style.SUCCESS('✅ Tax ledger rebuilt!'))
@@ -1,9 +1,14 @@
+import time
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
 from apps.payroll.models import PayrollRun
-from apps.employees.models import Employee
 from apps.core.models import User
+from apps.payroll.engine import payroll_employees, staged_overtime
+from apps.payroll.sharding import ShardedPayrollEngine
+from apps.compliance.money import from_cents
+from apps.compliance.rate_registry import rate_registry
 
 class Command(BaseCommand):
     help = 'Run payroll for September 2025'
@@ -12,6 +17,7 @@ class Command(BaseCommand):
         parser.add_argument('--period-start', type=str, default='2025-09-01', help='Period start date (YYYY-MM-DD)')
         parser.add_argument('--period-end', type=str, default='2025-09-30', help='Period end date (YYYY-MM-DD)')
         parser.add_argument('--run-by-email', type=str, default='employee@demo.com', help='Email of user running payroll')
+        parser.add_argument('--workers', type=int, default=None, help='Processes used to compute payslips (default: PAYROLL_WORKERS setting)')
 
     @transaction.atomic
     def handle(self, *args, **options):
@@ -25,6 +31,14 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'User with email {run_by_email} not found'))
             return
 
+        # Count active employees
+        employees = payroll_employees()
+        employee_count = employees.count()
+
+        if employee_count == 0:
+            self.stdout.write(self.style.WARNING('No active employees found'))
+            return
+
         # Create payroll run
         payroll_run = PayrollRun.objects.create(
             run_by=run_by_user,
@@ -33,13 +47,13 @@ class Command(BaseCommand):
             period_end_date=period_end
         )
 
-        # Count active employees
-        active_employees = Employee.objects.filter(is_active=True)
-        employee_count = active_employees.count()
-
-        if employee_count == 0:
-            self.stdout.write(self.style.WARNING('No active employees found'))
-            return
+        # Generate payslips from the staged overtime inputs, sharded across
+        # worker processes when requested
+        rate_registry.refresh(force=True)
+        engine = ShardedPayrollEngine(as_of=period_end, workers=options['workers'])
+        started = time.perf_counter()
+        totals = engine.process_run(payroll_run, employees, overtime=staged_overtime(period_start, period_end))
+        elapsed = time.perf_counter() - started
 
         self.stdout.write(self.style.SUCCESS(f'✅ Payroll run created successfully!'))
         self.stdout.write(f'📋 Payroll Run ID: {payroll_run.id}')
@@ -47,7 +61,8 @@ class Command(BaseCommand):
         self.stdout.write(f'📊 Period: {payroll_run.period_start_date} to {payroll_run.period_end_date}')
         self.stdout.write(f'👤 Run By: {payroll_run.run_by.email}')
         self.stdout.write(f'👥 Active Employees: {employee_count}')
+        self.stdout.write(f'🧾 Payslips Generated: {totals["payslips"]} ({engine.workers} worker(s), {elapsed:.2f}s)')
+        self.stdout.write(f'💰 Total Net Pay: KES {from_cents(totals["total_net_pay_cents"]):,}')
+        self.stdout.write(f'➖ Total Deductions: KES {from_cents(totals["total_deductions_cents"]):,}')
 
-        # Note: The actual payslip generation happens in the PayrollRunViewSet.create method
-        # If you want to trigger that here, you would need to import and call that logic
-        self.stdout.write(self.style.SUCCESS('✅ September 2025 payroll run completed!'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('✅ September 2025 payroll run completed!'))
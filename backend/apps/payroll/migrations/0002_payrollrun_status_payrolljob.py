@@ -0,0 +1,43 @@
+# Generated by Django 5.0.7 on 2026-10-16 09:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollrun',
+            name='status',
+            field=models.CharField(choices=[('processing', 'Processing'), ('final', 'Final')], default='final', help_text="Background runs stay 'processing' until every chunk has been committed", max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PayrollJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('chunk_size', models.PositiveIntegerField(default=500)),
+                ('total_employees', models.PositiveIntegerField(default=0)),
+                ('processed_employees', models.PositiveIntegerField(default=0)),
+                ('failed_employees', models.PositiveIntegerField(default=0)),
+                ('overtime_inputs', models.JSONField(blank=True, default=dict, help_text='{employee_id: [weekday_hours, weekend_hours]}')),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payroll_jobs', to=settings.AUTH_USER_MODEL)),
+                ('payroll_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='payroll.payrollrun')),
+            ],
+            options={
+                'verbose_name_plural': 'Payroll Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
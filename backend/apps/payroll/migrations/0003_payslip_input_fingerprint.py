@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-16 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0002_payrollrun_status_payrolljob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payslip',
+            name='input_fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Hash of the inputs this payslip was computed from; re-runs skip payslips whose inputs are unchanged', max_length=64),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-16 12:20
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0006_employee_account_holder_name_employee_account_type_and_more'),
+        ('payroll', '0003_payslip_input_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollInput',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start_date', models.DateField()),
+                ('period_end_date', models.DateField()),
+                ('overtime_weekday_hours', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=6)),
+                ('overtime_weekend_hours', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=6)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_inputs', to='employees.employee')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payroll_inputs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Payroll Inputs',
+                'ordering': ['period_start_date', 'employee'],
+                'unique_together': {('employee', 'period_start_date', 'period_end_date')},
+            },
+        ),
+    ]
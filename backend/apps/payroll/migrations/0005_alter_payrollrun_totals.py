@@ -0,0 +1,24 @@
+# Generated by Django 5.0.7 on 2026-10-16 14:10
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0004_payrollinput'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payrollrun',
+            name='total_deductions',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='payrollrun',
+            name='total_net_pay',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0.7 on 2026-10-16 15:40
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0006_employee_account_holder_name_employee_account_type_and_more'),
+        ('payroll', '0005_alter_payrollrun_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payslip',
+            name='insurance_relief',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='payslip',
+            name='personal_relief',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.CreateModel(
+            name='TaxLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tax_year', models.PositiveIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('payslip_count', models.PositiveIntegerField(default=0)),
+                ('basic_salary', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('benefits', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('gross_pay', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('nssf', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('pension', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('shif', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('ahl', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('paye', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('personal_relief', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('insurance_relief', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('ytd_basic_salary', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_benefits', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_gross_pay', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_nssf', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_pension', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_shif', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_ahl', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_paye', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_personal_relief', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('ytd_insurance_relief', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tax_ledger', to='employees.employee')),
+            ],
+            options={
+                'verbose_name_plural': 'Tax Ledger Entries',
+                'ordering': ['employee', 'tax_year', 'month'],
+                'unique_together': {('employee', 'tax_year', 'month')},
+            },
+        ),
+    ]
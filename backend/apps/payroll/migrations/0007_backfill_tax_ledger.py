@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-16 18:20
+
+from django.db import migrations
+
+
+def backfill_tax_ledger(apps, schema_editor):
+    """Fill the tax ledger from the payslips of final runs that predate it"""
+    from apps.compliance.rates import PAYE_PERSONAL_RELIEF
+    from apps.payroll.ledger import rebuild_tax_ledger
+
+    Payslip = apps.get_model('payroll', 'Payslip')
+    # Every payslip was granted the monthly personal relief before it was recorded
+    Payslip.objects.filter(personal_relief=0).update(personal_relief=PAYE_PERSONAL_RELIEF)
+
+    years = Payslip.objects.filter(payroll_run__status='final').dates('payroll_run__period_start_date', 'year')
+    for year in years:
+        rebuild_tax_ledger(year.year, app_registry=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0006_payslip_reliefs_taxledgerentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_tax_ledger, migrations.RunPython.noop),
+    ]
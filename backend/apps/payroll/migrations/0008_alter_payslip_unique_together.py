@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-16 18:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0006_employee_account_holder_name_employee_account_type_and_more'),
+        ('payroll', '0007_backfill_tax_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='payslip',
+            unique_together={('payroll_run', 'employee')},
+        ),
+    ]
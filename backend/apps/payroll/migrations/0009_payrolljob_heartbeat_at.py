@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0008_alter_payslip_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrolljob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last time the worker reported progress', null=True),
+        ),
+    ]
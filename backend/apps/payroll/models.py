@@ -6,12 +6,23 @@ from decimal import Decimal
 from apps.employees.models import Employee
 
 class PayrollRun(models.Model):
+    STATUS_CHOICES = (
+        ('processing', 'Processing'),
+        ('final', 'Final'),
+    )
+    
     run_date = models.DateField(default=timezone.now)
     run_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='payroll_runs')
     period_start_date = models.DateField()
     period_end_date = models.DateField()
-    total_net_pay = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
-    total_deductions = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    total_net_pay = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    total_deductions = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='final',
+        help_text="Background runs stay 'processing' until every chunk has been committed"
+    )
     
     def __str__(self):
         return f"Payroll Run for {self.period_start_date} to {self.period_end_date}"
@@ -37,10 +48,22 @@ class Payslip(models.Model):
     total_deductions = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
     net_pay = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
     
+    # Reliefs the PAYE was computed with
+    personal_relief = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    insurance_relief = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    
+    input_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        help_text="Hash of the inputs this payslip was computed from; re-runs skip payslips whose inputs are unchanged"
+    )
+    
     def __str__(self):
         return f"Payslip for {self.employee.user.first_name} {self.employee.user.last_name} ({self.payroll_run.run_date})"
 
     class Meta:
+        unique_together = ['payroll_run', 'employee']
         ordering = ['-payroll_run__run_date', 'employee__user__first_name']
 
 class PayslipDeduction(models.Model):
@@ -53,4 +76,115 @@ class PayslipDeduction(models.Model):
         return f"{self.deduction_type} on {self.payslip}"
 
     class Meta:
-        verbose_name_plural = "Payslip Deductions"
\ No newline at end of file
+        verbose_name_plural = "Payslip Deductions"
+
+class TaxLedgerEntry(models.Model):
+    """
+    One month of an employee's pay and tax for a tax year, with running year-to-date totals.
+    
+    Maintained by the payroll engine whenever payslips are written, corrected or
+    deleted (see apps/payroll/ledger.py), so P9s and YTD figures never rescan payslips.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='tax_ledger')
+    tax_year = models.PositiveIntegerField()
+    month = models.PositiveSmallIntegerField()
+    payslip_count = models.PositiveIntegerField(default=0)
+    
+    # The month's amounts, summed over its payslips
+    basic_salary = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    benefits = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    gross_pay = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    nssf = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    pension = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    shif = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    ahl = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    paye = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    personal_relief = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    insurance_relief = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    
+    # Totals from the start of the tax year to the end of this month
+    ytd_basic_salary = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_benefits = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_gross_pay = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_nssf = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_pension = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_shif = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_ahl = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_paye = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_personal_relief = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    ytd_insurance_relief = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Tax ledger for {self.employee} ({self.tax_year}-{self.month:02d})"
+    
+    class Meta:
+        unique_together = ['employee', 'tax_year', 'month']
+        ordering = ['employee', 'tax_year', 'month']
+        verbose_name_plural = "Tax Ledger Entries"
+
+class PayrollInput(models.Model):
+    """
+    Staged per-employee inputs for a pay period, uploaded in bulk before the run.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='payroll_inputs')
+    period_start_date = models.DateField()
+    period_end_date = models.DateField()
+    
+    overtime_weekday_hours = models.DecimalField(max_digits=6, decimal_places=2, default=Decimal('0.00'))
+    overtime_weekend_hours = models.DecimalField(max_digits=6, decimal_places=2, default=Decimal('0.00'))
+    
+    uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='payroll_inputs')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Payroll inputs for {self.employee} ({self.period_start_date} to {self.period_end_date})"
+    
+    class Meta:
+        unique_together = ['employee', 'period_start_date', 'period_end_date']
+        ordering = ['period_start_date', 'employee']
+        verbose_name_plural = "Payroll Inputs"
+
+class PayrollJob(models.Model):
+    """
+    Tracks a payroll run processed in the background, one committed chunk of employees at a time.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    
+    payroll_run = models.ForeignKey(PayrollRun, on_delete=models.CASCADE, related_name='jobs')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='payroll_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    
+    chunk_size = models.PositiveIntegerField(default=500)
+    total_employees = models.PositiveIntegerField(default=0)
+    processed_employees = models.PositiveIntegerField(default=0)
+    failed_employees = models.PositiveIntegerField(default=0)
+    
+    overtime_inputs = models.JSONField(default=dict, blank=True, help_text="{employee_id: [weekday_hours, weekend_hours]}")
+    errors = models.JSONField(default=list, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last time the worker reported progress")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Payroll job {self.pk} ({self.get_status_display()}) for {self.payroll_run}"
+    
+    @property
+    def throughput(self):
+        """Employees processed per second since the job started"""
+        if not self.started_at or not self.processed_employees:
+            return 0.0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return self.processed_employees / elapsed if elapsed > 0 else 0.0
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = "Payroll Jobs"
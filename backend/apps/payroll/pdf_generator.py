@@ -16,12 +16,26 @@ from apps.core.company_models import CompanySettings
 class PayslipPDFGenerator:
     """Generate PDF payslips with company logo and detailed deductions"""
     
+    # Bump whenever the layout changes so cached PDFs are re-rendered
+    TEMPLATE_VERSION = 1
+    
     def __init__(self, payslip):
         self.payslip = payslip
         self.company_settings = CompanySettings.get_settings()
+    
+    @property
+    def filename(self):
+        return f"payslip_{self.payslip.employee.user.first_name}_{self.payslip.employee.user.last_name}_{self.payslip.payroll_run.period_start_date.strftime('%Y_%m')}.pdf"
         
     def generate_pdf(self):
         """Generate and return PDF as HTTP response"""
+        response = HttpResponse(self.render(), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}"'
+        
+        return response
+    
+    def render(self):
+        """Render the payslip and return the PDF bytes"""
         buffer = BytesIO()
         doc = SimpleDocTemplate(
             buffer,
@@ -61,13 +75,7 @@ class PayslipPDFGenerator:
         # Build PDF
         doc.build(story)
         
-        # Return HTTP response
-        buffer.seek(0)
-        response = HttpResponse(buffer.read(), content_type='application/pdf')
-        filename = f"payslip_{self.payslip.employee.user.first_name}_{self.payslip.employee.user.last_name}_{self.payslip.payroll_run.period_start_date.strftime('%Y_%m')}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        return buffer.getvalue()
     
     def _get_styles(self):
         """Get custom styles for the PDF"""
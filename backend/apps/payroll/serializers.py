@@ -1,7 +1,8 @@
 # apps/payroll/serializers.py
 
 from rest_framework import serializers
-from .models import PayrollRun, Payslip, PayslipDeduction
+from .models import PayrollRun, Payslip, PayslipDeduction, PayrollJob, PayrollInput, TaxLedgerEntry
+from .ledger import LEDGER_AMOUNT_FIELDS
 from apps.employees.serializers import EmployeeSerializer
 from apps.core.company_models import CompanySettings
 
@@ -11,8 +12,42 @@ class PayrollRunSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PayrollRun
-        fields = ['id', 'run_date', 'run_by', 'period_start_date', 'period_end_date']
-        read_only_fields = ['run_by']
+        fields = ['id', 'run_date', 'run_by', 'period_start_date', 'period_end_date', 'status']
+        read_only_fields = ['run_by', 'status']
+
+
+class PayrollJobSerializer(serializers.ModelSerializer):
+    progress_percent = serializers.SerializerMethodField()
+    throughput = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = PayrollJob
+        fields = [
+            'id', 'payroll_run', 'status', 'chunk_size', 'total_employees',
+            'processed_employees', 'failed_employees', 'progress_percent',
+            'throughput', 'errors', 'created_at', 'started_at', 'heartbeat_at', 'finished_at'
+        ]
+        read_only_fields = fields
+    
+    def get_progress_percent(self, obj):
+        """Share of employees processed so far"""
+        if not obj.total_employees:
+            return 100.0 if obj.status == 'completed' else 0.0
+        return round(obj.processed_employees * 100 / obj.total_employees, 1)
+    
+    def get_throughput(self, obj):
+        """Employees processed per second"""
+        return round(obj.throughput, 2)
+
+
+class PayrollInputSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PayrollInput
+        fields = [
+            'id', 'employee', 'period_start_date', 'period_end_date',
+            'overtime_weekday_hours', 'overtime_weekend_hours', 'uploaded_by', 'updated_at'
+        ]
+        read_only_fields = fields
 
 
 class PayslipDeductionSerializer(serializers.ModelSerializer):
@@ -50,6 +85,7 @@ class PayslipDetailedSerializer(serializers.ModelSerializer):
     # Breakdown of statutory deductions
     statutory_deductions = serializers.SerializerMethodField()
     voluntary_deductions = serializers.SerializerMethodField()
+    year_to_date = serializers.SerializerMethodField()
     
     class Meta:
         model = Payslip
@@ -58,13 +94,14 @@ class PayslipDetailedSerializer(serializers.ModelSerializer):
             'gross_salary', 'overtime_pay', 'total_gross_income',
             'paye_tax', 'nssf_deduction', 'shif_deduction',
             'ahl_deduction', 'helb_deduction', 'total_deductions', 'net_pay',
-            'deductions', 'statutory_deductions', 'voluntary_deductions'
+            'personal_relief', 'insurance_relief',
+            'deductions', 'statutory_deductions', 'voluntary_deductions', 'year_to_date'
         ]
         read_only_fields = [
             'payroll_run', 'employee', 'gross_salary', 'overtime_pay',
             'total_gross_income', 'paye_tax', 'nssf_deduction', 'shif_deduction',
             'ahl_deduction', 'helb_deduction', 'total_deductions', 'net_pay',
-            'deductions'
+            'personal_relief', 'insurance_relief', 'deductions'
         ]
     
     def get_company_settings(self, obj):
@@ -80,6 +117,18 @@ class PayslipDetailedSerializer(serializers.ModelSerializer):
     def get_voluntary_deductions(self, obj):
         """Get all voluntary deductions"""
         return obj.deduction_items.filter(is_statutory=False).values('deduction_type', 'amount')
+    
+    def get_year_to_date(self, obj):
+        """Tax year totals up to the end of this payslip's month, read from the tax ledger"""
+        period_start = obj.payroll_run.period_start_date
+        entry = TaxLedgerEntry.objects.filter(
+            employee_id=obj.employee_id,
+            tax_year=period_start.year,
+            month=period_start.month
+        ).values(*[f'ytd_{field}' for field in LEDGER_AMOUNT_FIELDS]).first()
+        if entry is None:
+            return None
+        return {field: str(entry[f'ytd_{field}']) for field in LEDGER_AMOUNT_FIELDS}
 
 
 class PayslipSerializer(serializers.ModelSerializer):
@@ -0,0 +1,102 @@
+"""
+Sharded Payroll Runs
+Compute payslips in worker processes by employee ID range, write them from the parent
+"""
+
+import os
+
+from django.conf import settings
+
+from apps.core.processes import django_process_pool
+from apps.payroll.engine import PayrollEngine, PAYROLL_BATCH_SIZE, payroll_employees
+
+DEFAULT_WORKERS = 1
+
+
+def employee_id_shards(employee_ids, shards):
+    """
+    Split employee IDs into contiguous (low, high) ID ranges of near-equal size.
+
+    Args:
+        employee_ids: Employee primary keys, in any order
+        shards: Number of ranges wanted
+
+    Returns:
+        list: Inclusive (low, high) ID ranges in ascending order
+    """
+    employee_ids = sorted(employee_ids)
+    if not employee_ids:
+        return []
+    shards = max(1, min(shards, len(employee_ids)))
+    size, remainder = divmod(len(employee_ids), shards)
+
+    ranges = []
+    start = 0
+    for shard in range(shards):
+        end = start + size + (1 if shard < remainder else 0)
+        ranges.append((employee_ids[start], employee_ids[end - 1]))
+        start = end
+    return ranges
+
+
+def max_payroll_workers():
+    """Most processes a payroll request may ask for: the CPU count, or PAYROLL_WORKERS if higher"""
+    return max(getattr(settings, 'PAYROLL_WORKERS', DEFAULT_WORKERS), os.cpu_count() or 1)
+
+
+def compute_shard(task):
+    """
+    Compute the payslips of one ID range inside a worker process.
+
+    Workers only read; the parent process does all the writes so the run is
+    committed (or rolled back) as a whole. The parent's PayrollContext is
+    passed along so every shard uses the same rates.
+
+    Returns:
+        list: Calculation results without the Employee objects, in ID order
+    """
+    low, high, context, overtime = task
+    engine = PayrollEngine(context=context)
+    results = []
+    for result in engine.iter_results(payroll_employees().filter(id__gte=low, id__lte=high), overtime):
+        del result['employee']
+        results.append(result)
+    return results
+
+
+class ShardedPayrollEngine(PayrollEngine):
+    """
+    PayrollEngine that computes ID-range shards in a process pool.
+
+    Shard results are consumed in ascending ID order and summed in integer
+    cents, so payslips and run totals are identical to a single-process run
+    whatever the number of workers.
+    """
+
+    def __init__(self, as_of=None, batch_size=PAYROLL_BATCH_SIZE, workers=None, context=None):
+        super().__init__(as_of=as_of, batch_size=batch_size, context=context)
+        if workers is None:
+            workers = getattr(settings, 'PAYROLL_WORKERS', DEFAULT_WORKERS)
+        self.workers = max(1, int(workers))
+
+    def iter_results(self, employees, overtime=None):
+        if self.workers == 1:
+            yield from super().iter_results(employees, overtime)
+            return
+
+        overtime = overtime or {}
+        employee_ids = set(employees.values_list('id', flat=True))
+        tasks = []
+        for low, high in employee_id_shards(employee_ids, self.workers):
+            shard_overtime = {
+                employee_id: hours for employee_id, hours in overtime.items()
+                if low <= employee_id <= high
+            }
+            tasks.append((low, high, self.context, shard_overtime))
+
+        with django_process_pool(len(tasks) or 1) as executor:
+            for results in executor.map(compute_shard, tasks):
+                for result in results:
+                    # A shard range can include employees outside `employees`
+                    if result['employee_id'] in employee_ids:
+                        yield result
@@ -0,0 +1,32 @@
+# apps/payroll/signals.py
+
+from django.db.models.signals import pre_delete, post_delete
+from django.dispatch import receiver
+
+from apps.payroll.models import PayrollRun, Payslip
+from apps.payroll.ledger import refresh_tax_ledger, ledger_period
+
+
+@receiver(pre_delete, sender=PayrollRun)
+def remember_payroll_run_employees(sender, instance, **kwargs):
+    """Note whose payslips a deleted run takes with it, before they are gone"""
+    instance._ledger_employee_ids = list(
+        instance.payslips.values_list('employee_id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=PayrollRun)
+def refresh_ledger_after_payroll_run_delete(sender, instance, **kwargs):
+    """Take a deleted run's payslips out of the tax ledger, in one refresh"""
+    refresh_tax_ledger(getattr(instance, '_ledger_employee_ids', []), *ledger_period(instance))
+
+
+@receiver(post_delete, sender=Payslip)
+def refresh_ledger_after_payslip_delete(sender, instance, origin=None, **kwargs):
+    """Take a payslip deleted on its own out of the tax ledger"""
+    # Payslips deleted with their payroll run are handled once for the whole run
+    if isinstance(origin, PayrollRun) or getattr(origin, 'model', None) is PayrollRun:
+        return
+    payroll_run = PayrollRun.objects.filter(pk=instance.payroll_run_id).first()
+    if payroll_run is not None:
+        refresh_tax_ledger([instance.employee_id], *ledger_period(payroll_run))
@@ -0,0 +1,14 @@
+# apps/payroll/tasks.py
+
+from celery import shared_task
+
+@shared_task
+def process_payroll_job_task(job_id):
+    """
+    Celery entry point for a background payroll run.
+
+    Args:
+        job_id (int): The ID of the PayrollJob to process.
+    """
+    from apps.payroll.jobs import process_payroll_job
+    process_payroll_job(job_id)
@@ -0,0 +1,62 @@
+# apps/payroll/tests.py
+
+from datetime import date, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.payroll.jobs import claim_job_for_retry
+from apps.payroll.models import PayrollRun, PayrollJob
+
+
+@override_settings(PAYROLL_JOB_STALE_SECONDS=600)
+class ClaimJobForRetryTest(TestCase):
+    """Which background payroll jobs a retry may take over"""
+
+    def setUp(self):
+        self.payroll_run = PayrollRun.objects.create(
+            period_start_date=date(2025, 1, 1),
+            period_end_date=date(2025, 1, 31),
+            status='processing'
+        )
+
+    def job(self, status, heartbeat_age=None, created_age=0):
+        job = PayrollJob.objects.create(payroll_run=self.payroll_run, status=status)
+        now = timezone.now()
+        PayrollJob.objects.filter(pk=job.pk).update(
+            created_at=now - timedelta(seconds=created_age),
+            heartbeat_at=None if heartbeat_age is None else now - timedelta(seconds=heartbeat_age)
+        )
+        return job
+
+    def assertClaimed(self, job):
+        self.assertTrue(claim_job_for_retry(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'pending')
+
+    def assertNotClaimed(self, job, status):
+        self.assertFalse(claim_job_for_retry(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, status)
+
+    def test_failed_job_is_claimed_once(self):
+        job = self.job('failed', heartbeat_age=0)
+        self.assertClaimed(job)
+        # The claim renews the heartbeat, so a second retry finds nothing to take
+        self.assertNotClaimed(job, 'pending')
+
+    def test_running_job_with_recent_heartbeat_is_not_claimed(self):
+        self.assertNotClaimed(self.job('running', heartbeat_age=60), 'running')
+
+    def test_running_job_with_stale_heartbeat_is_claimed(self):
+        self.assertClaimed(self.job('running', heartbeat_age=3600))
+
+    def test_pending_job_never_picked_up_is_claimed(self):
+        self.assertClaimed(self.job('pending', heartbeat_age=3600))
+
+    def test_running_job_without_heartbeat_falls_back_to_creation_time(self):
+        self.assertNotClaimed(self.job('running', created_age=60), 'running')
+        self.assertClaimed(self.job('running', created_age=3600))
+
+    def test_completed_job_is_not_claimed(self):
+        self.assertNotClaimed(self.job('completed', heartbeat_age=3600), 'completed')
@@ -2,7 +2,7 @@
 
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
-from .views import PayrollRunViewSet, PayslipViewSet
+from .views import PayrollRunViewSet, PayslipViewSet, PayrollJobViewSet, PayrollInputViewSet
 
 # Create a router instance
 router = DefaultRouter()
@@ -12,6 +12,8 @@ router = DefaultRouter()
 # The second argument is the ViewSet class itself
 router.register(r'payroll-runs', PayrollRunViewSet, basename='payroll-run')
 router.register(r'payslips', PayslipViewSet, basename='payslip')
+router.register(r'payroll-jobs', PayrollJobViewSet, basename='payroll-job')
+router.register(r'payroll-inputs', PayrollInputViewSet, basename='payroll-input')
 
 urlpatterns = [
     # The router automatically generates a full set of RESTful URLs for each viewset
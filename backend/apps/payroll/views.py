@@ -4,25 +4,44 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
-from decimal import Decimal
+import csv
+import json
+
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
-from apps.employees.models import Employee, VoluntaryDeduction
-from apps.payroll.models import PayrollRun, Payslip, PayslipDeduction
-from apps.payroll.serializers import PayrollRunSerializer, PayslipSerializer, PayslipDetailedSerializer
-
-# Import the calculation functions
-from apps.compliance.calc_paye import calculate_paye
-from apps.compliance.calc_nssf import calculate_nssf
-from apps.compliance.calc_shif import calculate_shif
-from apps.compliance.calc_ahl import calculate_ahl
-from apps.compliance.calc_overtime import calculate_overtime_pay
-from apps.compliance.calc_reliefs import (
-    calculate_insurance_relief,
-    calculate_post_retirement_medical_deduction,
-    calculate_mortgage_interest_relief
-)
+from apps.payroll.models import PayrollRun, Payslip, PayrollJob, PayrollInput
+from apps.payroll.serializers import PayrollRunSerializer, PayslipSerializer, PayslipDetailedSerializer, PayrollJobSerializer, PayrollInputSerializer
+
+from apps.payroll.engine import PayrollEngine, payroll_employees, overtime_from_request, staged_overtime
+from apps.payroll.inputs import PayrollInputLoader, iter_csv_rows, iter_json_rows
+from apps.payroll.sharding import ShardedPayrollEngine, max_payroll_workers
+from apps.payroll.jobs import create_payroll_job, enqueue_payroll_job, claim_job_for_retry, MAX_CHUNK_SIZE
+from apps.compliance.rate_registry import rate_registry
+
+
+def positive_int_param(data, name):
+    """
+    An optional positive integer request parameter.
+
+    Returns:
+        int: The value, or None when it was not given
+
+    Raises:
+        ValueError: The value is not a positive integer
+    """
+    value = data.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = 0
+    if number < 1:
+        raise ValueError(f"{name} must be a positive integer.")
+    return number
+
 
 class PayrollRunViewSet(viewsets.ModelViewSet):
     serializer_class = PayrollRunSerializer
@@ -44,7 +63,21 @@ class PayrollRunViewSet(viewsets.ModelViewSet):
     @transaction.atomic
     def create(self, request, *args, **kwargs):
         """
-        Only superusers can create payroll runs
+        Only superusers can create payroll runs.
+        
+        Overtime hours are read from the payroll inputs staged for the period
+        (see /api/v1/payroll/payroll-inputs/upload/); the legacy
+        `overtime_weekday_<id>` / `overtime_weekend_<id>` keys override them.
+        
+        Pass `"async": true` to process the run in the background: the response
+        is returned immediately with a job whose progress can be polled at
+        /api/v1/payroll/payroll-jobs/<id>/. Synchronous runs may pass `"workers"`
+        to compute payslips in that many processes (default PAYROLL_WORKERS, at
+        most the CPU count or PAYROLL_WORKERS, whichever is higher).
+        
+        Pass `"dry_run": true` to preview the run without writing anything: the
+        payslips are streamed as NDJSON, one line per employee, followed by a
+        line with the run totals.
         """
         if not request.user.is_superuser:
             return Response({"error": "Only administrators can create payroll runs."}, status=status.HTTP_403_FORBIDDEN)
@@ -55,154 +88,188 @@ class PayrollRunViewSet(viewsets.ModelViewSet):
         if not all([period_start, period_end]):
             return Response({"error": "period_start_date and period_end_date are required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        payroll_run = PayrollRun.objects.create(
-            run_by=request.user,
-            run_date=timezone.now().date(),
-            period_start_date=period_start,
-            period_end_date=period_end
-        )
-
-        employees = Employee.objects.filter(is_active=True)
+        employees = payroll_employees()
         if not employees.exists():
             return Response({"error": "No active employees found to run payroll."}, status=status.HTTP_404_NOT_FOUND)
 
-        for employee in employees:
-            gross_salary = employee.gross_salary
-            
-            weekday_ot = Decimal(request.data.get(f'overtime_weekday_{employee.id}', '0.00'))
-            weekend_ot = Decimal(request.data.get(f'overtime_weekend_{employee.id}', '0.00'))
-            
-            overtime_pay = calculate_overtime_pay(gross_salary, weekday_ot, weekend_ot)
-            total_gross_income = gross_salary + overtime_pay
-            
-            # --- BEGIN PAYROLL CALCULATION LOGIC ---
-            nssf_deduction = calculate_nssf(total_gross_income)
-            shif_deduction = calculate_shif(total_gross_income)
-            ahl_employee_deduction, ahl_employer_contribution = calculate_ahl(total_gross_income)
-            helb_deduction = employee.helb_monthly_deduction if employee.helb_monthly_deduction else Decimal('0.00')
-
-            # Assuming 'VoluntaryDeduction' for pension has a deduction_type of 'Pension'
-            # and only one such deduction exists per employee.
-            pension_contributions = VoluntaryDeduction.objects.filter(
-                employee=employee,
-                deduction_type__icontains='pension',
-                is_active=True
-            ).first()
-
-            pension_deduction = Decimal('0.00')
-            if pension_contributions:
-                # Apply the tax-deductible cap of KES 30,000 per month
-                PENSION_MAX_RELIEF = Decimal('30000.00')
-                pension_deduction = min(pension_contributions.amount, PENSION_MAX_RELIEF)
-
-            # Calculate additional reliefs as per KRA PAYE document
-            medical_fund_deduction = calculate_post_retirement_medical_deduction(
-                employee.monthly_medical_fund_contribution
-            )
-            mortgage_interest_relief = calculate_mortgage_interest_relief(
-                employee.monthly_mortgage_interest
-            )
+        # Start every run from the latest statutory rates saved by any worker
+        rate_registry.refresh(force=True)
 
-            # CORRECTED: Subtract all mandatory and allowable voluntary deductions from gross income
-            taxable_income = total_gross_income - (
-                nssf_deduction + 
-                shif_deduction + 
-                ahl_employee_deduction + 
-                pension_deduction +
-                medical_fund_deduction +
-                mortgage_interest_relief
+        if str(request.data.get('dry_run', '')).lower() in ('true', '1', 'yes'):
+            engine = PayrollEngine(as_of=period_end)
+            overtime = staged_overtime(period_start, period_end, overrides=overtime_from_request(request.data))
+            lines = engine.preview(employees, overtime=overtime)
+            return StreamingHttpResponse(
+                (json.dumps(line) + '\n' for line in lines),
+                content_type='application/x-ndjson'
             )
 
-            # Ensure taxable income is not negative
-            taxable_income = max(taxable_income, Decimal('0.00'))
+        run_async = str(request.data.get('async', '')).lower() in ('true', '1', 'yes')
 
-            paye_tax = calculate_paye(taxable_income)
-            
-            # Calculate insurance relief (reduces PAYE tax)
-            insurance_relief = calculate_insurance_relief(employee.monthly_insurance_premiums)
-            paye_tax_after_relief = max(paye_tax - insurance_relief, Decimal('0.00'))
-            
-            # Calculate voluntary deductions (excluding pension as it's already accounted for in taxable income)
-            voluntary_deductions_total = Decimal('0.00')
-            voluntary_deductions = employee.voluntary_deductions.filter(is_active=True).exclude(deduction_type__icontains='pension')
-            for deduction in voluntary_deductions:
-                voluntary_deductions_total += deduction.amount
-
-            # Total statutory deductions (using PAYE after insurance relief)
-            total_statutory_deductions = paye_tax_after_relief + nssf_deduction + shif_deduction + ahl_employee_deduction + helb_deduction
-            
-            # Total deductions = statutory + voluntary (pension is already reflected in lower PAYE due to reduced taxable income)
-            total_deductions = total_statutory_deductions + voluntary_deductions_total
-            
-            # Add pension deduction amount to total deductions for display purposes
-            if pension_contributions and pension_contributions.amount > 0:
-                total_deductions += pension_contributions.amount
-            
-            # Calculate net pay
-            net_pay = total_gross_income - total_deductions
-            
-            # Ensure net pay is not negative
-            net_pay = max(net_pay, Decimal('0.00'))
-            # --- END PAYROLL CALCULATION LOGIC ---
-
-            # --- Create Payslip Record ---
-            payslip = Payslip.objects.create(
-                payroll_run=payroll_run,
-                employee=employee,
-                gross_salary=gross_salary,
-                overtime_pay=overtime_pay,
-                total_gross_income=total_gross_income,
-                paye_tax=paye_tax,
-                nssf_deduction=nssf_deduction,
-                shif_deduction=shif_deduction,
-                ahl_deduction=ahl_employee_deduction,
-                helb_deduction=helb_deduction,
-                total_deductions=total_deductions,
-                net_pay=net_pay
+        try:
+            chunk_size = positive_int_param(request.data, 'chunk_size')
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if chunk_size and chunk_size > MAX_CHUNK_SIZE:
+            return Response({"error": f"chunk_size must be at most {MAX_CHUNK_SIZE}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            workers = positive_int_param(request.data, 'workers')
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if workers:
+            # Each worker is a freshly spawned process with its own connection
+            workers = min(workers, max_payroll_workers())
+
+        payroll_run = PayrollRun.objects.create(
+            run_by=request.user,
+            run_date=timezone.now().date(),
+            period_start_date=period_start,
+            period_end_date=period_end,
+            status='processing' if run_async else 'final'
+        )
+
+        if run_async:
+            # Chunks are committed separately by the worker; the run becomes
+            # final only once every chunk has succeeded.
+            job = create_payroll_job(
+                payroll_run,
+                created_by=request.user,
+                overtime=overtime_from_request(request.data),
+                chunk_size=chunk_size
             )
+            return Response({
+                'job_id': job.id,
+                'status_url': f'/api/v1/payroll/payroll-jobs/{job.id}/',
+                'payroll_run': PayrollRunSerializer(payroll_run).data,
+            }, status=status.HTTP_202_ACCEPTED)
 
-            # Create individual deduction records for the payslip
-            if paye_tax > 0:
-                PayslipDeduction.objects.create(payslip=payslip, deduction_type='PAYE Tax', amount=paye_tax, is_statutory=True)
-            if nssf_deduction > 0:
-                PayslipDeduction.objects.create(payslip=payslip, deduction_type='NSSF', amount=nssf_deduction, is_statutory=True)
-            if shif_deduction > 0:
-                PayslipDeduction.objects.create(payslip=payslip, deduction_type='SHIF', amount=shif_deduction, is_statutory=True)
-            if ahl_employee_deduction > 0:
-                PayslipDeduction.objects.create(payslip=payslip, deduction_type='Affordable Housing Levy (AHL)', amount=ahl_employee_deduction, is_statutory=True)
-            if helb_deduction > 0:
-                PayslipDeduction.objects.create(payslip=payslip, deduction_type='HELB', amount=helb_deduction, is_statutory=True)
-
-            # Create deduction record for pension contributions
-            if pension_contributions and pension_contributions.amount > 0:
-                PayslipDeduction.objects.create(
-                    payslip=payslip,
-                    deduction_type=pension_contributions.deduction_type,
-                    amount=pension_contributions.amount,
-                    is_statutory=False
-                )
-            
-            # Create records for all other voluntary deductions (excluding pension)
-            other_voluntary_deductions = employee.voluntary_deductions.filter(is_active=True).exclude(deduction_type__icontains='pension')
-            for deduction in other_voluntary_deductions:
-                PayslipDeduction.objects.create(
-                    payslip=payslip,
-                    deduction_type=deduction.deduction_type,
-                    amount=deduction.amount,
-                    is_statutory=False
-                )
-
-        # Update PayrollRun totals
-        payroll_run.total_net_pay = sum(payslip.net_pay for payslip in payroll_run.payslips.all())
-        payroll_run.total_deductions = sum(payslip.total_deductions for payslip in payroll_run.payslips.all())
-        payroll_run.save()
+        # Inputs are prefetched, payslips computed in memory (integer cents) and
+        # written with bulk inserts; run totals come from the in-memory results.
+        engine = ShardedPayrollEngine(as_of=period_end, workers=workers)
+        overtime = staged_overtime(period_start, period_end, overrides=overtime_from_request(request.data))
+        engine.process_run(payroll_run, employees, overtime=overtime)
 
         serializer = PayrollRunSerializer(payroll_run)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-# apps/payroll/views.py
+    @action(detail=True, methods=['post'])
+    @transaction.atomic
+    def rerun(self, request, pk=None):
+        """
+        Correct a payroll run after employee or deduction changes.
+
+        Only payslips whose inputs (salary, overtime, active voluntary deductions,
+        reliefs, statutory rate version) changed are recomputed; overtime comes
+        from the staged payroll inputs for the run's period, as for a new run.
+        """
+        if not request.user.is_superuser:
+            return Response({"error": "Only administrators can re-run payroll."}, status=status.HTTP_403_FORBIDDEN)
+
+        payroll_run = self.get_object()
+        if payroll_run.status != 'final':
+            return Response({"error": "This payroll run is still being processed."}, status=status.HTTP_409_CONFLICT)
 
-... # (All other code remains the same) ...
+        rate_registry.refresh(force=True)
+        engine = PayrollEngine(as_of=payroll_run.period_end_date)
+        overtime = staged_overtime(
+            payroll_run.period_start_date, payroll_run.period_end_date,
+            overrides=overtime_from_request(request.data)
+        )
+        summary = engine.rerun(payroll_run, payroll_employees(), overtime=overtime)
+
+        return Response({
+            'payroll_run': PayrollRunSerializer(payroll_run).data,
+            'unchanged': summary['unchanged'],
+            'updated': summary['updated'],
+            'created': summary['created'],
+        })
+
+class PayrollJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Progress of background payroll runs (processed/total, throughput, errors)
+    """
+    serializer_class = PayrollJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # Only superusers can see payroll jobs, as with payroll runs
+        if self.request.user.is_superuser:
+            return PayrollJob.objects.select_related('payroll_run')
+        return PayrollJob.objects.none()
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        """
+        Re-run a failed job, or one whose worker stopped reporting progress;
+        employees already paid in this run are skipped
+        """
+        job = self.get_object()
+        if not claim_job_for_retry(job.pk):
+            return Response({"error": "Only failed or stalled jobs can be retried."}, status=status.HTTP_400_BAD_REQUEST)
+        enqueue_payroll_job(job.id)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class PayrollInputViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Overtime hours staged per employee and pay period ahead of a payroll run
+    """
+    serializer_class = PayrollInputSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if not self.request.user.is_superuser:
+            return PayrollInput.objects.none()
+        queryset = PayrollInput.objects.all()
+        period_start = self.request.query_params.get('period_start_date')
+        period_end = self.request.query_params.get('period_end_date')
+        if period_start:
+            queryset = queryset.filter(period_start_date=period_start)
+        if period_end:
+            queryset = queryset.filter(period_end_date=period_end)
+        return queryset
+
+    @action(detail=False, methods=['post'])
+    @transaction.atomic
+    def upload(self, request):
+        """
+        Stage timesheet rows from a CSV or JSON file (multipart field `file`) or
+        a JSON array body.
+        
+        Columns: employee_id or company_employee_id, period_start_date,
+        period_end_date, overtime_weekday_hours, overtime_weekend_hours.
+        Rows are validated and inserted in batches as they are read; if any row
+        is invalid nothing is staged and the errors are returned.
+        """
+        if not request.user.is_superuser:
+            return Response({"error": "Only administrators can upload payroll inputs."}, status=status.HTTP_403_FORBIDDEN)
+
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is not None:
+            is_csv = uploaded_file.name.lower().endswith('.csv') or uploaded_file.content_type == 'text/csv'
+            rows = iter_csv_rows(uploaded_file.file) if is_csv else iter_json_rows(uploaded_file.file)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response(
+                {"error": "Upload a CSV or JSON file as 'file' or send a JSON array of rows."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        loader = PayrollInputLoader(uploaded_by=request.user)
+        try:
+            summary = loader.load(rows)
+        except (ValueError, csv.Error) as e:
+            # Unreadable file (bad encoding, malformed JSON or CSV)
+            transaction.set_rollback(True)
+            return Response({"error": f"Could not read upload: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if summary['invalid']:
+            transaction.set_rollback(True)
+            summary['staged'] = 0
+            return Response(summary, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_201_CREATED)
 
 class PayslipViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = PayslipSerializer
@@ -221,7 +288,8 @@ class PayslipViewSet(viewsets.ReadOnlyModelViewSet):
         
         try:
             employee = user.employee_profile
-            return Payslip.objects.filter(employee=employee).order_by('-payroll_run__run_date')
+            # Payslips of background runs appear once the whole run is final
+            return Payslip.objects.filter(employee=employee, payroll_run__status='final').order_by('-payroll_run__run_date')
         except Exception:
             # If user has no employee profile, return empty queryset
             return Payslip.objects.none()
@@ -244,10 +312,27 @@ class PayslipViewSet(viewsets.ReadOnlyModelViewSet):
             
             # Import here to avoid circular imports
             from .pdf_generator import PayslipPDFGenerator
+            from apps.reports.pdf_cache import cached_pdf_response, pdf_cache_key, record_fields
             
-            # Generate and return PDF
+            # Serve from the PDF cache; a payslip is only re-rendered when it,
+            # its deduction lines, the employee, the company settings or the
+            # template change. Of the run only what the payslip shows is keyed,
+            # so a rerun's new totals keep unchanged payslips cached.
             pdf_generator = PayslipPDFGenerator(payslip)
-            return pdf_generator.generate_pdf()
+            employee = payslip.employee
+            payroll_run = payslip.payroll_run
+            key = pdf_cache_key(
+                'payslip',
+                PayslipPDFGenerator.TEMPLATE_VERSION,
+                record_fields(payslip, exclude=['input_fingerprint']),
+                [payroll_run.pk, payroll_run.run_date, payroll_run.period_start_date, payroll_run.period_end_date],
+                list(payslip.deduction_items.order_by('pk').values('deduction_type', 'amount', 'is_statutory')),
+                employee.user.get_full_name(),
+                employee.user.email,
+                getattr(getattr(employee, 'job_info', None), 'company_employee_id', None),
+                record_fields(pdf_generator.company_settings)
+            )
+            return cached_pdf_response(request, 'payslip', key, pdf_generator.filename, pdf_generator.render)
             
         except Exception as e:
             return Response(
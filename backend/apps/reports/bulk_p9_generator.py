@@ -8,13 +8,112 @@ from django.utils import timezone
 from decimal import Decimal
 from apps.reports.models import P9Report, P9MonthlyBreakdown
 from apps.employees.models import Employee
-from apps.payroll.models import Payslip, PayrollRun, PayslipDeduction
+from apps.core.company_models import CompanySettings
+from apps.payroll.models import PayrollRun, TaxLedgerEntry
+from apps.payroll.ledger import LEDGER_FIELDS
 from apps.reports.p9_pdf_generator import P9PDFGenerator
+from apps.reports.zip_stream import stream_zip
+from apps.core.processes import django_process_pool
 import os
+from collections import deque
 from django.conf import settings
 import zipfile
 from io import BytesIO
 
+P9_BATCH_SIZE = 1000
+
+RETIREMENT_MONTHLY_CAP = Decimal('30000.00')
+
+# Filled in by P9Report.save() from the employee and company settings
+P9_IDENTITY_FIELDS = [
+    'employee_name', 'employee_main_name', 'employee_other_names', 'employee_pin',
+    'employer_name', 'employer_pin',
+]
+# Computed from the year's payslips
+P9_PAYSLIP_FIELDS = [
+    'total_basic_salary', 'total_benefits_non_cash', 'total_gross_pay', 'total_paye_tax',
+    'total_shif', 'retirement_30_percent', 'retirement_actual', 'retirement_fixed_cap',
+    'total_ahl', 'total_deductions', 'chargeable_pay', 'tax_charged',
+]
+# Entered by hand on a report and kept when it is regenerated
+P9_MANUAL_FIELDS = [
+    'total_value_of_quarters', 'total_prmf', 'total_owner_occupied_interest',
+    'total_personal_relief', 'total_insurance_relief',
+]
+
+# P9 PDFs rendered per worker task
+P9_PDF_CHUNK_SIZE = 10
+
+DEFAULT_PDF_WORKERS = os.cpu_count() or 1
+
+
+def max_pdf_workers():
+    """Most rendering processes a request may ask for: the CPU count, or P9_PDF_WORKERS if higher"""
+    return max(getattr(settings, 'P9_PDF_WORKERS', DEFAULT_PDF_WORKERS), DEFAULT_PDF_WORKERS)
+
+
+def render_p9_pdfs(p9_ids):
+    """
+    Render a chunk of P9 reports, in a worker process or in-process.
+    
+    Returns:
+        list: (p9_id, filename, pdf bytes, error) for each report in `p9_ids`
+        order; bytes are None and error is set when a report fails to render
+    """
+    pdf_generator = P9PDFGenerator()
+    p9_reports = P9Report.objects.in_bulk(p9_ids)
+    rendered = []
+    for p9_id in p9_ids:
+        p9_report = p9_reports.get(p9_id)
+        if p9_report is None:
+            continue
+        try:
+            buffer = pdf_generator.generate_p9_pdf(p9_report)
+            rendered.append((p9_id, P9PDFGenerator.filename(p9_report), buffer.getvalue(), None))
+        except Exception as e:
+            rendered.append((p9_id, P9PDFGenerator.filename(p9_report), None, f"PDF for {p9_report.employee_name}: {str(e)}"))
+    return rendered
+
+
+def iter_p9_pdfs(p9_ids, workers=None, chunk_size=P9_PDF_CHUNK_SIZE):
+    """
+    Yield `render_p9_pdfs` results for `p9_ids`, in order, rendering chunks in a process pool.
+    
+    At most two chunks per worker are in flight, so memory stays flat however
+    many reports there are, and the first PDFs are available as soon as the
+    first chunk is rendered.
+    
+    Args:
+        p9_ids: P9Report primary keys
+        workers: Rendering processes (default P9_PDF_WORKERS setting, or the CPU count)
+        chunk_size: Reports rendered per worker task
+    """
+    if workers is None:
+        workers = getattr(settings, 'P9_PDF_WORKERS', DEFAULT_PDF_WORKERS)
+    workers = max(1, int(workers))
+    p9_ids = list(p9_ids)
+    chunks = [p9_ids[start:start + chunk_size] for start in range(0, len(p9_ids), chunk_size)]
+    
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from render_p9_pdfs(chunk)
+        return
+    
+    with django_process_pool(min(workers, len(chunks))) as executor:
+        remaining = iter(chunks)
+        pending = deque(executor.submit(render_p9_pdfs, chunk) for _, chunk in zip(range(workers * 2), remaining))
+        try:
+            while pending:
+                rendered = pending.popleft().result()
+                chunk = next(remaining, None)
+                if chunk is not None:
+                    pending.append(executor.submit(render_p9_pdfs, chunk))
+                yield from rendered
+        finally:
+            # The consumer stopped early (e.g. the client disconnected)
+            for future in pending:
+                future.cancel()
+
 
 class BulkP9Generator:
     """Generate P9 reports for multiple employees from payslip data"""
@@ -29,6 +128,11 @@ class BulkP9Generator:
         """
         Generate P9 reports for multiple employees
         
+        Monthly figures come from the tax ledger the payroll engine keeps up
+        to date, so the number of queries does not grow with the number of
+        employees or payslips; reports and monthly breakdowns are then written
+        with bulk upserts.
+        
         Args:
             employee_ids: List of employee IDs to process (None = all employees)
             from_payslips: Whether to generate from existing payslip data
@@ -40,248 +144,216 @@ class BulkP9Generator:
         employees = Employee.objects.all()
         if employee_ids:
             employees = employees.filter(id__in=employee_ids)
+        employees = list(
+            employees.order_by('pk').values_list('id', 'user__first_name', 'user__last_name', 'job_info__kra_pin')
+        )
         
         results = {
-            'total_employees': employees.count(),
+            'total_employees': len(employees),
             'successful_p9s': 0,
             'failed_p9s': 0,
             'errors': [],
             'created_p9s': []
         }
         
-        for employee in employees:
-            try:
+        try:
+            with transaction.atomic():
                 if from_payslips:
-                    p9_report = self._generate_p9_from_payslips(employee)
+                    self._generate_p9s_from_payslips(employees, employee_ids)
                 else:
-                    p9_report = self._generate_empty_p9(employee)
-                
-                if p9_report:
-                    results['successful_p9s'] += 1
-                    results['created_p9s'].append({
-                        'employee_id': employee.id,
-                        'employee_name': f"{employee.user.first_name} {employee.user.last_name}",
-                        'p9_id': p9_report.id,
-                        'gross_pay': float(p9_report.total_gross_pay),
-                        'paye_tax': float(p9_report.total_paye_tax)
-                    })
-                
-            except Exception as e:
-                results['failed_p9s'] += 1
-                error_msg = f"Employee {employee.user.first_name} {employee.user.last_name}: {str(e)}"
-                results['errors'].append(error_msg)
-                self.errors.append(error_msg)
+                    self._generate_empty_p9s(employees, status='draft')
+        except Exception as e:
+            results['failed_p9s'] = len(employees)
+            error_msg = f"P9 generation for {self.tax_year}: {str(e)}"
+            results['errors'].append(error_msg)
+            self.errors.append(error_msg)
+            return results
+        
+        reports = P9Report.objects.filter(tax_year=self.tax_year)
+        if employee_ids:
+            reports = reports.filter(employee_id__in=employee_ids)
+        reports = {
+            row['employee_id']: row
+            for row in reports.values('id', 'employee_id', 'total_gross_pay', 'total_paye_tax')
+        }
         
+        for employee_id, first_name, last_name, _ in employees:
+            p9_report = reports[employee_id]
+            results['successful_p9s'] += 1
+            results['created_p9s'].append({
+                'employee_id': employee_id,
+                'employee_name': f"{first_name} {last_name}",
+                'p9_id': p9_report['id'],
+                'gross_pay': float(p9_report['total_gross_pay']),
+                'paye_tax': float(p9_report['total_paye_tax'])
+            })
+        
+        self.success_count += results['successful_p9s']
         return results
 
-    def _generate_p9_from_payslips(self, employee):
-        """Generate P9 report from existing payslip data"""
-        
-        # Get or create P9 report
-        p9_report, created = P9Report.objects.get_or_create(
-            employee=employee,
-            tax_year=self.tax_year,
-            defaults={
-                'generated_by': None,  # System generated
-                'status': 'generated'
-            }
+    def _identity(self, employee, company_settings):
+        """The employee and employer fields P9Report.save() would fill in"""
+        _, first_name, last_name, kra_pin = employee
+        return {
+            'employee_name': f"{first_name} {last_name}",
+            'employee_main_name': last_name,
+            'employee_other_names': first_name,
+            'employee_pin': kra_pin or '',
+            'employer_name': company_settings.company_name,
+            'employer_pin': company_settings.kra_pin or '',
+        }
+
+    def _upsert(self, p9_reports, update_fields):
+        """Insert new P9 reports and update existing ones (by employee and tax year)"""
+        P9Report.objects.bulk_create(
+            p9_reports,
+            batch_size=P9_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['employee', 'tax_year'],
+            update_fields=update_fields + ['updated_date']
         )
+
+    def _monthly_totals(self, employee_ids=None):
+        """
+        The year's tax ledger entries by employee and month, in one query.
         
-        # Get payslips for the tax year
-        payslips = Payslip.objects.filter(
-            employee=employee,
-            payroll_run__period_start_date__year=self.tax_year
-        ).select_related('payroll_run').order_by('payroll_run__run_date')
-        
-        if not payslips.exists():
-            # Create empty P9 if no payslips
-            return self._generate_empty_p9(employee, p9_report)
+        Returns:
+            dict: {employee_id: {month: ledger values}}
+        """
+        entries = TaxLedgerEntry.objects.filter(tax_year=self.tax_year, payslip_count__gt=0)
+        if employee_ids:
+            entries = entries.filter(employee_id__in=employee_ids)
         
-        # Aggregate data from payslips
-        total_basic_salary = Decimal('0.00')
-        total_gross_pay = Decimal('0.00')
-        total_paye_tax = Decimal('0.00')
-        total_benefits = Decimal('0.00')
+        monthly = {}
+        for row in entries.values('employee_id', 'month', *LEDGER_FIELDS).order_by():
+            monthly.setdefault(row['employee_id'], {})[row['month']] = row
+        return monthly
+
+    def _generate_p9s_from_payslips(self, employees, employee_ids=None):
+        """Generate P9 reports and monthly breakdowns from the year's tax ledger"""
         
-        monthly_data = {}
+        monthly = self._monthly_totals(employee_ids)
+        company_settings = CompanySettings.get_settings()
         
-        for payslip in payslips:
-            month = payslip.payroll_run.period_start_date.month
-            
-            # Aggregate totals
-            basic_salary = payslip.gross_salary or Decimal('0.00')  # Using gross_salary as basic
-            gross_pay = payslip.total_gross_income or Decimal('0.00')
-            paye_tax = payslip.paye_tax or Decimal('0.00')
-            
-            total_basic_salary += basic_salary
-            total_gross_pay += gross_pay
-            total_paye_tax += paye_tax
-            
-            # Store monthly data
-            if month not in monthly_data:
-                monthly_data[month] = {
-                    'basic_salary': Decimal('0.00'),
-                    'gross_pay': Decimal('0.00'),
-                    'paye_tax': Decimal('0.00'),
-                    'benefits': Decimal('0.00'),
-                    'ahl': Decimal('0.00'),
-                    'shif': Decimal('0.00'),
-                }
-            
-            monthly_data[month]['basic_salary'] += basic_salary
-            monthly_data[month]['gross_pay'] += gross_pay  
-            monthly_data[month]['paye_tax'] += paye_tax
-            
-            # Calculate AHL (1.5% of gross)
-            monthly_data[month]['ahl'] += gross_pay * Decimal('0.015')
-            
-            # Add SHIF if available
-            monthly_data[month]['shif'] += payslip.shif_deduction or Decimal('0.00')
-            
-            # Calculate benefits as difference between total gross and basic
-            benefits = (gross_pay - basic_salary) if gross_pay > basic_salary else Decimal('0.00')
-            total_benefits += benefits
-            monthly_data[month]['benefits'] += benefits
+        # Reliefs and other amounts entered by hand on existing reports are kept
+        existing_reports = P9Report.objects.filter(tax_year=self.tax_year)
+        if employee_ids:
+            existing_reports = existing_reports.filter(employee_id__in=employee_ids)
+        existing = {
+            row.pop('employee_id'): row
+            for row in existing_reports.values('employee_id', *P9_MANUAL_FIELDS)
+        }
         
-        # Update P9 report with calculated values
-        p9_report.total_basic_salary = total_basic_salary
-        p9_report.total_benefits_non_cash = total_benefits
-        p9_report.total_gross_pay = total_gross_pay
-        p9_report.total_paye_tax = total_paye_tax
+        p9_reports = []
+        without_payslips = []
+        for employee in employees:
+            months = monthly.get(employee[0])
+            if not months:
+                without_payslips.append(employee)
+                continue
+            p9_reports.append(self._p9_from_monthly_totals(
+                employee, months, existing.get(employee[0], {}), company_settings
+            ))
+        
+        self._upsert(p9_reports, P9_IDENTITY_FIELDS + P9_PAYSLIP_FIELDS)
+        # Employees without payslips keep (or get) an empty P9
+        self._generate_empty_p9s(without_payslips, status='generated', company_settings=company_settings)
+        
+        if monthly:
+            self._replace_monthly_breakdowns(monthly, employee_ids)
+
+    def _p9_from_monthly_totals(self, employee, months, manual_fields, company_settings):
+        """Unsaved P9Report for one employee from their monthly ledger entries"""
+        p9_report = P9Report(
+            employee_id=employee[0],
+            tax_year=self.tax_year,
+            generated_by=None,  # System generated
+            status='generated',
+            **manual_fields,
+            **self._identity(employee, company_settings)
+        )
         
-        # Set SHIF total
-        p9_report.total_shif = sum(payslip.shif_deduction or Decimal('0.00') for payslip in payslips)
+        # The last month's year-to-date totals cover the whole year
+        year_to_date = months[max(months)]
+        p9_report.total_basic_salary = year_to_date['ytd_basic_salary']
+        p9_report.total_benefits_non_cash = year_to_date['ytd_benefits']
+        p9_report.total_gross_pay = year_to_date['ytd_gross_pay']
+        p9_report.total_paye_tax = year_to_date['ytd_paye']
+        p9_report.total_shif = year_to_date['ytd_shif']
         
-        # Calculate retirement contributions (E1, E2, E3)
         # E1: 30% of Basic Salary
-        p9_report.retirement_30_percent = total_basic_salary * Decimal('0.30')
-        
+        p9_report.retirement_30_percent = p9_report.total_basic_salary * Decimal('0.30')
         # E2: Actual contributions (NSSF + Pension from voluntary deductions)
-        total_nssf = Decimal('0.00')
-        total_pension = Decimal('0.00')
-        
-        for payslip in payslips:
-            # Get actual NSSF deduction from payslip
-            total_nssf += payslip.nssf_deduction or Decimal('0.00')
-            
-            # Get pension contributions from voluntary deductions
-            pension_deductions = PayslipDeduction.objects.filter(
-                payslip=payslip,
-                deduction_type__icontains='pension',
-                is_statutory=False
-            )
-            
-            for pension_deduction in pension_deductions:
-                total_pension += pension_deduction.amount or Decimal('0.00')
-        
-        p9_report.retirement_actual = total_nssf + total_pension
-        
-        # E3: Fixed amount (30,000 per month = 360,000 per year)
-        months_worked = len([m for m in monthly_data.keys() if monthly_data[m]['basic_salary'] > 0])
-        p9_report.retirement_fixed_cap = Decimal('30000.00') * months_worked
-        
-        # Calculate other required fields
-        p9_report.calculate_totals()
-        p9_report.save()
+        p9_report.retirement_actual = year_to_date['ytd_nssf'] + year_to_date['ytd_pension']
+        # E3: Fixed amount (30,000 per month worked)
+        months_worked = len([month for month, data in months.items() if data['basic_salary'] > 0])
+        p9_report.retirement_fixed_cap = RETIREMENT_MONTHLY_CAP * months_worked
         
-        # Create/update monthly breakdown
-        self._create_monthly_breakdown(p9_report, monthly_data)
-        
-        return p9_report
+        return p9_report.calculate_totals()
 
-    def _generate_empty_p9(self, employee, p9_report=None):
-        """Generate empty P9 report template"""
-        
-        if p9_report is None:
-            p9_report, created = P9Report.objects.get_or_create(
-                employee=employee,
-                tax_year=self.tax_year,
-                defaults={
-                    'generated_by': None,
-                    'status': 'draft'
-                }
-            )
-        
-        # Set basic information
-        p9_report.employee_name = f"{employee.user.first_name} {employee.user.last_name}"
-        p9_report.save()
-        
-        return p9_report
-
-    def _create_monthly_breakdown(self, p9_report, monthly_data):
-        """Create monthly breakdown records"""
-        
-        # Delete existing monthly data
-        p9_report.monthly_breakdown.all().delete()
-        
-        # Get payslips to calculate actual monthly retirement contributions
-        payslips = Payslip.objects.filter(
-            employee=p9_report.employee,
-            payroll_run__period_start_date__year=p9_report.tax_year
-        ).select_related('payroll_run')
-        
-        # Create payslip lookup by month
-        payslip_by_month = {}
-        for payslip in payslips:
-            month = payslip.payroll_run.period_start_date.month
-            payslip_by_month[month] = payslip
-        
-        # Create new monthly records
-        for month, data in monthly_data.items():
-            # Get actual payslip for this month
-            payslip = payslip_by_month.get(month)
-            
-            # Calculate retirement contributions for this month
-            basic_salary = data['basic_salary']
-            
-            # E1: 30% of Basic Salary
-            e1_monthly = basic_salary * Decimal('0.30')
-            
-            # E2: Actual contributions (NSSF + Pension from payslip)
-            e2_monthly = Decimal('0.00')
-            if payslip:
-                # Get NSSF from payslip
-                e2_monthly += payslip.nssf_deduction or Decimal('0.00')
-                
-                # Get pension contributions from voluntary deductions
-                pension_deductions = PayslipDeduction.objects.filter(
-                    payslip=payslip,
-                    deduction_type__icontains='pension',
-                    is_statutory=False
+    def _generate_empty_p9s(self, employees, status, company_settings=None):
+        """Create P9 reports that do not exist yet and refresh the names on existing ones"""
+        if not employees:
+            return
+        company_settings = company_settings or CompanySettings.get_settings()
+        self._upsert(
+            [
+                P9Report(
+                    employee_id=employee[0],
+                    tax_year=self.tax_year,
+                    generated_by=None,
+                    status=status,
+                    **self._identity(employee, company_settings)
                 )
+                for employee in employees
+            ],
+            P9_IDENTITY_FIELDS
+        )
+
+    def _replace_monthly_breakdowns(self, monthly, employee_ids=None):
+        """Recreate the monthly breakdown rows of every P9 generated from payslips"""
+        
+        reports = P9Report.objects.filter(tax_year=self.tax_year)
+        if employee_ids:
+            reports = reports.filter(employee_id__in=employee_ids)
+        p9_ids = dict(reports.values_list('employee_id', 'id'))
+        report_ids = [p9_ids[employee_id] for employee_id in monthly]
+        for start in range(0, len(report_ids), P9_BATCH_SIZE):
+            P9MonthlyBreakdown.objects.filter(p9_report_id__in=report_ids[start:start + P9_BATCH_SIZE]).delete()
+        
+        breakdowns = []
+        for employee_id, months in monthly.items():
+            for month, data in sorted(months.items()):
+                # E1: 30% of Basic Salary; E2: NSSF + pension; E3: fixed amount
+                e1_monthly = data['basic_salary'] * Decimal('0.30')
+                e2_monthly = data['nssf'] + data['pension']
+                e3_monthly = RETIREMENT_MONTHLY_CAP
                 
-                for pension_deduction in pension_deductions:
-                    e2_monthly += pension_deduction.amount or Decimal('0.00')
-            
-            # E3: Fixed amount
-            e3_monthly = Decimal('30000.00')
-            
-            # Calculate effective retirement (lower of E1, E2, E3) for monthly deductions
-            effective_retirement_monthly = min(e1_monthly, e2_monthly, e3_monthly)
-            
-            P9MonthlyBreakdown.objects.create(
-                p9_report=p9_report,
-                month=month,
-                basic_salary=data['basic_salary'],
-                gross_pay=data['gross_pay'],
-                paye_tax=data['paye_tax'],
-                ahl=data['ahl'],
-                shif=data['shif'],
-                benefits_non_cash=data.get('benefits', Decimal('0.00')),
-                personal_relief=Decimal('2400.00'),  # Standard monthly relief
-                retirement_30_percent_monthly=e1_monthly,
-                retirement_actual_monthly=e2_monthly,
-                retirement_fixed_monthly=e3_monthly,
-                retirement_contribution=effective_retirement_monthly  # Use lower of E1, E2, E3
-            )
+                breakdowns.append(P9MonthlyBreakdown(
+                    p9_report_id=p9_ids[employee_id],
+                    month=month,
+                    basic_salary=data['basic_salary'],
+                    gross_pay=data['gross_pay'],
+                    paye_tax=data['paye'],
+                    ahl=data['ahl'],
+                    shif=data['shif'],
+                    benefits_non_cash=data['benefits'],
+                    personal_relief=data['personal_relief'],
+                    retirement_30_percent_monthly=e1_monthly,
+                    retirement_actual_monthly=e2_monthly,
+                    retirement_fixed_monthly=e3_monthly,
+                    retirement_contribution=min(e1_monthly, e2_monthly, e3_monthly)  # Use lower of E1, E2, E3
+                ))
+        P9MonthlyBreakdown.objects.bulk_create(breakdowns, batch_size=P9_BATCH_SIZE)
 
-    def generate_bulk_pdfs(self, p9_reports=None, create_zip=True):
+    def generate_bulk_pdfs(self, p9_reports=None, create_zip=True, workers=None):
         """
         Generate PDF files for multiple P9 reports
         
         Args:
             p9_reports: QuerySet of P9Report objects (None = all for current year)
             create_zip: Whether to create a zip file of all PDFs
+            workers: Rendering processes (default P9_PDF_WORKERS setting)
             
         Returns:
             dict: Results with file paths and download info
@@ -289,9 +361,10 @@ class BulkP9Generator:
         
         if p9_reports is None:
             p9_reports = P9Report.objects.filter(tax_year=self.tax_year)
+        employee_names = dict(p9_reports.values_list('id', 'employee_name'))
         
         results = {
-            'total_reports': p9_reports.count(),
+            'total_reports': len(employee_names),
             'generated_pdfs': 0,
             'failed_pdfs': 0,
             'pdf_files': [],
@@ -305,22 +378,22 @@ class BulkP9Generator:
         
         pdf_files = []
         
-        for p9_report in p9_reports:
-            try:
-                # Generate PDF
-                pdf_path = self.pdf_generator.save_pdf_file(p9_report, pdf_dir)
-                pdf_files.append(pdf_path)
-                results['generated_pdfs'] += 1
-                results['pdf_files'].append({
-                    'employee_name': p9_report.employee_name,
-                    'file_path': pdf_path,
-                    'file_size': os.path.getsize(pdf_path)
-                })
-                
-            except Exception as e:
+        for p9_id, filename, pdf, error in iter_p9_pdfs(employee_names, workers=workers):
+            if error:
                 results['failed_pdfs'] += 1
-                error_msg = f"PDF for {p9_report.employee_name}: {str(e)}"
-                results['errors'].append(error_msg)
+                results['errors'].append(error)
+                continue
+            
+            pdf_path = os.path.join(pdf_dir, filename)
+            with open(pdf_path, 'wb') as pdf_file:
+                pdf_file.write(pdf)
+            pdf_files.append(pdf_path)
+            results['generated_pdfs'] += 1
+            results['pdf_files'].append({
+                'employee_name': employee_names[p9_id],
+                'file_path': pdf_path,
+                'file_size': len(pdf)
+            })
         
         # Create ZIP file if requested
         if create_zip and pdf_files:
@@ -338,41 +411,67 @@ class BulkP9Generator:
         
         return results
 
+    def stream_bulk_pdfs(self, p9_ids, workers=None):
+        """
+        Yield a ZIP archive of P9 PDFs chunk by chunk while they are rendered.
+        
+        Nothing is written to disk and only the PDFs in flight are held in
+        memory. Reports that fail to render are listed in an errors.txt entry
+        at the end of the archive.
+        
+        Args:
+            p9_ids: P9Report primary keys
+            workers: Rendering processes (default P9_PDF_WORKERS setting)
+        """
+        errors = []
+        
+        def files():
+            names = set()
+            for p9_id, filename, pdf, error in iter_p9_pdfs(p9_ids, workers=workers):
+                if error:
+                    errors.append(error)
+                    continue
+                # Employees can share a name
+                if filename in names:
+                    filename = f"{filename[:-len('.pdf')]}_{p9_id}.pdf"
+                names.add(filename)
+                yield filename, pdf
+            if errors:
+                yield 'errors.txt', '\n'.join(errors) + '\n'
+        
+        return stream_zip(files())
+
     def get_payslip_summary(self, employee_id=None, tax_year=None):
-        """Get summary of available payslip data for P9 generation"""
+        """Get summary of available payslip data for P9 generation, from the tax ledger"""
         
         year = tax_year or self.tax_year
         
-        # Use payroll_run date fields since Payslip doesn't have direct date fields
-        payslips_query = Payslip.objects.filter(payroll_run__run_date__year=year)
+        entries = TaxLedgerEntry.objects.filter(tax_year=year, payslip_count__gt=0)
         if employee_id:
-            payslips_query = payslips_query.filter(employee_id=employee_id)
+            entries = entries.filter(employee_id=employee_id)
         
-        # Group by employee
+        # Entries come in month order, so the last one seen holds the year-to-date totals
         summary = {}
-        for payslip in payslips_query.select_related('employee__user', 'payroll_run'):
-            emp_id = payslip.employee.id
-            emp_name = f"{payslip.employee.user.first_name} {payslip.employee.user.last_name}"
-            
-            if emp_id not in summary:
-                summary[emp_id] = {
-                    'employee_name': emp_name,
-                    'payslip_count': 0,
-                    'months_covered': set(),
-                    'total_gross': Decimal('0.00'),
-                    'total_paye': Decimal('0.00'),
-                    'has_complete_year': False
-                }
-            
-            summary[emp_id]['payslip_count'] += 1
-            summary[emp_id]['months_covered'].add(payslip.payroll_run.run_date.month)
-            summary[emp_id]['total_gross'] += payslip.total_gross_income or Decimal('0.00')
-            summary[emp_id]['total_paye'] += payslip.paye_tax or Decimal('0.00')
+        for entry in entries.values(
+            'employee_id', 'employee__user__first_name', 'employee__user__last_name',
+            'month', 'payslip_count', 'ytd_gross_pay', 'ytd_paye'
+        ).order_by('employee_id', 'month'):
+            emp_data = summary.setdefault(entry['employee_id'], {
+                'employee_name': f"{entry['employee__user__first_name']} {entry['employee__user__last_name']}",
+                'payslip_count': 0,
+                'months_covered': [],
+                'total_gross': Decimal('0.00'),
+                'total_paye': Decimal('0.00'),
+                'has_complete_year': False
+            })
+            emp_data['payslip_count'] += entry['payslip_count']
+            emp_data['months_covered'].append(entry['month'])
+            emp_data['total_gross'] = entry['ytd_gross_pay']
+            emp_data['total_paye'] = entry['ytd_paye']
         
         # Check for complete year coverage
         for emp_data in summary.values():
             emp_data['has_complete_year'] = len(emp_data['months_covered']) == 12
-            emp_data['months_covered'] = sorted(list(emp_data['months_covered']))
         
         return summary
 
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-16 16:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_add_retirement_breakdown_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PDFArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('kind', models.CharField(help_text="Document type, e.g. 'payslip' or 'p9'", max_length=20)),
+                ('path', models.CharField(help_text='Name of the file on the PDF cache storage', max_length=255)),
+                ('size', models.PositiveIntegerField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'PDF Artifact',
+                'verbose_name_plural': 'PDF Artifacts',
+                'ordering': ['-last_accessed'],
+            },
+        ),
+    ]
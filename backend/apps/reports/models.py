@@ -6,6 +6,8 @@ from django.contrib.auth import get_user_model
 from apps.employees.models import Employee
 from decimal import Decimal
 from django.core.validators import MinValueValidator, MaxValueValidator
+from apps.compliance.money import quantize
+from apps.compliance.tax_schedule import ANNUAL_PAYE_SCHEDULE
 
 User = get_user_model()
 
@@ -256,7 +258,7 @@ class P9Report(models.Model):
         # Column K: Chargeable Pay
         self.chargeable_pay = self.total_gross_pay - self.total_deductions
         
-        # Column L: Tax Charged (would need tax brackets)
+        # Column L: Tax Charged
         self.tax_charged = self._calculate_tax_on_chargeable_pay()
         
         # Column O: PAYE Tax
@@ -268,29 +270,8 @@ class P9Report(models.Model):
         return self
     
     def _calculate_tax_on_chargeable_pay(self):
-        """Calculate tax using Kenya tax brackets"""
-        if self.chargeable_pay <= 0:
-            return Decimal('0.00')
-        
-        # 2024 Kenya Tax Brackets (annual)
-        brackets = [
-            (288000, Decimal('0.10')),    # Up to KES 288,000 at 10%
-            (100000, Decimal('0.25')),    # Next KES 100,000 at 25% 
-            (float('inf'), Decimal('0.30'))  # Above KES 388,000 at 30%
-        ]
-        
-        tax = Decimal('0.00')
-        remaining = self.chargeable_pay
-        
-        for bracket_limit, rate in brackets:
-            if remaining <= 0:
-                break
-            
-            taxable_in_bracket = min(remaining, Decimal(str(bracket_limit)))
-            tax += taxable_in_bracket * rate
-            remaining -= taxable_in_bracket
-        
-        return tax
+        """Calculate tax using the annual KRA tax bands"""
+        return quantize(ANNUAL_PAYE_SCHEDULE.tax(Decimal(str(self.chargeable_pay))))
 
 
 class P9MonthlyBreakdown(models.Model):
@@ -337,4 +318,27 @@ class P9MonthlyBreakdown(models.Model):
             '', 'January', 'February', 'March', 'April', 'May', 'June',
             'July', 'August', 'September', 'October', 'November', 'December'
         ]
-        return f"{self.p9_report.employee_name} - {month_names[self.month]} {self.p9_report.tax_year}"
\ No newline at end of file
+        return f"{self.p9_report.employee_name} - {month_names[self.month]} {self.p9_report.tax_year}"
+
+class PDFArtifact(models.Model):
+    """
+    A rendered PDF in the content-addressed cache (see apps/reports/pdf_cache.py).
+    
+    The key is a hash of everything the document is rendered from, so an entry
+    never goes stale; entries are evicted least recently used first.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    kind = models.CharField(max_length=20, help_text="Document type, e.g. 'payslip' or 'p9'")
+    path = models.CharField(max_length=255, help_text="Name of the file on the PDF cache storage")
+    size = models.PositiveIntegerField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        ordering = ['-last_accessed']
+        verbose_name = "PDF Artifact"
+        verbose_name_plural = "PDF Artifacts"
+    
+    def __str__(self):
+        return f"{self.kind} PDF {self.key[:12]}"
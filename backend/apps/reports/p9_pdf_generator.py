@@ -7,7 +7,8 @@ in the exact official format with landscape orientation
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib import colors
 from reportlab.lib.units import mm, cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Flowable
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.pdfgen import canvas
@@ -16,12 +17,180 @@ import os
 from django.conf import settings
 from django.http import HttpResponse
 from io import BytesIO
+from apps.compliance.tax_schedule import MONTHLY_PAYE_SCHEDULE, ANNUAL_PAYE_SCHEDULE
+
+# Header rows of the monthly table, one entry per column (MONTH, A to O)
+MONTHLY_TABLE_HEADERS = [
+    ['MONTH', 'Basic Salary', 'Benefits Non Cash', 'Value of Quarters', 'Total Gross Pay',
+     'E1<br/>(30% of A)', 'E2<br/>(Actual<br/>Contribution)', 'E3<br/>(Fixed<br/>30,000 p.m)',
+     'Affordable<br/>Housing Levy<br/>(AHL)', 'Social Health<br/>Insurance Fund<br/>(SHIF)',
+     'Post Retirement<br/>Medical Fund<br/>(PRMF)', 'Owner<br/>Occupied<br/>Interest',
+     'Total Deductions<br/>(Lower of E+F+G+H+I)', 'Chargeable Pay<br/>(D-J)',
+     'Tax<br/>Charged<br/>K.sh', 'Personal<br/>Relief<br/>K.sh', 'Insurance<br/>Relief<br/>K.sh',
+     'PAYE Tax (L-M-N)'],
+    [''] + [f'K.shs<br/>{column}' for column in
+            ['A', 'B', 'C', 'D', 'E1', 'E2', 'E3', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O']],
+    ['', '', '', '', '', '30% of Basic<br/>Salary', 'Pension +<br/>NSSF', 'Fixed Amount<br/>30,000'] + [''] * 10,
+]
+
+# Monthly table cell padding: left, right, top, bottom
+MONTHLY_CELL_PADDING = (1, 1, 1.5, 1.5)
+
+
+class P9MonthlyGrid(Flowable):
+    """
+    The P9 monthly table drawn straight onto the canvas.
+
+    Lays out and draws exactly what a Table of Paragraph cells with the
+    monthly table's style does, pixel for pixel, without building a Paragraph
+    per cell: the grid is fixed, so single-word cells are positioned from
+    their string width, and the header rows are wrapped once per process.
+    """
+
+    HEADER_ROWS = len(MONTHLY_TABLE_HEADERS)
+    GRID_WIDTH = 0.5
+
+    # (text, style name, width) -> wrapped lines, for the header rows
+    _wrapped = {}
+
+    def __init__(self, cells, col_widths):
+        """
+        Args:
+            cells: Rows of (text, ParagraphStyle) pairs, header rows first and the total row last
+            col_widths: Column widths in points
+        """
+        super().__init__()
+        self.hAlign = 'CENTER'
+        self.cells = cells
+        self.col_widths = col_widths
+        self.row_heights = None
+
+    def wrap(self, availWidth, availHeight):
+        if self.row_heights is None:
+            left, right, top, bottom = MONTHLY_CELL_PADDING
+            self.lines = []
+            self.row_heights = []
+            for row_number, row in enumerate(self.cells):
+                cached = row_number < self.HEADER_ROWS
+                row_lines = [
+                    self._lines(text, style, width - left - right, cached)
+                    for (text, style), width in zip(row, self.col_widths)
+                ]
+                self.lines.append(row_lines)
+                self.row_heights.append(max(
+                    len(lines) * style.leading for lines, (_, style) in zip(row_lines, row)
+                ) + top + bottom)
+        self.width = sum(self.col_widths)
+        self.height = sum(self.row_heights)
+        return self.width, self.height
+
+    @classmethod
+    def _lines(cls, text, style, width, cached=False):
+        """The lines a Paragraph of `text` wraps to at `width`, as (text, spare width) pairs"""
+        if text and not any(char in text for char in ' <&'):
+            text_width = stringWidth(text, style.fontName, style.fontSize)
+            if text_width <= width:
+                return [(text, width - text_width)]
+
+        key = (text, style.name, width)
+        if cached and key in cls._wrapped:
+            return cls._wrapped[key]
+        paragraph = Paragraph(text, style)
+        paragraph.wrap(width, 0)
+        blpara = paragraph.blPara
+        if blpara.kind == 0:
+            lines = [(' '.join(words), spare) for spare, words in blpara.lines]
+        else:
+            lines = [
+                (' '.join(frag.text for frag in line.words if frag.text), line.extraSpace)
+                for line in blpara.lines
+            ]
+        if cached:
+            cls._wrapped[key] = lines
+        return lines
+
+    def draw(self):
+        canv = self.canv
+        left, right, top, bottom = MONTHLY_CELL_PADDING
+        col_positions = [0]
+        for width in self.col_widths:
+            col_positions.append(col_positions[-1] + width)
+        row_positions = [self.height]
+        for height in self.row_heights:
+            row_positions.append(row_positions[-1] - height)
+
+        canv.saveState()
+
+        # Header and total row backgrounds
+        canv.setFillColor(colors.lightgrey)
+        shaded = row_positions[self.HEADER_ROWS] - row_positions[0]
+        canv.rect(0, row_positions[0], self.width, shaded, stroke=0, fill=1)
+        canv.rect(0, row_positions[-2], self.width, -self.row_heights[-1], stroke=0, fill=1)
+
+        # Cell text, placed as Table places a vertically centred Paragraph and
+        # written with the same text operators, so glyphs land on the same
+        # subpixel positions at every zoom
+        for row, row_lines, row_height, row_bottom in zip(
+            self.cells, self.lines, self.row_heights, row_positions[1:]
+        ):
+            for (_, style), lines, col_position, col_width in zip(row, row_lines, col_positions, self.col_widths):
+                if not lines:
+                    continue
+                width = col_width - left - right
+                height = len(lines) * style.leading
+                canv.saveState()
+                canv.translate(
+                    col_position + (col_width + left - right - width) / 2.0,
+                    row_bottom + (row_height + bottom - top + height) / 2.0 - height
+                )
+                text = canv.beginText(0, height - style.fontSize)
+                text.setFont(style.fontName, style.fontSize, style.leading)
+                text.setFillColor(style.textColor)
+                for line, spare in lines:
+                    if style.alignment == TA_CENTER:
+                        offset = 0.5 * spare
+                    elif style.alignment == TA_RIGHT:
+                        offset = spare
+                    else:
+                        offset = 0
+                    text.setXPos(offset)
+                    text.textLine(line)
+                    text.setXPos(-offset)
+                canv.drawText(text)
+                canv.restoreState()
+
+        # Grid: the outer box, then the inner lines, in the order Table strokes
+        # them, as overlapping antialiased edges depend on it
+        canv.setLineCap(1)
+        canv.setLineJoin(1)
+        canv.setStrokeColor(colors.black)
+        canv.setLineWidth(self.GRID_WIDTH)
+        top_y, bottom_y = row_positions[0], row_positions[-1]
+        for y in (top_y, bottom_y):
+            canv.line(0, y, self.width, y)
+        for x in (0, self.width):
+            canv.line(x, top_y, x, bottom_y)
+        for y in row_positions[1:-1]:
+            canv.line(0, y, self.width, y)
+        for x in col_positions[1:-1]:
+            canv.line(x, top_y, x, bottom_y)
+
+        canv.restoreState()
 
 
 class P9PDFGenerator:
     """Generate official KRA P9 Income Tax Deduction Card PDFs in landscape format"""
     
-    def __init__(self):
+    # Bump whenever the layout changes so cached PDFs are re-rendered
+    TEMPLATE_VERSION = 1
+    
+    def __init__(self, fast=True):
+        """
+        Args:
+            fast: Draw the monthly table straight onto the canvas (P9MonthlyGrid)
+                rather than as a Table of Paragraphs; the output is the same
+        """
+        self.fast = fast
         self.styles = getSampleStyleSheet()
         self.page_width, self.page_height = landscape(A4)  # Landscape orientation
         
@@ -89,12 +258,6 @@ class P9PDFGenerator:
             alignment=TA_LEFT
         )
 
-    def _wrap_text(self, text, style=None, is_header=False):
-        """Convert text to Paragraph for proper text wrapping"""
-        if style is None:
-            style = self.kra_header_cell_style if is_header else self.kra_cell_style
-        return Paragraph(str(text), style)
-
     def generate_p9_pdf(self, p9_report, file_path=None):
         """Generate official KRA P9 Income Tax Deduction Card PDF in landscape format"""
         
@@ -144,11 +307,15 @@ class P9PDFGenerator:
         buffer = self.generate_p9_pdf(p9_report)
         
         response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="P9_{p9_report.employee_name.replace(" ", "_")}_{p9_report.tax_year}.pdf"'
+        response['Content-Disposition'] = f'attachment; filename="{self.filename(p9_report)}"'
         response.write(buffer.getvalue())
         buffer.close()
         
         return response
+    
+    @staticmethod
+    def filename(p9_report):
+        return f"P9_{p9_report.employee_name.replace(' ', '_')}_{p9_report.tax_year}.pdf"
 
     def save_pdf_file(self, p9_report, file_path=None):
         """Save P9 PDF to file system"""
@@ -213,75 +380,48 @@ class P9PDFGenerator:
     
     def _create_official_kra_monthly_table(self, p9_report):
         """Create the official KRA monthly breakdown table with all columns"""
+        cells = self._monthly_table_cells(p9_report)
         
-        # Column headers as per official KRA format (removed column E) - with text wrapping
-        headers = [
-            [self._wrap_text('MONTH', is_header=True), 
-             self._wrap_text('Basic Salary', is_header=True), 
-             self._wrap_text('Benefits Non Cash', is_header=True), 
-             self._wrap_text('Value of Quarters', is_header=True), 
-             self._wrap_text('Total Gross Pay', is_header=True),
-             self._wrap_text('E1<br/>(30% of A)', is_header=True), 
-             self._wrap_text('E2<br/>(Actual<br/>Contribution)', is_header=True), 
-             self._wrap_text('E3<br/>(Fixed<br/>30,000 p.m)', is_header=True),
-             self._wrap_text('Affordable<br/>Housing Levy<br/>(AHL)', is_header=True), 
-             self._wrap_text('Social Health<br/>Insurance Fund<br/>(SHIF)', is_header=True), 
-             self._wrap_text('Post Retirement<br/>Medical Fund<br/>(PRMF)', is_header=True),
-             self._wrap_text('Owner<br/>Occupied<br/>Interest', is_header=True), 
-             self._wrap_text('Total Deductions<br/>(Lower of E+F+G+H+I)', is_header=True), 
-             self._wrap_text('Chargeable Pay<br/>(D-J)', is_header=True),
-             self._wrap_text('Tax<br/>Charged<br/>K.sh', is_header=True), 
-             self._wrap_text('Personal<br/>Relief<br/>K.sh', is_header=True), 
-             self._wrap_text('Insurance<br/>Relief<br/>K.sh', is_header=True), 
-             self._wrap_text('PAYE Tax (L-M-N)', is_header=True)]
-        ]
+        # Calculate column widths for landscape orientation (18 columns instead of 19)
+        total_width = self.page_width - 20*mm
+        col_widths = [total_width * 0.06] + [total_width * 0.052] * 17  # Distribute remaining width across 18 columns
         
-        # Add sub-headers with wrapping
-        sub_headers = [
-            [self._wrap_text('', is_header=True), 
-             self._wrap_text('K.shs<br/>A', is_header=True), 
-             self._wrap_text('K.shs<br/>B', is_header=True), 
-             self._wrap_text('K.shs<br/>C', is_header=True), 
-             self._wrap_text('K.shs<br/>D', is_header=True),
-             self._wrap_text('K.shs<br/>E1', is_header=True), 
-             self._wrap_text('K.shs<br/>E2', is_header=True), 
-             self._wrap_text('K.shs<br/>E3', is_header=True),
-             self._wrap_text('K.shs<br/>F', is_header=True), 
-             self._wrap_text('K.shs<br/>G', is_header=True), 
-             self._wrap_text('K.shs<br/>H', is_header=True),
-             self._wrap_text('K.shs<br/>I', is_header=True), 
-             self._wrap_text('K.shs<br/>J', is_header=True), 
-             self._wrap_text('K.shs<br/>K', is_header=True), 
-             self._wrap_text('K.shs<br/>L', is_header=True),
-             self._wrap_text('K.shs<br/>M', is_header=True), 
-             self._wrap_text('K.shs<br/>N', is_header=True), 
-             self._wrap_text('K.shs<br/>O', is_header=True)]
-        ]
+        if self.fast:
+            return P9MonthlyGrid(cells, col_widths)
         
-        # Additional calculation notes with wrapping
-        calc_notes = [
-            [self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True),
-             self._wrap_text('30% of Basic<br/>Salary', is_header=True), 
-             self._wrap_text('Pension +<br/>NSSF', is_header=True), 
-             self._wrap_text('Fixed Amount<br/>30,000', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True), 
-             self._wrap_text('', is_header=True)]
-        ]
+        data = [[Paragraph(text, style) for text, style in row] for row in cells]
+        left, right, top, bottom = MONTHLY_CELL_PADDING
+        table = Table(data, colWidths=col_widths)
+        table.setStyle(TableStyle([
+            # Headers - font styling handled by Paragraph objects
+            ('BACKGROUND', (0, 0), (-1, 2), colors.lightgrey),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            
+            # Monthly data - alignment handled by Paragraph objects
+            
+            # Total row
+            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+            
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('LEFTPADDING', (0, 0), (-1, -1), left),
+            ('RIGHTPADDING', (0, 0), (-1, -1), right),
+            ('TOPPADDING', (0, 0), (-1, -1), top),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), bottom),
+        ]))
+        return table
+    
+    def _monthly_table_cells(self, p9_report):
+        """
+        The monthly table's cell text and paragraph style, row by row: three
+        header rows, one row per month and the total row
+        """
+        bold = self.kra_header_cell_style
+        right = self.kra_cell_style_right
         
-        # Combine headers
-        data = headers + sub_headers + calc_notes
+        # Column headers as per official KRA format (removed column E)
+        cells = [[(text, bold) for text in row] for row in MONTHLY_TABLE_HEADERS]
         
         # Initialize totals before processing monthly data
         total_basic = Decimal('0.00')
@@ -371,31 +511,31 @@ class P9PDFGenerator:
                 total_paye += paye_tax
                 
                 row_data = [
-                    self._wrap_text(month_name),
-                    self._wrap_text(f'{basic_salary:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{benefits:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{value_quarters:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{gross_pay:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{e1_thirty_percent:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{e2_actual_contribution:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{e3_fixed_amount:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{ahl:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{shif:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{prmf:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{owner_interest:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{total_deductions:,.2f}', self.kra_cell_style_right),  # Uses lower of E1, E2, E3
-                    self._wrap_text(f'{chargeable_pay:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{tax_charged:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{monthly_personal_relief:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{insurance_relief:,.2f}', self.kra_cell_style_right),
-                    self._wrap_text(f'{paye_tax:,.2f}', self.kra_cell_style_right)
+                    (month_name, self.kra_cell_style),
+                    (f'{basic_salary:,.2f}', right),
+                    (f'{benefits:,.2f}', right),
+                    (f'{value_quarters:,.2f}', right),
+                    (f'{gross_pay:,.2f}', right),
+                    (f'{e1_thirty_percent:,.2f}', right),
+                    (f'{e2_actual_contribution:,.2f}', right),
+                    (f'{e3_fixed_amount:,.2f}', right),
+                    (f'{ahl:,.2f}', right),
+                    (f'{shif:,.2f}', right),
+                    (f'{prmf:,.2f}', right),
+                    (f'{owner_interest:,.2f}', right),
+                    (f'{total_deductions:,.2f}', right),  # Uses lower of E1, E2, E3
+                    (f'{chargeable_pay:,.2f}', right),
+                    (f'{tax_charged:,.2f}', right),
+                    (f'{monthly_personal_relief:,.2f}', right),
+                    (f'{insurance_relief:,.2f}', right),
+                    (f'{paye_tax:,.2f}', right)
                 ]
             else:
                 # Empty month with wrapped text
-                empty_cells = [self._wrap_text('0.00', self.kra_cell_style_right)] * 17
-                row_data = [self._wrap_text(month_name)] + empty_cells
+                empty_cells = [('0.00', right)] * 17
+                row_data = [(month_name, self.kra_cell_style)] + empty_cells
             
-            data.append(row_data)
+            cells.append(row_data)
         
         # Calculate final totals after processing all months
         # Column J: Total Deductions = Lower of E (min of E1, E2, E3) + F + G + H + I
@@ -413,50 +553,26 @@ class P9PDFGenerator:
         
         # Total row with calculated totals from monthly data
         total_row = [
-            self._wrap_text('TOTAL', is_header=True),
-            self._wrap_text(f'{total_basic:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_benefits:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_quarters:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_gross:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_e1:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_e2:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_e3:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_ahl:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_shif:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_prmf:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_owner_interest:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_deductions:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_chargeable:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_tax_charged:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_personal_relief:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_insurance_relief:,.2f}', self.kra_header_cell_style),
-            self._wrap_text(f'{total_paye:,.2f}', self.kra_header_cell_style)
+            ('TOTAL', bold),
+            (f'{total_basic:,.2f}', bold),
+            (f'{total_benefits:,.2f}', bold),
+            (f'{total_quarters:,.2f}', bold),
+            (f'{total_gross:,.2f}', bold),
+            (f'{total_e1:,.2f}', bold),
+            (f'{total_e2:,.2f}', bold),
+            (f'{total_e3:,.2f}', bold),
+            (f'{total_ahl:,.2f}', bold),
+            (f'{total_shif:,.2f}', bold),
+            (f'{total_prmf:,.2f}', bold),
+            (f'{total_owner_interest:,.2f}', bold),
+            (f'{total_deductions:,.2f}', bold),
+            (f'{total_chargeable:,.2f}', bold),
+            (f'{total_tax_charged:,.2f}', bold),
+            (f'{total_personal_relief:,.2f}', bold),
+            (f'{total_insurance_relief:,.2f}', bold),
+            (f'{total_paye:,.2f}', bold)
         ]
-        data.append(total_row)
-        
-        # Calculate column widths for landscape orientation (18 columns instead of 19)
-        total_width = self.page_width - 20*mm
-        col_widths = [total_width * 0.06] + [total_width * 0.052] * 17  # Distribute remaining width across 18 columns
-        
-        table = Table(data, colWidths=col_widths)
-        table.setStyle(TableStyle([
-            # Headers - font styling handled by Paragraph objects
-            ('BACKGROUND', (0, 0), (-1, 2), colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            
-            # Monthly data - alignment handled by Paragraph objects
-            
-            # Total row
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            
-            # Grid
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('LEFTPADDING', (0, 0), (-1, -1), 1),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 1),
-            ('TOPPADDING', (0, 0), (-1, -1), 1.5),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 1.5),
-        ]))
+        cells.append(total_row)
         
         # Store calculated totals for summary section
         self._calculated_totals = {
@@ -464,7 +580,7 @@ class P9PDFGenerator:
             'total_paye': total_paye
         }
         
-        return table
+        return cells
     
     def _create_official_kra_summary_section(self, p9_report):
         """Create the official KRA bottom summary section using calculated totals"""
@@ -528,43 +644,10 @@ class P9PDFGenerator:
     
     def _calculate_tax_charged(self, chargeable_pay):
         """Calculate tax charged based on KRA tax bands"""
-        if chargeable_pay <= 0:
-            return Decimal('0.00')
-        
         # KRA tax bands (monthly)
-        if chargeable_pay <= 24000:
-            return chargeable_pay * Decimal('0.10')  # 10%
-        elif chargeable_pay <= 32333:
-            return Decimal('2400.00') + (chargeable_pay - 24000) * Decimal('0.25')  # 25%
-        elif chargeable_pay <= 500000:
-            return Decimal('4483.25') + (chargeable_pay - 32333) * Decimal('0.30')  # 30%
-        elif chargeable_pay <= 800000:
-            return Decimal('144783.35') + (chargeable_pay - 500000) * Decimal('0.325')  # 32.5%
-        else:
-            return Decimal('242283.35') + (chargeable_pay - 800000) * Decimal('0.35')  # 35%
+        return MONTHLY_PAYE_SCHEDULE.tax(chargeable_pay)
     
     def _calculate_tax_on_annual_chargeable_pay(self, annual_chargeable_pay):
         """Calculate tax charged based on KRA annual tax brackets"""
-        if annual_chargeable_pay <= 0:
-            return Decimal('0.00')
-        
         # 2025 KRA tax brackets (annual amounts)
-        # Band 1: 0 - 288,000 (24,000 * 12) at 10%
-        if annual_chargeable_pay <= 288000:
-            return annual_chargeable_pay * Decimal('0.10')
-        
-        # Band 2: 288,001 - 388,000 (32,333 * 12) at 25%  
-        elif annual_chargeable_pay <= 388000:
-            return Decimal('28800.00') + (annual_chargeable_pay - 288000) * Decimal('0.25')
-        
-        # Band 3: 388,001 - 6,000,000 (500,000 * 12) at 30%
-        elif annual_chargeable_pay <= 6000000:
-            return Decimal('53800.00') + (annual_chargeable_pay - 388000) * Decimal('0.30')
-        
-        # Band 4: 6,000,001 - 9,600,000 (800,000 * 12) at 32.5%
-        elif annual_chargeable_pay <= 9600000:
-            return Decimal('1737400.00') + (annual_chargeable_pay - 6000000) * Decimal('0.325')
-        
-        # Band 5: Above 9,600,000 at 35%
-        else:
-            return Decimal('2907400.00') + (annual_chargeable_pay - 9600000) * Decimal('0.35')
\ No newline at end of file
+        return ANNUAL_PAYE_SCHEDULE.tax(annual_chargeable_pay)
\ No newline at end of file
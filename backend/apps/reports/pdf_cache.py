@@ -0,0 +1,185 @@
+"""
+PDF Artifact Cache
+Content-addressed cache of rendered payslip and P9 PDFs, served with ETags
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+
+from apps.reports.models import PDFArtifact
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Eviction trims the cache to this share of PDF_CACHE_MAX_BYTES so it does not
+# run on every store once the cache is full
+EVICTION_LOW_WATER = 0.9
+
+# Hits refresh an entry's recency at most this often
+ACCESS_RESOLUTION = timedelta(minutes=1)
+
+
+def pdf_cache_storage():
+    """
+    Storage the cached PDFs live on.
+
+    Set PDF_CACHE_STORAGE to an alias in STORAGES (e.g. an S3 backend shared by
+    every web server); by default files go under MEDIA_ROOT/pdf_cache.
+    """
+    alias = getattr(settings, 'PDF_CACHE_STORAGE', None)
+    if alias:
+        return storages[alias]
+    return FileSystemStorage(location=os.path.join(settings.MEDIA_ROOT, 'pdf_cache'))
+
+
+def record_fields(instance, exclude=()):
+    """
+    The concrete fields of a model instance, for hashing.
+
+    Leave out bookkeeping fields (timestamps, fingerprints) that change
+    without changing what the PDF shows, or every such write invalidates it.
+    """
+    if instance is None:
+        return None
+    return model_to_dict(instance, fields=[
+        field.name for field in instance._meta.concrete_fields if field.name not in exclude
+    ])
+
+
+def rendered_rows(queryset, exclude=('id',)):
+    """The field values of a document's child rows, for hashing, without their ids or foreign keys"""
+    fields = [
+        field.attname for field in queryset.model._meta.concrete_fields
+        if field.name not in exclude and not field.many_to_one
+    ]
+    return list(queryset.values(*fields))
+
+
+def pdf_cache_key(kind, template_version, *parts):
+    """
+    Hash of everything a PDF is rendered from.
+
+    Args:
+        kind: Document type, e.g. 'payslip'
+        template_version: The generator's TEMPLATE_VERSION, bumped whenever its layout changes
+        parts: JSON-serializable source data (record fields, company settings, ...)
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    payload = json.dumps([kind, template_version, parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PDFCache:
+    """
+    Rendered PDFs keyed by `pdf_cache_key`, with a total size limit.
+
+    The index lives in the PDFArtifact table so every worker process shares
+    one LRU order; the files live on `pdf_cache_storage()`.
+    """
+
+    def __init__(self, storage=None, max_bytes=None):
+        self.storage = storage or pdf_cache_storage()
+        if max_bytes is None:
+            max_bytes = getattr(settings, 'PDF_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+        self.max_bytes = max_bytes
+
+    def get(self, key):
+        """The cached PDF bytes for `key`, or None"""
+        artifact = PDFArtifact.objects.filter(key=key).only('pk', 'path', 'last_accessed').first()
+        if artifact is None:
+            return None
+        try:
+            with self.storage.open(artifact.path, 'rb') as pdf_file:
+                data = pdf_file.read()
+        except OSError:
+            # The file was removed behind the index's back
+            artifact.delete()
+            return None
+
+        now = timezone.now()
+        update = {'hits': F('hits') + 1}
+        if now - artifact.last_accessed >= ACCESS_RESOLUTION:
+            update['last_accessed'] = now
+        PDFArtifact.objects.filter(pk=artifact.pk).update(**update)
+        return data
+
+    def set(self, key, kind, data):
+        """Store a rendered PDF and evict least recently used ones beyond the size limit"""
+        path = self.storage.save(f'{kind}/{key[:2]}/{key}.pdf', ContentFile(data))
+        try:
+            PDFArtifact.objects.create(key=key, kind=kind, path=path, size=len(data))
+        except IntegrityError:
+            # Rendered concurrently by another request; keep its copy
+            self.storage.delete(path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used PDFs until the cache is back under its size limit"""
+        total = PDFArtifact.objects.aggregate(total=Sum('size'))['total'] or 0
+        if total <= self.max_bytes:
+            return 0
+
+        target = self.max_bytes * EVICTION_LOW_WATER
+        evicted = []
+        for pk, path, size in PDFArtifact.objects.order_by('last_accessed').values_list('pk', 'path', 'size').iterator():
+            if total <= target:
+                break
+            evicted.append(pk)
+            total -= size
+            try:
+                self.storage.delete(path)
+            except OSError:
+                logger.warning('Could not delete cached PDF %s', path)
+        PDFArtifact.objects.filter(pk__in=evicted).delete()
+        return len(evicted)
+
+
+def cached_pdf_response(request, kind, key, filename, render):
+    """
+    Serve a PDF from the cache, rendering and storing it on a miss.
+
+    The key doubles as a strong ETag: a client holding the current copy gets
+    a 304 without the PDF being read or rendered.
+
+    Args:
+        request: The incoming request
+        kind: Document type, used to group files on the storage
+        key: `pdf_cache_key` of the document's source data
+        filename: Download filename
+        render: Callable returning the PDF bytes on a cache miss
+
+    Returns:
+        HttpResponse: The PDF, or 304 Not Modified
+    """
+    etag = f'"{key}"'
+    if etag in request.META.get('HTTP_IF_NONE_MATCH', '') or request.META.get('HTTP_IF_NONE_MATCH') == '*':
+        response = HttpResponseNotModified()
+    else:
+        cache = PDFCache()
+        data = cache.get(key)
+        if data is None:
+            data = render()
+            cache.set(key, kind, data)
+        response = HttpResponse(data, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    response['ETag'] = etag
+    # Personal documents: browsers may keep them but must revalidate
+    response['Cache-Control'] = 'private, no-cache'
+    return response
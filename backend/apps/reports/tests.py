@@ -0,0 +1,30 @@
+# apps/reports/tests.py
+
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from apps.reports.models import P9Report
+
+
+class P9ReportTaxChargedTest(SimpleTestCase):
+    """Tax charged on a P9 report's annual chargeable pay"""
+
+    def tax_charged(self, chargeable_pay):
+        return P9Report(chargeable_pay=Decimal(chargeable_pay))._calculate_tax_on_chargeable_pay()
+
+    def test_no_tax_without_chargeable_pay(self):
+        self.assertEqual(self.tax_charged('0.00'), Decimal('0.00'))
+        self.assertEqual(self.tax_charged('-100.00'), Decimal('0.00'))
+
+    def test_lower_bands(self):
+        # 288,000 at 10% + 100,000 at 25% + 112,000 at 30%
+        self.assertEqual(self.tax_charged('500000.00'), Decimal('87400.00'))
+
+    def test_32_5_percent_band_above_6_million(self):
+        # 1,737,400 on the first 6,000,000 + 1,000,000 at 32.5%
+        self.assertEqual(self.tax_charged('7000000.00'), Decimal('2062400.00'))
+
+    def test_35_percent_band_above_9_6_million(self):
+        # 1,737,400 + 3,600,000 at 32.5% + 400,000 at 35%
+        self.assertEqual(self.tax_charged('10000000.00'), Decimal('3047400.00'))
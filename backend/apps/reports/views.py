@@ -5,7 +5,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
-from django.http import HttpResponse, Http404
+from django.http import StreamingHttpResponse, Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.contrib.admin.views.decorators import staff_member_required
@@ -13,7 +13,9 @@ from django.utils.decorators import method_decorator
 from .models import ReportGenerationLog, P9Report, P9MonthlyBreakdown
 from .serializers import ReportGenerationLogSerializer
 from .p9_pdf_generator import P9PDFGenerator
-from .bulk_p9_generator import BulkP9Generator
+from .bulk_p9_generator import BulkP9Generator, max_pdf_workers
+from .pdf_cache import cached_pdf_response, pdf_cache_key, record_fields, rendered_rows
+from apps.core.company_models import CompanySettings
 from apps.employees.models import Employee
 import os
 import json
@@ -116,13 +118,24 @@ class P9ViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def download_pdf(self, request, pk=None):
-        """Download P9 as KRA-formatted PDF"""
+        """Download P9 as KRA-formatted PDF, from the PDF cache when unchanged"""
         p9_report = self.get_object()
         pdf_generator = P9PDFGenerator()
         
         try:
-            response = pdf_generator.create_http_response(p9_report)
-            return response
+            key = pdf_cache_key(
+                'p9',
+                P9PDFGenerator.TEMPLATE_VERSION,
+                # Regenerating P9s rewrites these timestamps and the breakdown
+                # rows' ids without changing the figures
+                record_fields(p9_report, exclude=['generated_date', 'updated_date']),
+                rendered_rows(p9_report.monthly_breakdown.order_by('month')),
+                record_fields(CompanySettings.get_settings())
+            )
+            return cached_pdf_response(
+                request, 'p9', key, P9PDFGenerator.filename(p9_report),
+                lambda: pdf_generator.generate_p9_pdf(p9_report).getvalue()
+            )
         except Exception as e:
             return Response(
                 {"error": f"Failed to generate PDF: {str(e)}"},
@@ -157,40 +170,53 @@ class P9ViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     @method_decorator(staff_member_required)
     def bulk_pdf_download(self, request):
-        """Generate and download ZIP file of P9 PDFs for multiple employees"""
+        """
+        Download a ZIP file of P9 PDFs for multiple employees
+        
+        PDFs are rendered in a process pool and the archive is streamed as they
+        are ready, so the download starts immediately and memory use does not
+        grow with headcount. Pass `workers` to override the P9_PDF_WORKERS setting
+        (at most the CPU count or P9_PDF_WORKERS, whichever is higher).
+        """
         
         tax_year = request.data.get('tax_year', timezone.now().year)
         p9_ids = request.data.get('p9_ids', None)
         
+        workers = request.data.get('workers')
+        if workers not in (None, ''):
+            try:
+                workers = int(workers)
+            except (TypeError, ValueError):
+                workers = 0
+            if workers < 1:
+                return Response(
+                    {"error": "workers must be a positive integer"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # Each worker is a freshly spawned process
+            workers = min(workers, max_pdf_workers())
+        else:
+            workers = None
+        
         # Get P9 reports
         p9_reports = P9Report.objects.filter(tax_year=tax_year)
         if p9_ids:
             p9_reports = p9_reports.filter(id__in=p9_ids)
+        p9_ids = list(p9_reports.values_list('id', flat=True))
         
-        bulk_generator = BulkP9Generator(tax_year=tax_year)
-        
-        try:
-            results = bulk_generator.generate_bulk_pdfs(p9_reports, create_zip=True)
-            
-            if results['zip_file']:
-                # Return ZIP file for download
-                zip_path = results['zip_file']['path']
-                
-                with open(zip_path, 'rb') as zip_file:
-                    response = HttpResponse(zip_file.read(), content_type='application/zip')
-                    response['Content-Disposition'] = f'attachment; filename="P9_Reports_{tax_year}_All.zip"'
-                    return response
-            else:
-                return Response(
-                    {"error": "No ZIP file created", "results": results},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-                
-        except Exception as e:
+        if not p9_ids:
             return Response(
-                {"error": f"Bulk PDF generation failed: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": f"No P9 reports found for {tax_year}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        
+        bulk_generator = BulkP9Generator(tax_year=tax_year)
+        response = StreamingHttpResponse(
+            bulk_generator.stream_bulk_pdfs(p9_ids, workers=workers),
+            content_type='application/zip'
+        )
+        response['Content-Disposition'] = f'attachment; filename="P9_Reports_{tax_year}_All.zip"'
+        return response
 
     @action(detail=False, methods=['get'])
     def payslip_summary(self, request):
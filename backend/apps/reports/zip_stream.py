@@ -0,0 +1,66 @@
+"""
+Streaming ZIP Archives
+Write a ZIP archive as an iterator of byte chunks, without a file or a seekable buffer
+"""
+
+import io
+import zipfile
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """
+    Write-only, unseekable sink that hands back what was written since the last drain.
+
+    zipfile detects that it cannot seek and writes each entry's sizes and CRC
+    in a data descriptor after the entry, so nothing written is ever revisited.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        """The bytes written since the previous drain"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(files, compression=zipfile.ZIP_DEFLATED):
+    """
+    Yield a ZIP archive of `files` chunk by chunk as each file is added.
+
+    Only the file being added and the archive's central directory (a few
+    dozen bytes per entry) are held in memory.
+
+    Args:
+        files: Iterable of (archive_name, bytes) pairs, consumed lazily
+        compression: zipfile compression method
+
+    Yields:
+        bytes: The next part of the archive (never empty)
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    # Central directory, written when the archive is closed
+    chunk = buffer.drain()
+    if chunk:
+        yield chunk
@@ -0,0 +1,20 @@
+# kenyan_payroll_project/celery.py
+"""
+Celery application for background work (e.g. payroll jobs).
+
+Start a worker with:
+    celery -A kenyan_payroll_project worker
+
+Tasks are only sent to Celery when CELERY_BROKER_URL is set; otherwise
+background payroll jobs run in a thread of the web process.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kenyan_payroll_project.settings')
+
+app = Celery('kenyan_payroll_project')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -250,6 +250,30 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
+# Statutory rate registry: how often (seconds) each worker checks whether
+# rates were changed by another process
+STATUTORY_RATE_POLL_SECONDS = int(os.environ.get('STATUTORY_RATE_POLL_SECONDS', '30'))
+
+# Background payroll runs: employees committed per chunk, and the Celery broker
+# (when unset, background runs execute in a thread of the web process)
+PAYROLL_JOB_CHUNK_SIZE = int(os.environ.get('PAYROLL_JOB_CHUNK_SIZE', '500'))
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+
+# Seconds without a heartbeat after which a running job is presumed dead and
+# may be retried; keep it well above the time one chunk takes
+PAYROLL_JOB_STALE_SECONDS = int(os.environ.get('PAYROLL_JOB_STALE_SECONDS', '900'))
+
+# Processes used to compute synchronous payroll runs (1 = in-process)
+PAYROLL_WORKERS = int(os.environ.get('PAYROLL_WORKERS', '1'))
+
+# Maximum rows per request to the public batch calculator
+PUBLIC_CALCULATOR_BATCH_LIMIT = int(os.environ.get('PUBLIC_CALCULATOR_BATCH_LIMIT', '5000'))
+
+# Browser/proxy and server-side cache lifetime for public calculator responses
+PUBLIC_CALCULATOR_CACHE_SECONDS = int(os.environ.get('PUBLIC_CALCULATOR_CACHE_SECONDS', '3600'))
+# Calculator responses memoized in each worker's memory
+PUBLIC_CALCULATOR_LRU_SIZE = int(os.environ.get('PUBLIC_CALCULATOR_LRU_SIZE', '1024'))
+
 # Email Configuration for Gmail SMTP
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
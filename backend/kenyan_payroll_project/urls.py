@@ -7,7 +7,7 @@ from django.conf.urls.static import static
 from django.http import HttpResponse
 from apps.core.views import welcome, calculator_page, api_root, user_logout_view, user_login_view, my_payslips_view, test_simple_view, payslips_view_fixed, api_docs_view_fixed, calculator_view_fixed, debug_user_check_secure, create_admin_disabled, serve_react_frontend, serve_react_static, employee_portal_view, tenant_frontend_view
 from apps.core.contact_views import contact_form_view, contact_form_submit
-from apps.payroll.calculator_views import public_payroll_calculator
+from apps.payroll.calculator_views import public_payroll_calculator, public_gross_from_net, public_payroll_calculator_batch, public_net_pay_curve
 import os
 
 # Customize Django Admin Interface
@@ -49,6 +49,9 @@ urlpatterns = [
     
     # Public Calculator API (no authentication required)
     path('api/public/calculator/', public_payroll_calculator, name='public_calculator'),
+    path('api/public/calculator/gross-from-net/', public_gross_from_net, name='public_gross_from_net'),
+    path('api/public/calculator/batch/', public_payroll_calculator_batch, name='public_calculator_batch'),
+    path('api/public/calculator/curve/', public_net_pay_curve, name='public_net_pay_curve'),
     
     # ===================================================================
     # REACT FRONTEND ROUTES - SaaS Multi-Tenant Setup
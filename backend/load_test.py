@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+HTTP Load Test for the Employee Portal and Payroll APIs
+
+Runs concurrent virtual employees against a running server and reports latency
+percentiles, error rate and throughput per endpoint. Uses only the standard
+library, so it can run from any machine that can reach the server.
+
+Seed the database first, with a known password, e.g.:
+
+    python manage.py generate_workforce --employees 10000 --password LoadTest123!
+    python load_test.py --base-url http://localhost:8000 --password LoadTest123! \\
+        --concurrency 10 50 100 --duration 60 --prepare-p9
+
+Each virtual employee logs in as one generated user (synthetic.0000000@...,
+synthetic.0000001@..., ...) and then repeatedly picks a scenario by weight.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+# name: relative weight in the traffic mix (payday traffic is mostly payslips)
+SCENARIOS = {
+    'login': 1,
+    'payslip_list': 30,
+    'payslip_pdf': 15,
+    'leave_balance': 15,
+    'leave_request': 5,
+    'public_calculator': 25,
+    'p9_download': 9,
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Stats:
+    """Thread-safe latency and error counts per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = defaultdict(list)
+        self.skipped = defaultdict(int)
+
+    def record(self, endpoint, seconds, error=None):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if error is not None:
+                self.errors[endpoint] += 1
+                if len(self.error_samples[endpoint]) < 5:
+                    self.error_samples[endpoint].append(error)
+
+    def skip(self, scenario):
+        with self._lock:
+            self.skipped[scenario] += 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint in sorted(self.latencies):
+            latencies = sorted(self.latencies[endpoint])
+            count = len(latencies)
+            endpoints[endpoint] = {
+                'requests': count,
+                'errors': self.errors[endpoint],
+                'error_rate': round(self.errors[endpoint] / count, 4) if count else 0,
+                'throughput_rps': round(count / elapsed, 2) if elapsed else None,
+                'mean_ms': round(sum(latencies) / count * 1000, 1) if count else None,
+                'max_ms': round(latencies[-1] * 1000, 1) if count else None,
+                **{f'p{pct}_ms': round(percentile(latencies, pct) * 1000, 1) for pct in PERCENTILES},
+                'error_samples': self.error_samples[endpoint],
+            }
+        return {'endpoints': endpoints, 'skipped': dict(self.skipped)}
+
+
+class Client:
+    """A minimal JSON/HTTP client that times every request into `stats`"""
+
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.token = None
+
+    def request(self, endpoint, method, path, data=None, expect_json=True):
+        """
+        Send one request and record it under `endpoint`.
+
+        Returns:
+            The decoded JSON body (or raw bytes), or None if the request failed
+        """
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        if body is not None:
+            request.add_header('Content-Type', 'application/json')
+        if self.token:
+            request.add_header('Authorization', f'Token {self.token}')
+
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                content = response.read()
+        except urllib.error.HTTPError as e:
+            e.read()
+            self.stats.record(endpoint, time.perf_counter() - started, f'HTTP {e.code}')
+            return None
+        except (urllib.error.URLError, OSError) as e:
+            self.stats.record(endpoint, time.perf_counter() - started, type(e).__name__)
+            return None
+        self.stats.record(endpoint, time.perf_counter() - started)
+
+        if not expect_json:
+            return content
+        return json.loads(content) if content else {}
+
+
+def results_of(page):
+    """Rows of a paginated or plain list response"""
+    if isinstance(page, dict):
+        return page.get('results', [])
+    return page or []
+
+
+class VirtualEmployee:
+    """One logged-in employee working through the scenario mix"""
+
+    def __init__(self, client, email, password, rng):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.rng = rng
+        self.payslip_ids = None
+        self.p9_ids = None
+        self.leave_type_id = None
+
+    def login(self):
+        response = self.client.request('login', 'POST', '/api/v1/auth/login/', {
+            'email': self.email, 'password': self.password
+        })
+        if response and response.get('token'):
+            self.client.token = response['token']
+        return self.client.token is not None
+
+    def payslip_list(self):
+        page = self.client.request('payslip_list', 'GET', '/api/v1/payroll/payslips/')
+        if page is not None:
+            self.payslip_ids = [payslip['id'] for payslip in results_of(page)]
+
+    def payslip_pdf(self):
+        if self.payslip_ids is None:
+            self.payslip_list()
+        if not self.payslip_ids:
+            return False
+        payslip_id = self.rng.choice(self.payslip_ids)
+        self.client.request(
+            'payslip_pdf', 'GET', f'/api/v1/payroll/payslips/{payslip_id}/download_pdf/', expect_json=False
+        )
+
+    def leave_balance(self):
+        self.client.request('leave_balance', 'GET', '/api/v1/leaves/leave-requests/my_balance/')
+
+    def leave_request(self):
+        if self.leave_type_id is None:
+            leave_types = results_of(self.client.request('leave_types', 'GET', '/api/v1/leaves/leave-types/'))
+            annual = [leave_type for leave_type in leave_types if leave_type.get('code') == 'AL']
+            if not (annual or leave_types):
+                return False
+            self.leave_type_id = (annual or leave_types)[0]['id']
+
+        start = date.today() + timedelta(days=self.rng.randrange(7, 60))
+        created = self.client.request('leave_request', 'POST', '/api/v1/leaves/leave-requests/', {
+            'leave_type': self.leave_type_id,
+            'start_date': start.isoformat(),
+            'end_date': start.isoformat(),
+            'days_requested': '1.0',
+            'reason': 'Load test',
+        })
+        # Withdraw it again so balances do not run out during long tests
+        if created and created.get('id'):
+            self.client.request(
+                'leave_request_delete', 'DELETE', f"/api/v1/leaves/leave-requests/{created['id']}/", expect_json=False
+            )
+
+    def public_calculator(self):
+        self.client.request('public_calculator', 'POST', '/api/public/calculator/', {
+            'gross_salary': str(self.rng.randrange(15000, 500000, 500)),
+            'pension_contribution': str(self.rng.choice([0, 0, 2000, 5000])),
+        })
+
+    def p9_download(self):
+        if self.p9_ids is None:
+            page = self.client.request('p9_list', 'GET', '/api/v1/reports/p9/')
+            self.p9_ids = [report['id'] for report in results_of(page)] if page is not None else []
+        if not self.p9_ids:
+            return False
+        p9_id = self.rng.choice(self.p9_ids)
+        self.client.request('p9_download', 'GET', f'/api/v1/reports/p9/{p9_id}/download_pdf/', expect_json=False)
+
+    def run(self, scenario):
+        """Run one scenario; returns False if this user has nothing to exercise it with"""
+        return getattr(self, scenario)() is not False
+
+
+def prepare_p9(base_url, email, password, tax_year, timeout):
+    """Generate P9 reports from payslips as an administrator, so P9 downloads have data"""
+    stats = Stats()
+    admin = VirtualEmployee(Client(base_url, stats, timeout), email, password, random.Random(0))
+    if not admin.login():
+        sys.exit(f'❌ Could not log in as {email} to prepare P9 reports')
+    result = admin.client.request('p9_bulk_generate', 'POST', '/api/v1/reports/p9/bulk_generate/', {
+        'tax_year': tax_year, 'from_payslips': True
+    })
+    print(f'🧾 P9 reports prepared for {tax_year}: {result}')
+
+
+def run_load(args, concurrency):
+    """Run the scenario mix with `concurrency` virtual employees for the configured duration"""
+    stats = Stats()
+    scenarios = {name: weight for name, weight in SCENARIOS.items() if not args.scenarios or name in args.scenarios}
+    names, weights = list(scenarios), list(scenarios.values())
+    deadline = time.perf_counter() + args.duration
+
+    def virtual_employee(number):
+        rng = random.Random(f'{args.seed}:{number}')
+        email = f'{args.prefix}.{(args.first_user + number % args.users):07d}@synthetic.example'
+        user = VirtualEmployee(Client(args.base_url, stats, args.timeout), email, args.password, rng)
+        if not user.login():
+            return
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            if not user.run(scenario):
+                stats.skip(scenario)
+            if args.think_time:
+                time.sleep(rng.uniform(0, 2 * args.think_time))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(virtual_employee, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    summary = stats.summary(elapsed)
+    summary.update({'concurrency': concurrency, 'duration_seconds': round(elapsed, 2)})
+    total = sum(endpoint['requests'] for endpoint in summary['endpoints'].values())
+    errors = sum(endpoint['errors'] for endpoint in summary['endpoints'].values())
+    summary['total'] = {
+        'requests': total,
+        'errors': errors,
+        'error_rate': round(errors / total, 4) if total else 0,
+        'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+    }
+    return summary
+
+
+def print_summary(summary):
+    print(f"\n📊 Concurrency {summary['concurrency']} - {summary['duration_seconds']}s")
+    print(f"   {'Endpoint':<22}{'reqs':>8}{'err%':>8}{'rps':>9}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, endpoint in summary['endpoints'].items():
+        print(
+            f"   {name:<22}{endpoint['requests']:>8}{endpoint['error_rate'] * 100:>7.1f}%{endpoint['throughput_rps']:>9.1f}"
+            + ''.join(f"{endpoint[f'p{pct}_ms']:>9.0f}" for pct in PERCENTILES)
+            + f"{endpoint['max_ms']:>9.0f}"
+        )
+    total = summary['total']
+    print(f"   {'total':<22}{total['requests']:>8}{total['error_rate'] * 100:>7.1f}%{total['throughput_rps']:>9.1f}   (latencies in ms)")
+    for name, endpoint in summary['endpoints'].items():
+        if endpoint['error_samples']:
+            print(f"   ⚠️  {name}: {', '.join(endpoint['error_samples'])}")
+    if summary['skipped']:
+        print(f"   ℹ️  Skipped (no data for the user): {summary['skipped']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the employee portal and payroll APIs')
+    parser.add_argument('--base-url', default='http://localhost:8000', help='Server to test (default: http://localhost:8000)')
+    parser.add_argument('--prefix', default='synthetic', help="Prefix the users were generated with (default: 'synthetic')")
+    parser.add_argument('--password', required=True, help='Password the users were generated with')
+    parser.add_argument('--users', type=int, default=1000, help='Distinct employee accounts to log in as (default: 1000)')
+    parser.add_argument('--first-user', type=int, default=0, help='Index of the first employee account (default: 0)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10], help='Concurrent virtual employees; several values run one after another (default: 10)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run each concurrency level (default: 30)')
+    parser.add_argument('--think-time', type=float, default=0, help='Mean pause between a user\'s requests in seconds (default: 0)')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), help='Only run these scenarios')
+    parser.add_argument('--timeout', type=float, default=30, help='Request timeout in seconds (default: 30)')
+    parser.add_argument('--seed', type=int, default=2025, help='Seed for the scenario mix (default: 2025)')
+    parser.add_argument('--prepare-p9', action='store_true', help='Generate P9 reports as the admin before the test')
+    parser.add_argument('--tax-year', type=int, default=2025, help='Tax year for --prepare-p9 (default: 2025)')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    if args.prepare_p9:
+        prepare_p9(args.base_url, f'{args.prefix}.admin@synthetic.example', args.password, args.tax_year, args.timeout)
+
+    print(f'🚀 Load testing {args.base_url} for {args.duration:.0f}s per concurrency level')
+    runs = []
+    for concurrency in args.concurrency:
+        summary = run_load(args, concurrency)
+        print_summary(summary)
+        runs.append(summary)
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'base_url': args.base_url, 'runs': runs}, output, indent=2)
+        print(f'\n💾 Results written to {args.json}')
+
+    print('\n✅ Load test complete!')
+
+
+if __name__ == '__main__':
+    main()